@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# Compares E2CLogDecoder with web3 ABI decoding of bridge logs.
+# Usage: python benchmarks/e2c_log_decoder.py
+import os
+import random
+from time import perf_counter
+
+from eth_abi import encode
+from hexbytes import HexBytes
+from web3 import Web3
+
+from units_network.bridges import Bridges
+
+LOGS = 20_000
+
+
+def make_logs(bridges: Bridges, n: int):
+    sent_native_topic = HexBytes(bridges.native_bridge.sent_native_topic)
+    erc20_topic = HexBytes(bridges.standard_bridge.erc20_bridge_initiated_topic)
+    r = []
+    for i in range(n):
+        if i % 2 == 0:
+            address = bridges.native_bridge.contract_address
+            topics = [sent_native_topic]
+            data = encode(
+                ["bytes20", "int64"], [os.urandom(20), random.randrange(2**63)]
+            )
+        else:
+            address = bridges.standard_bridge.contract_address
+            topics = [erc20_topic] + [
+                HexBytes(
+                    encode(["address"], [Web3.to_checksum_address(os.urandom(20))])
+                )
+                for _ in range(3)
+            ]
+            data = encode(["int64"], [random.randrange(2**63)])
+        r.append(
+            {
+                "address": address,
+                "topics": topics,
+                "data": HexBytes(data),
+                "blockHash": HexBytes(bytes(32)),
+                "blockNumber": 1,
+                "transactionHash": HexBytes(os.urandom(32)),
+                "transactionIndex": i,
+                "logIndex": i,
+                "removed": False,
+            }
+        )
+    return r
+
+
+def measure(name: str, f, logs) -> float:
+    start = perf_counter()
+    for log in logs:
+        f(log)
+    logs_per_second = len(logs) / (perf_counter() - start)
+    print(f"{name:>32}: {logs_per_second:>12,.0f} logs/s")
+    return logs_per_second
+
+
+def main():
+    bridges = Bridges(
+        Web3(),
+        Web3.to_checksum_address("0x" + "11" * 20),
+        Web3.to_checksum_address("0x" + "22" * 20),
+    )
+    logs = make_logs(bridges, LOGS)
+
+    for log in logs:
+        expected = bridges.parse_e2c_event_with_abi(log)
+        assert bridges.parse_e2c_event(log) == expected, f"Different events: {log}"
+        leaf = bridges.e2c_log_decoder.to_merkle_leaf(log)
+        assert leaf == expected.to_merkle_leaf(), f"Different leaves: {log}"
+
+    web3 = measure("web3 ABI decoding", bridges.parse_e2c_event_with_abi, logs)
+    decoder = measure("E2CLogDecoder.decode", bridges.e2c_log_decoder.decode, logs)
+    leaves = measure(
+        "E2CLogDecoder.to_merkle_leaf", bridges.e2c_log_decoder.to_merkle_leaf, logs
+    )
+    print(f"Speedup: decode {decoder / web3:.1f}x, to_merkle_leaf {leaves / web3:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# Compares E2CMerkleTree with the pymerkle-based reference implementation.
+# Usage: python benchmarks/e2c_merkle.py
+import os
+from timeit import timeit
+
+from hexbytes import HexBytes
+
+from units_network.merkle import get_merkle_proofs, get_merkle_proofs_pymerkle
+
+SIZES = [1, 16, 256, 1024, 4096]
+REPEATS = 20
+
+
+def main():
+    print(f"{'leaves':>8} {'pymerkle, ms':>14} {'E2C tree, ms':>14} {'speedup':>8}")
+    for size in SIZES:
+        leaves = [HexBytes(os.urandom(96)) for _ in range(size)]
+        index = size - 1
+
+        expected = get_merkle_proofs_pymerkle(leaves, index)
+        actual = get_merkle_proofs(leaves, index)
+        assert actual == expected, f"Different proofs for {size} leaves"
+
+        ref_ms = timeit(
+            lambda: get_merkle_proofs_pymerkle(leaves, index), number=REPEATS
+        )
+        ref_ms = ref_ms * 1000 / REPEATS
+        new_ms = timeit(lambda: get_merkle_proofs(leaves, index), number=REPEATS)
+        new_ms = new_ms * 1000 / REPEATS
+        print(f"{size:>8} {ref_ms:>14.3f} {new_ms:>14.3f} {ref_ms / new_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
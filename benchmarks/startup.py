@@ -0,0 +1,42 @@
+#!/usr/bin/env python
+# Measures time to print the usage of each command, i.e. CLI startup without network calls.
+# Usage: python benchmarks/startup.py
+import statistics
+import subprocess
+import sys
+from time import perf_counter
+
+RUNS = 7
+
+SCRIPTS = [
+    "erc20_approve",
+    "transfer_c2e",
+    "transfer_c2e_bulk",
+    "transfer_e2c",
+    "transfer_e2c_batch",
+    "transfer_e2c_withdraw",
+]
+
+
+def measure(args) -> float:
+    """
+    :return: a median time in milliseconds
+    """
+    times = []
+    for _ in range(RUNS):
+        start = perf_counter()
+        subprocess.run([sys.executable] + args, capture_output=True)
+        times.append((perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    print(f"Median of {RUNS} runs:")
+    print(f"  python -c pass: {measure(['-c', 'pass']):.0f} ms")
+    for script in SCRIPTS:
+        ms = measure(["-m", f"units_network.scripts.{script}"])
+        print(f"  {script} usage: {ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
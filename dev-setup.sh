@@ -11,7 +11,7 @@ if [ ! -d "$PWD/.venv" ]; then
   fi
 
   echo "Install dependencies"
-  pip install --editable .
+  pip install --editable '.[test]'
 fi
 
 echo "Done."
@@ -0,0 +1,59 @@
+import pywaves as pw
+
+from units_network.chain_contract import (
+    asset_from_details,
+    asset_to_details,
+    create_registry_snapshot,
+)
+
+DETAILS = {
+    "assetId": "7F5cWn6nBtwxQBC1QWdJPV87WSquGf6SWa4Ek8Nb3NTj",
+    "issuer": "3MNy5ooU6aLtWkGdrym2SCJY1XYaLHxYyUS",
+    "quantity": 10**16,
+    "decimals": 8,
+    "reissuable": True,
+    "name": "Unit0",
+    "description": "",
+    "minSponsoredAssetFee": None,
+}
+
+
+class NodeWithDetails:
+    """
+    pywaves module stand-in, that responds to /assets/details with DETAILS
+    """
+
+    DEFAULT_CURRENCY = pw.DEFAULT_CURRENCY
+
+    @staticmethod
+    def wrapper(path, *args, **kwargs):
+        assert path == f"/assets/details/{DETAILS['assetId']}"
+        return DETAILS
+
+
+def test_asset_from_details_matches_pw_asset():
+    expected = pw.Asset(DETAILS["assetId"], pywaves=NodeWithDetails)
+    actual = asset_from_details(DETAILS, DETAILS["assetId"], NodeWithDetails)
+    assert vars(actual) == vars(expected)
+    assert asset_to_details(actual) == DETAILS
+
+
+def test_asset_from_details_without_details():
+    r = asset_from_details({"error": 0, "message": "Failed"}, DETAILS["assetId"])
+    assert r.assetId == DETAILS["assetId"]
+    assert r.name == "" and r.decimals == 0
+
+
+def test_registry_snapshot_skips_assets_without_details():
+    erc20 = "0x" + "11" * 20
+    entries = {
+        DETAILS["assetId"]: ["0", erc20, "10"],
+        "WAVES": ["1", "0x" + "22" * 20, "10"],
+        "UnknownAsset": ["2", "0x" + "33" * 20, "10"],
+    }
+    details = [DETAILS, {"error": 0, "message": "Failed to get description"}]
+    r = create_registry_snapshot(entries, details)
+    assert len(r) == 2
+    assert r.find_by_name("unit0").el_erc20_address.lower() == erc20
+    assert r.find_by_name("WAVES").index == 1
+    assert r.find_by_index(2) is None
@@ -0,0 +1,26 @@
+from hexbytes import HexBytes
+
+from units_network.e2c_block_cache import E2CBlock, E2CBlockCache
+from units_network.merkle import E2CMerkleTree
+
+BLOCK_HASH = HexBytes(b"\x01" * 32)
+
+
+def create_block(events) -> E2CBlock:
+    return E2CBlock(
+        block_hash=BLOCK_HASH,
+        events=events,
+        transfer_indexes={},
+        merkle_tree=E2CMerkleTree([]),
+    )
+
+
+def test_block_without_logs_is_not_cached():
+    cache = E2CBlockCache()
+    cache.put(create_block([]))
+    assert cache.get(BLOCK_HASH) is None
+
+    # Logs appeared after the node indexed the block
+    block = create_block([None])
+    cache.put(block)
+    assert cache.get(BLOCK_HASH) is block
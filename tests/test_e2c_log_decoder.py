@@ -0,0 +1,86 @@
+from eth_abi import encode
+from hexbytes import HexBytes
+from web3 import Web3
+
+from units_network.bridges import Bridges
+
+NATIVE_BRIDGE_ADDRESS = Web3.to_checksum_address("0x" + "11" * 20)
+STANDARD_BRIDGE_ADDRESS = Web3.to_checksum_address("0x" + "22" * 20)
+TOKEN_ADDRESS = Web3.to_checksum_address("0x" + "33" * 20)
+FROM_ADDRESS = Web3.to_checksum_address("0x" + "44" * 20)
+CL_TO_ADDRESS = Web3.to_checksum_address("0x" + "55" * 20)
+BLOCK_HASH = HexBytes(b"\x01" * 32)
+
+
+def address_topic(address: str) -> HexBytes:
+    return HexBytes(encode(["address"], [address]))
+
+
+def create_log(address, topics, data, i):
+    return {
+        "address": address,
+        "blockHash": BLOCK_HASH,
+        "blockNumber": 1,
+        "data": HexBytes(data),
+        "logIndex": i,
+        "removed": False,
+        "topics": topics,
+        "transactionHash": HexBytes(bytes([i + 1]) * 32),
+        "transactionIndex": i,
+    }
+
+
+def create_logs(bridges: Bridges):
+    sent_native_topic = HexBytes(bridges.native_bridge.sent_native_topic)
+    erc20_bridge_initiated_topic = HexBytes(
+        bridges.standard_bridge.erc20_bridge_initiated_topic
+    )
+    return [
+        create_log(
+            NATIVE_BRIDGE_ADDRESS,
+            [sent_native_topic],
+            encode(["bytes20", "int64"], [b"\x07" * 20, 10**18]),
+            0,
+        ),
+        create_log(
+            STANDARD_BRIDGE_ADDRESS,
+            [
+                erc20_bridge_initiated_topic,
+                address_topic(TOKEN_ADDRESS),
+                address_topic(FROM_ADDRESS),
+                address_topic(CL_TO_ADDRESS),
+            ],
+            encode(["int64"], [12345]),
+            1,
+        ),
+        # Another event of a bridge
+        create_log(NATIVE_BRIDGE_ADDRESS, [HexBytes(b"\x09" * 32)], b"", 2),
+        create_log(
+            NATIVE_BRIDGE_ADDRESS,
+            [sent_native_topic],
+            encode(["bytes20", "int64"], [b"\x08" * 20, 1]),
+            3,
+        ),
+    ]
+
+
+def test_decoder_gives_same_events_as_abi():
+    bridges = Bridges(Web3(), NATIVE_BRIDGE_ADDRESS, STANDARD_BRIDGE_ADDRESS)
+    logs = create_logs(bridges)
+
+    events = [bridges.parse_e2c_event(x) for x in logs]
+    assert events == [bridges.parse_e2c_event_with_abi(x) for x in logs]
+    assert events[2] is None
+    assert events[1].cl_to == CL_TO_ADDRESS  # type: ignore
+
+
+def test_merkle_leaves_are_leaves_of_abi_events():
+    bridges = Bridges(Web3(), NATIVE_BRIDGE_ADDRESS, STANDARD_BRIDGE_ADDRESS)
+    logs = create_logs(bridges)
+
+    expected = []
+    for log in logs:
+        evt = bridges.parse_e2c_event_with_abi(log)
+        if evt:
+            expected.append(HexBytes(evt.to_merkle_leaf()))
+    assert bridges.get_e2c_merkle_leaves(logs) == expected
@@ -0,0 +1,188 @@
+import asyncio
+import threading
+from contextlib import contextmanager
+from decimal import Decimal
+
+import pytest
+import pywaves as pw
+from web3.types import Wei
+
+from units_network import networks
+from units_network.c2e_bulk import (
+    STATUS_BROADCASTED,
+    STATUS_CONFIRMED,
+    C2EBulkSender,
+    C2EJournal,
+    C2EPayout,
+)
+from units_network.cli_utils import AssetFinder
+from units_network.e2c_runner import (
+    STATUS_FAILED,
+    STATUS_WITHDRAWN,
+    E2CBatchRunner,
+    E2CTransferRequest,
+)
+from units_network.simulator.local_network import LocalNetwork
+
+
+@pytest.fixture(scope="module")
+def local_network(tmp_path_factory):
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("UNITS_NETWORK_CACHE_DIR", str(tmp_path_factory.mktemp("cache")))
+        r = LocalNetwork(users=3, block_time=1, finalization_depth=1)
+        r.start()
+        # Blocks for eth_feeHistory
+        r.step()
+        r.step()
+        try:
+            yield r
+        finally:
+            r.stop()
+
+
+@pytest.fixture(scope="module")
+def network(local_network):
+    return networks.create_manual(local_network.network_settings)
+
+
+@contextmanager
+def stepping(local_network: LocalNetwork, interval: float = 0.1):
+    """
+    Makes steps in background, like start_clock, but faster
+    """
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            local_network.step()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stop.set()
+        thread.join()
+
+
+def test_polling_uses_block_delay_of_contract(network):
+    assert network.block_delay == 1
+    assert network.cl_chain_contract.polling.block_delay == 1
+    assert network.async_cl_chain_contract.polling.block_delay == 1
+
+
+def test_e2c_round_trip(local_network, network):
+    el_account = local_network.el_users[0]
+    cl_account = pw.Address(privateKey=local_network.cl_users[1].private_key)
+    asset = AssetFinder(network).find()
+    runner = E2CBatchRunner(network, el_account, timeout=60, poll_latency=0.1)
+    requests = [
+        E2CTransferRequest(cl_account, asset, Decimal("0.5")),
+        E2CTransferRequest(cl_account, asset, Decimal("0.25")),
+    ]
+    with stepping(local_network):
+        transfers = runner.run(requests)
+
+    assert [x.status for x in transfers] == [STATUS_WITHDRAWN] * 2, [
+        x.error for x in transfers
+    ]
+    # Sent at once with pipelined nonces
+    nonces = [network.w3.eth.get_transaction(x.send_txn_hash).nonce for x in transfers]  # type: ignore
+    assert nonces[1] == nonces[0] + 1
+    # Receipts of both transactions were requested together
+    assert runner.receipt_tracker.requests < 2 * len(transfers)
+    fees = network.bridges.native_bridge.fee_oracle.get_fees()
+    assert fees.gas_price is None and fees.max_fee_per_gas > 0
+
+
+def test_async_send_uses_fee_oracle(local_network, network):
+    el_account = local_network.el_users[2]
+    cl_account = pw.Address(privateKey=local_network.cl_users[2].private_key)
+
+    async def send():
+        bridge = network.async_bridges.native_bridge
+        try:
+            txn_hash = await bridge.send_native(cl_account, Wei(10**16), el_account)
+            receipt = await bridge.wait_for_transaction_receipt(txn_hash, 30, 0.1)
+            finalized = await network.async_cl_chain_contract.getFinalizedBlock()
+            return txn_hash, receipt, finalized
+        finally:
+            await network.close_async()
+
+    with stepping(local_network):
+        txn_hash, receipt, finalized = asyncio.run(send())
+
+    assert receipt["status"] == 1
+    assert finalized.chain_height > 0
+    # Type-2 fees, like in the sync client
+    assert network.w3.eth.get_transaction(txn_hash)["type"] == 2
+
+
+def test_e2c_batch_survives_failed_lookups(local_network, network, monkeypatch):
+    el_account = local_network.el_users[0]
+    cl_account = pw.Address(privateKey=local_network.cl_users[1].private_key)
+    asset = AssetFinder(network).find()
+    bridges = network.bridges
+    get_e2c_block = bridges.get_e2c_block
+    get_e2c_block_transfer_params = bridges.get_e2c_block_transfer_params
+    calls = {"blocks": 0, "params": 0}
+
+    def flaky_get_e2c_block(block_hash):
+        calls["blocks"] += 1
+        if calls["blocks"] == 1:
+            raise ConnectionError("Node is not available")
+        return get_e2c_block(block_hash)
+
+    def flaky_get_e2c_block_transfer_params(block, txn_hash):
+        calls["params"] += 1
+        if calls["params"] == 1:
+            raise ValueError("Not found")
+        return get_e2c_block_transfer_params(block, txn_hash)
+
+    monkeypatch.setattr(bridges, "get_e2c_block", flaky_get_e2c_block)
+    monkeypatch.setattr(
+        bridges, "get_e2c_block_transfer_params", flaky_get_e2c_block_transfer_params
+    )
+    runner = E2CBatchRunner(network, el_account, timeout=60, poll_latency=0.1)
+    with stepping(local_network):
+        transfers = runner.run(
+            [E2CTransferRequest(cl_account, asset, Decimal("0.1")) for _ in range(3)]
+        )
+
+    statuses = [x.status for x in transfers]
+    assert sorted(statuses) == [STATUS_FAILED] + [STATUS_WITHDRAWN] * 2, [
+        x.error for x in transfers
+    ]
+    failed = transfers[statuses.index(STATUS_FAILED)]
+    assert failed.error == "Can't get transfer params: Not found"
+
+
+def test_c2e_round_trip_resumes(local_network, network, tmp_path):
+    cl_account = pw.Address(privateKey=local_network.cl_users[0].private_key)
+    asset = AssetFinder(network).find(waves_asset_name="TestToken")
+    recipient = local_network.el_users[1].address
+    # Identical payouts must get different transactions
+    payouts = [C2EPayout(i, recipient, asset, Decimal("0.1")) for i in range(2)]
+    output = str(tmp_path / "results.jsonl")
+
+    # Stops before any block, like an interrupted run
+    journal = C2EJournal(output)
+    try:
+        r = C2EBulkSender(network, cl_account, journal, timeout=0).run(payouts)
+    finally:
+        journal.close()
+    assert r == {STATUS_BROADCASTED: 2}
+    ids = [journal.get(x.line)["id"] for x in payouts]
+    assert ids[0] != ids[1]
+
+    journal = C2EJournal(output)
+    try:
+        with stepping(local_network):
+            r = C2EBulkSender(
+                network, cl_account, journal, timeout=60, poll_latency=0.1
+            ).run(payouts)
+    finally:
+        journal.close()
+    assert r == {STATUS_CONFIRMED: 2}
+    # The same transactions were broadcasted again
+    assert [journal.get(x.line)["id"] for x in payouts] == ids
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+import requests
+
+from units_network import log_ranges
+from units_network.log_ranges import AsyncLogRangeScanner, LogRangeScanner
+
+TOO_LARGE = ValueError("query returned more than 10000 results")
+TIMEOUT = requests.exceptions.Timeout("Read timed out")
+RATE_LIMITED = ValueError("429 Too Many Requests")
+
+# Responses of a node in the request order: logs or an error
+SCRIPT = [
+    TOO_LARGE,
+    TIMEOUT,
+    RATE_LIMITED,
+    RATE_LIMITED,
+    [],
+    [],
+    list(range(20)),
+    [],
+]
+
+# Requested ranges: shrink twice, the same range after rate limits, grow up to the rejected size, shrink by logs
+EXPECTED_RANGES = [
+    (0, 99),
+    (0, 49),
+    (0, 24),
+    (0, 24),
+    (0, 24),
+    (25, 61),
+    (62, 104),
+    (105, 120),
+]
+
+
+class ScriptedNode:
+    def __init__(self):
+        self.responses = list(SCRIPT)
+        self.ranges = []
+
+    def get_logs(self, from_block, to_block):
+        self.ranges.append((from_block, to_block))
+        r = self.responses.pop(0)
+        if isinstance(r, Exception):
+            raise r
+        return r
+
+
+def check_scanner(scanner: LogRangeScanner, node: ScriptedNode, chunks):
+    assert node.ranges == EXPECTED_RANGES
+    assert [(x[0], x[1]) for x in chunks] == EXPECTED_RANGES[4:]
+    assert scanner.chunk_size == 21
+    assert scanner.stats.blocks == 121
+    assert scanner.stats.logs == 20
+    assert scanner.stats.failed_requests == 4
+    assert scanner.stats.rate_limited_requests == 2
+
+
+def test_scanner_adapts_to_errors(monkeypatch):
+    delays = []
+    monkeypatch.setattr(log_ranges, "sleep", delays.append)
+    node = ScriptedNode()
+    scanner = LogRangeScanner(
+        node.get_logs, chunk_size=100, target_logs=10, rate_limit_delay=0.5
+    )
+
+    chunks = list(scanner.scan_chunks(0, 120))
+
+    check_scanner(scanner, node, chunks)
+    # Exponential backoff
+    assert delays == [0.5, 1.0]
+
+
+def test_async_scanner_adapts_to_errors():
+    node = ScriptedNode()
+
+    async def get_logs(from_block, to_block):
+        return node.get_logs(from_block, to_block)
+
+    scanner = AsyncLogRangeScanner(
+        get_logs, chunk_size=100, target_logs=10, rate_limit_delay=0.001
+    )
+
+    async def scan():
+        return [x async for x in scanner.scan_chunks(0, 120)]
+
+    check_scanner(scanner, node, asyncio.run(scan()))
+
+
+def test_scanner_raises_other_errors():
+    def get_logs(from_block, to_block):
+        raise ValueError("execution reverted")
+
+    scanner = LogRangeScanner(get_logs)
+    with pytest.raises(ValueError, match="execution reverted"):
+        list(scanner.scan(0, 10))
@@ -0,0 +1,33 @@
+import json
+from functools import lru_cache
+from importlib.resources import files
+from threading import Lock
+from typing import Any, Dict, List, Tuple
+from weakref import WeakKeyDictionary
+
+
+@lru_cache(maxsize=None)
+def load_abi(name: str) -> List[Dict[str, Any]]:
+    """
+    :param name: a file name in units_network/abi without .json
+    :return: a shared ABI, don't modify it
+    """
+    return json.loads(files("units_network").joinpath(f"abi/{name}.json").read_text())
+
+
+# Web3 or AsyncWeb3 -> id(abi) -> (abi, factory). The ABI is kept, so its id isn't reused
+_factories: "WeakKeyDictionary[Any, Dict[int, Tuple[Any, Any]]]" = WeakKeyDictionary()
+_factories_lock = Lock()
+
+
+def get_contract_factory(w3, abi: List[Dict[str, Any]]):
+    """
+    :return: a contract class of w3.eth.contract(abi=abi), which is created once per Web3 instance and ABI
+    """
+    with _factories_lock:
+        by_abi = _factories.setdefault(w3, {})
+        r = by_abi.get(id(abi))
+        if r is None:
+            r = (abi, w3.eth.contract(abi=abi))
+            by_abi[id(abi)] = r
+        return r[1]
@@ -3,10 +3,10 @@ import sys
 from dataclasses import dataclass
 from decimal import Decimal
 from functools import cached_property
-from typing import Optional
+from typing import List, Optional
 
-from units_network import networks
-from units_network.networks import NetworkSettings
+from units_network import network_settings
+from units_network.network_settings import NetworkSettings
 
 
 @dataclass
@@ -20,6 +20,15 @@ class ArgsData:
     amount: Optional[Decimal] = None
     timeout: Optional[int] = None  # In seconds
     txn_hash: Optional[str] = None
+    txn_hashes: Optional[List[str]] = None
+    refresh_cache: Optional[bool] = None
+    manifest: Optional[str] = None  # A path to a JSONL file
+    output: Optional[str] = None  # A path to a JSONL file
+    workers: Optional[int] = None
+    metrics_out: Optional[str] = None  # A path to a .json or Prometheus text file
+    trace_out: Optional[str] = None  # A path to a JSON file
+    profile: Optional[str] = None  # A path to a directory
+    profile_memory: Optional[bool] = None
 
     @staticmethod
     def from_json_file(file_path: str) -> "ArgsData":
@@ -71,11 +80,11 @@ class Args:
     @cached_property
     def network_settings(self) -> NetworkSettings:
         r = (
-            networks.get_predefined_network_settings(self.chain_id)
+            network_settings.get_predefined_network_settings(self.chain_id)
             if self.chain_id
             else self.default.network_settings
         )
-        return r if r else networks.get_predefined_network_settings("S")
+        return r if r else network_settings.get_predefined_network_settings("S")
 
     @cached_property
     def asset_id(self) -> Optional[str]:
@@ -100,3 +109,55 @@ class Args:
     @cached_property
     def txn_hash(self) -> Optional[str]:
         return get_argument_value("--txn-hash") or self.default.txn_hash
+
+    @cached_property
+    def manifest(self) -> Optional[str]:
+        return get_argument_value("--manifest") or self.default.manifest
+
+    @cached_property
+    def output(self) -> Optional[str]:
+        return get_argument_value("--output") or self.default.output
+
+    @cached_property
+    def workers(self) -> int:
+        return int(get_argument_value("--workers") or self.default.workers or "8")
+
+    @cached_property
+    def metrics_out(self) -> Optional[str]:
+        return get_argument_value("--metrics-out") or self.default.metrics_out
+
+    @cached_property
+    def trace_out(self) -> Optional[str]:
+        return get_argument_value("--trace-out") or self.default.trace_out
+
+    @cached_property
+    def profile(self) -> Optional[str]:
+        return get_argument_value("--profile") or self.default.profile
+
+    @cached_property
+    def profile_memory(self) -> bool:
+        return "--profile-memory" in sys.argv or bool(self.default.profile_memory)
+
+    @cached_property
+    def refresh_cache(self) -> bool:
+        return "--refresh-cache" in sys.argv or bool(self.default.refresh_cache)
+
+    @cached_property
+    def txn_hashes(self) -> List[str]:
+        from_args = get_argument_value("--txn-hashes")
+        if from_args:
+            return [x.strip() for x in from_args.split(",") if x.strip()]
+
+        file_path = get_argument_value("--txn-hashes-file")
+        if file_path:
+            with open(file_path, "r", encoding="utf-8") as file:
+                return [x.strip() for x in file if x.strip()]
+
+        from_args = get_argument_value("--txn-hash")
+        if from_args:
+            return [from_args]
+
+        if self.default.txn_hashes:
+            return self.default.txn_hashes
+
+        return [self.default.txn_hash] if self.default.txn_hash else []
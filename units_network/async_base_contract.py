@@ -0,0 +1,186 @@
+import asyncio
+from time import monotonic
+from typing import Optional
+from weakref import WeakKeyDictionary
+
+from eth_account.datastructures import SignedTransaction
+from eth_account.signers.base import BaseAccount
+from eth_typing import ChecksumAddress, HexStr
+from web3 import AsyncWeb3
+from web3.exceptions import TransactionNotFound
+from web3.types import Nonce, TxReceipt, Wei
+
+from units_network.abi_cache import get_contract_factory
+from units_network.fee_oracle import AsyncFeeOracle, get_async_fee_oracle
+from units_network.nonce_manager import AsyncNonceManager, get_async_nonce_manager
+
+DEFAULT_MAX_CONCURRENCY = 16
+
+_limiters: "WeakKeyDictionary[AsyncWeb3, WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]]" = (WeakKeyDictionary())
+_chain_ids: "WeakKeyDictionary[AsyncWeb3, int]" = WeakKeyDictionary()
+
+
+def get_limiter(
+    w3: AsyncWeb3, max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+) -> asyncio.Semaphore:
+    """
+    Should be called in a running event loop: a semaphore works only in the loop, where it was used first
+    :return: a shared limit of concurrent requests for all contracts of w3 in the running loop.
+             max_concurrency is taken into account only by the first call
+    """
+    loop = asyncio.get_running_loop()
+    by_loop = _limiters.get(w3)
+    if by_loop is None:
+        by_loop = WeakKeyDictionary()
+        _limiters[w3] = by_loop
+    r = by_loop.get(loop)
+    if r is None:
+        r = asyncio.Semaphore(max_concurrency)
+        by_loop[loop] = r
+    return r
+
+
+async def get_chain_id(w3: AsyncWeb3) -> int:
+    r = _chain_ids.get(w3)
+    if r is None:
+        r = await w3.eth.chain_id
+        _chain_ids[w3] = r
+    return r
+
+
+class AsyncBaseContract:
+    """
+    BaseContract for AsyncWeb3. Each request to a node waits for a slot of limiter.
+    Fees and gas limits are taken from AsyncFeeOracle, like in BaseContract.
+    """
+
+    def __init__(
+        self,
+        w3: AsyncWeb3,
+        contract_address: ChecksumAddress,
+        abi,
+        nonce_manager: Optional[AsyncNonceManager] = None,
+        limiter: Optional[asyncio.Semaphore] = None,
+        fee_oracle: Optional[AsyncFeeOracle] = None,
+    ):
+        self.w3 = w3
+        self.abi = abi
+        self.contract_address = contract_address
+        self.contract = get_contract_factory(w3, abi)(address=self.contract_address)
+        self.nonce_manager = nonce_manager or get_async_nonce_manager(w3)
+        self.fee_oracle = fee_oracle or get_async_fee_oracle(w3)
+        self._limiter = limiter
+
+    @property
+    def limiter(self) -> asyncio.Semaphore:
+        """
+        The shared limiter of the running loop, if another one isn't specified
+        """
+        return self._limiter or get_limiter(self.w3)
+
+    async def send_transaction(
+        self,
+        function_name: str,
+        args,
+        sender_account: BaseAccount,
+        el_amount: Wei = Wei(0),
+        gas_price: Wei = Wei(-1),
+        nonce: Nonce = Nonce(-1),
+    ) -> HexStr:
+        """
+        :param gas_price: a legacy gas price, fees of the fee oracle if negative
+        """
+        allocated_nonce = nonce < 0
+        if allocated_nonce:
+            async with self.limiter:
+                nonce = await self.nonce_manager.allocate(sender_account.address)
+
+        try:
+            signed_tx = await self.sign_transaction(
+                function_name, args, sender_account, el_amount, gas_price, nonce
+            )
+            async with self.limiter:
+                tx_hash = await self.w3.eth.send_raw_transaction(
+                    signed_tx.raw_transaction
+                )
+        except Exception:
+            if allocated_nonce:
+                self.nonce_manager.resync(sender_account.address)
+            raise
+
+        if not allocated_nonce:
+            self.nonce_manager.observe(sender_account.address, nonce)
+        return self.w3.to_hex(tx_hash)
+
+    async def sign_transaction(
+        self,
+        function_name: str,
+        args,
+        sender_account: BaseAccount,
+        el_amount: Wei,
+        gas_price: Wei,
+        nonce: Nonce,
+    ) -> SignedTransaction:
+        """
+        :param gas_price: a legacy gas price, fees of the fee oracle if negative
+        """
+        fn = getattr(self.contract.functions, function_name)(*args)
+        call_attrs = {"from": sender_account.address}
+        if el_amount:
+            call_attrs["value"] = el_amount
+
+        async with self.limiter:
+            # Without a nonce, see BaseContract.sign_transaction
+            gas = await self.fee_oracle.estimate_gas(
+                self.contract_address, function_name, fn, call_attrs
+            )
+            fees = (
+                (await self.fee_oracle.get_fees()).to_txn_params()
+                if gas_price < 0
+                else {"gasPrice": gas_price}
+            )
+            chain_id = await get_chain_id(self.w3)
+            tx = await fn.build_transaction(
+                {
+                    **call_attrs,
+                    "chainId": chain_id,
+                    "nonce": nonce,
+                    "gas": gas,
+                    **fees,
+                }
+            )
+        return sender_account.sign_transaction(tx)
+
+    def on_receipt(self, function_name: str, receipt: TxReceipt):
+        """
+        See BaseContract.on_receipt
+        """
+        if receipt["status"] != 1:
+            self.fee_oracle.invalidate_gas(self.contract_address, function_name)
+
+    async def get_transaction_receipt(self, txn_hash: HexStr) -> Optional[TxReceipt]:
+        """
+        :return: None if the transaction is not mined yet
+        """
+        async with self.limiter:
+            try:
+                return await self.w3.eth.get_transaction_receipt(txn_hash)
+            except TransactionNotFound:
+                return None
+
+    async def wait_for_transaction_receipt(
+        self, txn_hash: HexStr, timeout: float = 120, poll_latency: float = 0.5
+    ) -> TxReceipt:
+        """
+        Unlike AsyncWeb3.eth.wait_for_transaction_receipt, doesn't hold a limiter slot between polls
+        """
+        start = monotonic()
+        while True:
+            r = await self.get_transaction_receipt(txn_hash)
+            if r is not None:
+                return r
+            if monotonic() - start >= timeout:
+                raise Exception(
+                    f"Transaction {txn_hash} is not in the chain after {timeout} seconds"
+                )
+            await asyncio.sleep(poll_latency)
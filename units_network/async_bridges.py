@@ -0,0 +1,126 @@
+import asyncio
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from eth_typing import BlockNumber, ChecksumAddress
+from hexbytes import HexBytes
+from web3 import AsyncWeb3
+from web3.types import FilterParams, LogReceipt
+
+from units_network.async_base_contract import get_limiter
+from units_network.async_native_bridge import AsyncNativeBridge
+from units_network.async_standard_bridge import AsyncStandardBridge
+from units_network.bridges import BridgesBase, E2CTransferParams
+from units_network.e2c_block_cache import E2CBlock, E2CBlockCache
+from units_network.log_ranges import AsyncLogRangeScanner
+
+
+class AsyncBridges(BridgesBase):
+    """
+    Bridges for AsyncWeb3. Blocks are requested concurrently within the limiter.
+    """
+
+    def __init__(
+        self,
+        w3: AsyncWeb3,
+        el_native_bridge_address: ChecksumAddress,
+        el_standard_bridge_address: ChecksumAddress,
+        block_cache: Optional[E2CBlockCache] = None,
+        limiter: Optional[asyncio.Semaphore] = None,
+    ):
+        self.w3 = w3
+        self._limiter = limiter
+        super().__init__(
+            AsyncNativeBridge(w3, el_native_bridge_address, limiter),
+            AsyncStandardBridge(w3, el_standard_bridge_address, limiter),
+            block_cache,
+        )
+
+    @property
+    def limiter(self) -> asyncio.Semaphore:
+        return self._limiter or get_limiter(self.w3)
+
+    async def get_e2c_transfer_params(
+        self, block_hash: HexBytes, transfer_txn_hash: HexBytes
+    ) -> E2CTransferParams:
+        r = await self.get_e2c_transfers_params([(block_hash, transfer_txn_hash)])
+        return r[0]
+
+    async def get_e2c_transfers_params(
+        self, transfers: List[Tuple[HexBytes, HexBytes]]
+    ) -> List[E2CTransferParams]:
+        """
+        :param transfers: (block hash, transfer transaction hash) pairs
+        :return: transfer params in the same order
+        """
+        txn_hashes_by_block = self.group_by_block(transfers)
+        blocks = await asyncio.gather(
+            *(self.get_e2c_block(x) for x in txn_hashes_by_block.keys())
+        )
+
+        params: Dict[Tuple[HexBytes, HexBytes], E2CTransferParams] = {}
+        for block, txn_hashes in zip(blocks, txn_hashes_by_block.values()):
+            for transfer_txn_hash in txn_hashes:
+                params[(block.block_hash, transfer_txn_hash)] = (
+                    self.get_e2c_block_transfer_params(block, transfer_txn_hash)
+                )
+
+        return [params[x] for x in transfers]
+
+    async def get_e2c_block(self, block_hash: HexBytes) -> E2CBlock:
+        r = self.block_cache.get(block_hash)
+        if r:
+            self.log.debug(f"Bridge logs in block {block_hash.to_0x_hex()} are cached")
+            return r
+
+        r = self.create_e2c_block(block_hash, await self.get_e2c_block_logs(block_hash))
+        self.block_cache.put(r)
+        return r
+
+    async def get_e2c_block_logs(self, block_hash: HexBytes) -> List[LogReceipt]:
+        async with self.limiter:
+            return await self.w3.eth.get_logs(
+                FilterParams(
+                    blockHash=block_hash,
+                    address=[
+                        self.native_bridge.contract_address,
+                        self.standard_bridge.contract_address,
+                    ],
+                )
+            )
+
+    async def get_e2c_range_logs(
+        self, from_block: BlockNumber, to_block: BlockNumber
+    ) -> List[LogReceipt]:
+        """
+        :return: only transfer logs in blocks [from_block, to_block]
+        """
+        async with self.limiter:
+            return await self.w3.eth.get_logs(
+                FilterParams(
+                    fromBlock=from_block,
+                    toBlock=to_block,
+                    address=[
+                        self.native_bridge.contract_address,
+                        self.standard_bridge.contract_address,
+                    ],
+                    topics=[self.e2c_topics],
+                )
+            )
+
+    def create_e2c_log_scanner(self, **kwargs) -> AsyncLogRangeScanner:
+        """
+        :param kwargs: LogRangeScanner settings
+        """
+        return AsyncLogRangeScanner(self.get_e2c_range_logs, **kwargs)
+
+    def scan_e2c_logs(
+        self,
+        from_block: int,
+        to_block: int,
+        scanner: Optional[AsyncLogRangeScanner] = None,
+    ) -> AsyncIterator[LogReceipt]:
+        """
+        Streams transfer logs in the block order with adaptive chunks.
+        :param scanner: pass own one to see its stats
+        """
+        return (scanner or self.create_e2c_log_scanner()).scan(from_block, to_block)
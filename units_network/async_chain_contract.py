@@ -0,0 +1,358 @@
+import asyncio
+import json
+import logging
+from time import time
+from typing import List, Optional
+from urllib.parse import quote
+
+import pywaves as pw
+from eth_typing import ChecksumAddress
+from hexbytes import HexBytes
+from web3 import Web3
+
+import units_network.exceptions
+from units_network import async_cl_transport
+from units_network.async_cl_transport import AsyncClResponse, AsyncClTransport
+from units_network.chain_contract import (
+    BLOCK_DELAY_KEY,
+    FINALIZED_BLOCK_EXPR,
+    FINALIZED_BLOCK_KEY,
+    REGISTRY_ASSET_KEY_PREFIX,
+    ChainContract,
+    ContractBlock,
+    RegistrySnapshot,
+    asset_from_details,
+    block_meta_expr,
+    block_metas_expr,
+    create_registry_snapshot,
+    parse_block_meta,
+    parse_block_metas,
+    parse_finalized_block,
+    parse_registry_entries,
+    registry_asset_ids,
+)
+from units_network.polling import (
+    DEFAULT_BLOCK_DELAY,
+    AdaptivePolling,
+    FixedPolling,
+    PollingStrategy,
+    WaitState,
+)
+
+
+class AsyncChainContract:
+    """
+    ChainContract for asyncio: reads, waiters and broadcasting without blocking a thread.
+    Transactions are prepared by ChainContract, so they are the same.
+    """
+
+    def __init__(
+        self,
+        oracleAddress: str,
+        pywaves=pw,
+        transport: Optional[AsyncClTransport] = None,
+        polling: Optional[PollingStrategy] = None,
+        blockDelay: Optional[float] = None,
+    ):
+        """
+        :param transport: the shared one of the running event loop if None
+        :param blockDelay: seconds between blocks for the default polling strategy, see getBlockDelay
+        """
+        self.pw = pywaves
+        self.oracleAddress = oracleAddress
+        self.transport = transport
+        self.polling = polling or AdaptivePolling(
+            block_delay=blockDelay or DEFAULT_BLOCK_DELAY
+        )
+        self.txBuilder = ChainContract(oracleAddress=oracleAddress, pywaves=pywaves)
+        self.log = logging.getLogger(self.__class__.__name__)
+
+    def getTransport(self) -> AsyncClTransport:
+        return self.transport or async_cl_transport.get_default()
+
+    async def close(self):
+        """
+        Closes the transport, or the shared one of the running event loop
+        """
+        if self.transport is None:
+            await async_cl_transport.close_default()
+        else:
+            await self.transport.close()
+
+    async def __aenter__(self) -> "AsyncChainContract":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def evaluate(self, query):
+        url = f"{self.pw.NODE}/utils/script/evaluate/{self.oracleAddress}"
+        response = await self.getTransport().post(url, json={"expr": query})
+        return self._getJson(response)
+
+    async def getData(self, key=None, regex=None):
+        url = f"{self.pw.NODE}/addresses/data/{self.oracleAddress}"
+        if key is not None:
+            return self._getJson(await self.getTransport().get(f"{url}/{key}"))["value"]
+        elif regex is not None:
+            url = f"{url}?matches={regex}"
+        return self._getJson(await self.getTransport().get(url))
+
+    async def getAssetsDetails(
+        self, assetIds: List[str], chunkSize: int = 100
+    ) -> List[dict]:
+        """
+        See ExtendedOracle.getAssetsDetails. Chunks are requested concurrently.
+        """
+        url = f"{self.pw.NODE}/assets/details"
+        responses = await asyncio.gather(
+            *(
+                self.getTransport().post(
+                    url, json={"ids": assetIds[start : start + chunkSize]}
+                )
+                for start in range(0, len(assetIds), chunkSize)
+            )
+        )
+        r = []
+        for response in responses:
+            r.extend(self._getJson(response))
+        return r
+
+    async def broadcastTx(self, txn: dict) -> dict:
+        """
+        Isn't retried, so a transaction is sent once
+        """
+        response = await self.getTransport().post(
+            f"{self.pw.NODE}/transactions/broadcast",
+            retry=False,
+            data=json.dumps(txn),
+            headers={"Content-Type": "application/json"},
+        )
+        # Like pw.Address.broadcastTx: a node error is returned as is
+        return response.json()
+
+    async def isContractSetup(self) -> bool:
+        r = await self.evaluate("isContractSetup()")
+        return r and r["result"] and r["result"]["value"]
+
+    async def getNativeToken(self) -> pw.Asset:
+        asset_id: str = await self.getData("tokenId")
+        details = await self.getAssetsDetails([asset_id])
+        return asset_from_details(details[0], asset_id, self.pw)
+
+    async def getElNativeBridgeAddress(self) -> ChecksumAddress:
+        return Web3.to_checksum_address(await self.getData("elBridgeAddress"))
+
+    async def getElStandardBridgeAddress(self) -> ChecksumAddress:
+        return Web3.to_checksum_address(await self.getData("elStandardBridgeAddress"))
+
+    async def getBlockDelay(self) -> Optional[int]:
+        xs = await self.getData(regex=quote(f"^{BLOCK_DELAY_KEY}$"))
+        return int(xs[0]["value"]) if xs else None
+
+    async def getRegistrySnapshot(self) -> RegistrySnapshot:
+        entries = parse_registry_entries(
+            await self.getData(regex=quote(f"^{REGISTRY_ASSET_KEY_PREFIX}.+$"))
+        )
+        details = await self.getAssetsDetails(registry_asset_ids(entries))
+        return create_registry_snapshot(entries, details, self.pw)
+
+    async def getRegisteredAssets(self) -> List[pw.Asset]:
+        return [x.cl_asset for x in (await self.getRegistrySnapshot()).assets]
+
+    async def findRegisteredAsset(self, asset_name: str) -> Optional[pw.Asset]:
+        r = (await self.getRegistrySnapshot()).find_by_name(asset_name)
+        return r.cl_asset if r else None
+
+    async def getFinalizedBlock(self) -> ContractBlock:
+        r = await self.evaluate(FINALIZED_BLOCK_EXPR)
+        try:
+            return parse_finalized_block(r)
+        except Exception:
+            self.log.debug(f"Can't get a finalized block in one request: {r}")
+
+        hash = HexBytes(Web3.to_bytes(hexstr=await self.getData(FINALIZED_BLOCK_KEY)))
+        return await self.getBlockMeta(hash)
+
+    async def getBlockMeta(self, block_hash: HexBytes) -> ContractBlock:
+        return parse_block_meta(
+            block_hash, await self.evaluate(block_meta_expr(block_hash))
+        )
+
+    async def getBlockMetas(
+        self, block_hashes: List[HexBytes], chunk_size: int = 50
+    ) -> List[Optional[ContractBlock]]:
+        """
+        See ChainContract.getBlockMetas. Chunks are requested concurrently.
+        """
+        chunks = await asyncio.gather(
+            *(
+                self._getBlockMetasChunk(block_hashes[start : start + chunk_size])
+                for start in range(0, len(block_hashes), chunk_size)
+            )
+        )
+        return [x for chunk in chunks for x in chunk]
+
+    async def _getBlockMetasChunk(
+        self, block_hashes: List[HexBytes]
+    ) -> List[Optional[ContractBlock]]:
+        if len(block_hashes) == 1:
+            try:
+                return [await self.getBlockMeta(block_hashes[0])]
+            except units_network.exceptions.BlockNotFound:
+                return [None]
+
+        r = await self.evaluate(block_metas_expr(block_hashes))
+        try:
+            return parse_block_metas(block_hashes, r)  # type: ignore
+        except Exception:
+            middle = len(block_hashes) // 2
+            left, right = await asyncio.gather(
+                self._getBlockMetasChunk(block_hashes[:middle]),
+                self._getBlockMetasChunk(block_hashes[middle:]),
+            )
+            return left + right
+
+    async def waitForFinalized(
+        self,
+        block: ContractBlock,
+        timeout: float = 60,
+        poll_latency: Optional[float] = None,
+        polling: Optional[PollingStrategy] = None,
+    ) -> WaitState:
+        """
+        See ChainContract.waitForFinalized
+        :return: polls and observed finalized blocks
+        """
+        polling = self._getPolling(poll_latency, polling)
+        state = WaitState(started_at=time(), target_height=block.chain_height)
+
+        end_time = state.started_at + timeout
+        while True:
+            curr_finalized_block = await self.getFinalizedBlock()
+            state.polls += 1
+            state.observe(
+                curr_finalized_block.chain_height, curr_finalized_block.epoch_number
+            )
+            if curr_finalized_block.chain_height >= block.chain_height:
+                self._onWaitDone(state, f"{block} finalized")
+                return state
+
+            now = time()
+            if now >= end_time:
+                break
+
+            await asyncio.sleep(min(polling.next_delay(state), end_time - now))
+        self._onWaitDone(state, f"{block} not finalized")
+        raise units_network.exceptions.TimeExhausted(
+            f"Block {block.hash.to_0x_hex()} not finalized on contract in {timeout} seconds. Try to increase --timeout"
+        )
+
+    async def waitForBlock(
+        self,
+        block_hash: HexBytes,
+        timeout: float = 60,
+        poll_latency: Optional[float] = None,
+        polling: Optional[PollingStrategy] = None,
+    ) -> ContractBlock:
+        """
+        See ChainContract.waitForBlock
+        """
+        self.log.debug(f"Wait for {block_hash.to_0x_hex()} on chain contract")
+        polling = self._getPolling(poll_latency, polling)
+        state = WaitState(started_at=time())
+
+        end_time = state.started_at + timeout
+        while True:
+            try:
+                state.polls += 1
+                r = await self.getBlockMeta(block_hash)
+                self._onWaitDone(state, f"{r} found")
+                return r
+            except units_network.exceptions.BlockNotFound:
+                pass
+
+            now = time()
+            if now >= end_time:
+                break
+
+            await asyncio.sleep(min(polling.next_delay(state), end_time - now))
+        self._onWaitDone(state, f"{block_hash.to_0x_hex()} not found")
+        raise units_network.exceptions.TimeExhausted(
+            f"Block {block_hash.to_0x_hex()} not found on contract in {timeout} seconds. Try to increase --timeout"
+        )
+
+    async def transfer(
+        self,
+        fromWavesAccount: pw.Address,
+        toEthAddress: ChecksumAddress,
+        token: pw.Asset,
+        atomicAmount: int,
+        txFee: int = 500_000,
+    ):
+        return await self.broadcastTx(
+            self.txBuilder.prepareTransfer(
+                fromWavesAccount, toEthAddress, token, atomicAmount, txFee
+            )
+        )
+
+    async def withdraw(
+        self,
+        sender: pw.Address,
+        blockHashWithTransfer: HexBytes,
+        merkleProofs: List[HexBytes],
+        transferIndexInBlock: int,
+        clAmount: int,
+        txFee: int = 500_000,
+    ):
+        return await self.broadcastTx(
+            self.txBuilder.prepareWithdraw(
+                sender,
+                blockHashWithTransfer,
+                merkleProofs,
+                transferIndexInBlock,
+                clAmount,
+                txFee,
+            )
+        )
+
+    async def withdrawAsset(
+        self,
+        sender: pw.Address,
+        blockHashWithTransfer: HexBytes,
+        merkleProofs: List[HexBytes],
+        transferIndexInBlock: int,
+        atomicAmount: int,
+        asset: pw.Asset,
+        txFee: int = 500_000,
+    ):
+        return await self.broadcastTx(
+            self.txBuilder.prepareWithdrawAsset(
+                sender,
+                blockHashWithTransfer,
+                merkleProofs,
+                transferIndexInBlock,
+                atomicAmount,
+                asset,
+                txFee,
+            )
+        )
+
+    def _getPolling(
+        self, poll_latency: Optional[float], polling: Optional[PollingStrategy]
+    ) -> PollingStrategy:
+        if polling:
+            return polling
+        elif poll_latency is not None:
+            return FixedPolling(poll_latency)
+        return self.polling
+
+    def _onWaitDone(self, state: WaitState, message: str):
+        self.log.debug(f"{message} after {state.polls} polls in {state.elapsed:.1f}s")
+
+    @staticmethod
+    def _getJson(response: AsyncClResponse):
+        if response.status_code == 200:
+            return response.json()
+        else:
+            raise Exception(f"Error: {response.status_code}, {response.text}")
@@ -0,0 +1,139 @@
+import asyncio
+import json
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Any, Optional
+from weakref import WeakKeyDictionary
+
+import aiohttp
+
+from units_network import metrics
+from units_network.cl_transport import ClTransportSettings
+from units_network.metrics import MetricsRegistry
+
+
+@dataclass
+class AsyncClResponse:
+    status_code: int
+    text: str
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+class AsyncClTransport:
+    """
+    ClTransport for asyncio: one aiohttp session with a connection pool.
+    The pool limits concurrent requests: max_connections_per_host to each of max_hosts hosts.
+    Close it with close() or use as an async context manager, see also close_default.
+    """
+
+    def __init__(
+        self,
+        settings: Optional[ClTransportSettings] = None,
+        registry: Optional[MetricsRegistry] = None,
+    ):
+        """
+        :param registry: records requests, the shared one if None
+        """
+        self.settings = settings or ClTransportSettings()
+        self.registry = registry or metrics.get_default()
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connect_timeout, read_timeout = self.settings.timeout
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.settings.max_hosts
+                    * self.settings.max_connections_per_host,
+                    limit_per_host=self.settings.max_connections_per_host,
+                ),
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=connect_timeout, sock_read=read_timeout
+                ),
+                headers={"Accept-Encoding": "gzip, deflate"},
+            )
+        return self._session
+
+    async def get(self, url: str, **kwargs) -> AsyncClResponse:
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url: str, retry: bool = True, **kwargs) -> AsyncClResponse:
+        """
+        :param retry: False for not idempotent requests, e.g. broadcasting
+        """
+        return await self.request("POST", url, retry=retry, **kwargs)
+
+    async def request(
+        self, method: str, url: str, retry: bool = True, **kwargs
+    ) -> AsyncClResponse:
+        retries = self.settings.retries if retry else 0
+        attempt = 0
+        while True:
+            start = perf_counter()
+            r = None
+            try:
+                async with self.session.request(method, url, **kwargs) as response:
+                    r = AsyncClResponse(response.status, await response.text())
+                if attempt >= retries or (
+                    r.status_code not in self.settings.retry_on_statuses
+                ):
+                    return r
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= retries:
+                    raise
+            finally:
+                self.registry.record(
+                    metrics.CLIENT_CL,
+                    metrics.cl_method(method, url),
+                    perf_counter() - start,
+                    r is None or r.status_code >= 400,
+                    (
+                        len(json.dumps(kwargs["json"]))
+                        if "json" in kwargs
+                        else len(kwargs.get("data") or "")
+                    ),
+                    len(r.text) if r is not None else 0,
+                )
+
+            attempt += 1
+            await asyncio.sleep(self.settings.backoff_factor * 2 ** (attempt - 1))
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> "AsyncClTransport":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+_defaults: "WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncClTransport]" = (
+    WeakKeyDictionary()
+)
+
+
+def get_default() -> AsyncClTransport:
+    """
+    :return: a shared transport of the running event loop
+    """
+    loop = asyncio.get_running_loop()
+    r = _defaults.get(loop)
+    if r is None:
+        r = AsyncClTransport()
+        _defaults[loop] = r
+    return r
+
+
+async def close_default():
+    """
+    Closes the shared transport of the running event loop, call before the loop stops
+    """
+    r = _defaults.pop(asyncio.get_running_loop(), None)
+    if r is not None:
+        await r.close()
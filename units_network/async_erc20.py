@@ -0,0 +1,63 @@
+import asyncio
+from typing import Optional
+
+from eth_account.signers.base import BaseAccount
+from eth_typing import ChecksumAddress, HexStr
+from web3 import AsyncWeb3
+from web3.types import Wei
+
+from units_network.abi_cache import load_abi
+from units_network.async_base_contract import AsyncBaseContract
+
+
+class AsyncErc20(AsyncBaseContract):
+    def __init__(
+        self,
+        w3: AsyncWeb3,
+        contract_address: ChecksumAddress,
+        name: Optional[str] = None,
+        decimals: Optional[int] = None,
+        limiter: Optional[asyncio.Semaphore] = None,
+    ):
+        """
+        :param name: a known name, requested from the contract on the first get_name() if None
+        :param decimals: known decimals, requested from the contract on the first get_decimals() if None
+        """
+        abi = load_abi("Erc20")
+        super().__init__(w3, contract_address, abi, limiter=limiter)
+        self.name = name
+        self.decimals = decimals
+
+    async def get_name(self) -> str:
+        if self.name is None:
+            async with self.limiter:
+                self.name = await self.contract.functions.name().call()
+        return self.name
+
+    async def get_decimals(self) -> int:
+        if self.decimals is None:
+            async with self.limiter:
+                self.decimals = await self.contract.functions.decimals().call()
+        return self.decimals
+
+    async def get_balance(self, address: ChecksumAddress) -> Wei:
+        async with self.limiter:
+            return await self.contract.functions.balanceOf(address).call(
+                block_identifier="pending"
+            )
+
+    async def approve(
+        self, spender_address: ChecksumAddress, amount: Wei, sender_account: BaseAccount
+    ) -> HexStr:
+        return await self.send_transaction(
+            "approve",
+            [spender_address, amount],
+            sender_account,
+        )
+
+    async def transfer(
+        self, to_address: ChecksumAddress, amount: Wei, sender_account: BaseAccount
+    ) -> HexStr:
+        return await self.send_transaction(
+            "transfer", [to_address, amount], sender_account
+        )
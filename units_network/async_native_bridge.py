@@ -0,0 +1,41 @@
+import asyncio
+from typing import Optional
+
+import pywaves as pw
+from eth_account.signers.base import BaseAccount
+from eth_typing import ChecksumAddress, HexStr
+from web3 import AsyncWeb3
+from web3.types import Nonce, Wei
+
+from units_network import common_utils
+from units_network.abi_cache import load_abi
+from units_network.async_base_contract import AsyncBaseContract
+from units_network.native_bridge import NativeBridgeEvents
+
+
+class AsyncNativeBridge(NativeBridgeEvents, AsyncBaseContract):
+    def __init__(
+        self,
+        w3: AsyncWeb3,
+        contract_address: ChecksumAddress,
+        limiter: Optional[asyncio.Semaphore] = None,
+    ):
+        abi = load_abi("NativeBridge")
+        super().__init__(w3, contract_address, abi, limiter=limiter)
+
+    async def send_native(
+        self,
+        cl_to: pw.Address,
+        el_amount: Wei,
+        sender_account: BaseAccount,
+        gas_price: Wei = Wei(-1),
+        nonce: Nonce = Nonce(-1),
+    ) -> HexStr:
+        return await self.send_transaction(
+            "sendNative",
+            [common_utils.waves_public_key_hash_bytes(cl_to)],
+            sender_account,
+            el_amount,
+            gas_price,
+            nonce,
+        )
@@ -0,0 +1,39 @@
+import asyncio
+from typing import Optional
+
+from eth_account.signers.base import BaseAccount
+from eth_typing import ChecksumAddress, HexAddress, HexStr
+from web3 import AsyncWeb3
+from web3.types import Wei
+
+from units_network.abi_cache import load_abi
+from units_network.async_base_contract import AsyncBaseContract
+from units_network.standard_bridge import StandardBridgeEvents
+
+
+class AsyncStandardBridge(StandardBridgeEvents, AsyncBaseContract):
+    def __init__(
+        self,
+        w3: AsyncWeb3,
+        contract_address: ChecksumAddress,
+        limiter: Optional[asyncio.Semaphore] = None,
+    ):
+        abi = load_abi("StandardBridge")
+        super().__init__(w3, contract_address, abi, limiter=limiter)
+
+    async def bridge_erc20(
+        self,
+        token: ChecksumAddress,
+        cl_to: HexAddress,
+        el_amount: Wei,
+        sender_account: BaseAccount,
+    ) -> HexStr:
+        return await self.send_transaction(
+            "bridgeERC20",
+            [token, cl_to, el_amount],
+            sender_account,
+        )
+
+    async def token_ratio(self, token: ChecksumAddress):
+        async with self.limiter:
+            return await self.contract.functions.tokenRatios(token).call()
@@ -1,17 +1,69 @@
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, List, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+from eth_account.datastructures import SignedTransaction
 from eth_account.signers.base import BaseAccount
 from eth_typing import ChecksumAddress, HexStr
 from web3 import Web3
-from web3.types import Nonce, Wei
+from web3.types import Nonce, RPCEndpoint, TxReceipt, Wei
+
+from units_network import rpc_metrics
+from units_network.abi_cache import get_contract_factory
+from units_network.fee_oracle import FeeOracle, get_fee_oracle
+from units_network.nonce_manager import NonceManager, get_nonce_manager
+from units_network.receipt_tracker import (
+    ReceiptTracker,
+    TrackedReceipt,
+    get_receipt_tracker,
+)
+
+_chain_ids: "WeakKeyDictionary[Web3, int]" = WeakKeyDictionary()
+_chain_ids_lock = Lock()
+
+
+def get_chain_id(w3: Web3) -> int:
+    with _chain_ids_lock:
+        r = _chain_ids.get(w3)
+        if r is None:
+            r = w3.eth.chain_id
+            _chain_ids[w3] = r
+        return r
+
+
+@dataclass
+class ContractCall:
+    function_name: str
+    args: List[Any]
+    el_amount: Wei = Wei(0)
+
+
+@dataclass
+class PipelinedTransaction:
+    nonce: Nonce
+    txn_hash: HexStr
+    # None if the transaction was accepted by a node
+    error: Optional[str] = None
 
 
 class BaseContract:
-    def __init__(self, w3: Web3, contract_address: ChecksumAddress, abi):
+    def __init__(
+        self,
+        w3: Web3,
+        contract_address: ChecksumAddress,
+        abi,
+        nonce_manager: Optional[NonceManager] = None,
+        receipt_tracker: Optional[ReceiptTracker] = None,
+        fee_oracle: Optional[FeeOracle] = None,
+    ):
         self.w3 = w3
         self.abi = abi
         self.contract_address = contract_address
-        self.contract = self.w3.eth.contract(
-            address=self.contract_address, abi=self.abi
-        )
+        self.contract = get_contract_factory(w3, abi)(address=self.contract_address)
+        self.nonce_manager = nonce_manager or get_nonce_manager(w3)
+        self.receipt_tracker = receipt_tracker or get_receipt_tracker(w3)
+        self.fee_oracle = fee_oracle or get_fee_oracle(w3)
 
     def send_transaction(
         self,
@@ -22,25 +74,168 @@ class BaseContract:
         gas_price: Wei = Wei(-1),
         nonce: Nonce = Nonce(-1),
     ) -> HexStr:
-        gas_price = self.w3.eth.gas_price if gas_price < 0 else gas_price
-        nonce = (
-            self.w3.eth.get_transaction_count(sender_account.address, "pending")
-            if (nonce < 0)
-            else nonce
-        )
+        """
+        :param gas_price: a legacy gas price, fees of the fee oracle if negative
+        """
+        allocated_nonce = nonce < 0
+        if allocated_nonce:
+            nonce = self.nonce_manager.allocate(sender_account.address)
 
-        attrs = {
-            "chainId": self.w3.eth.chain_id,
-            "from": sender_account.address,
-            "nonce": nonce,
-            "gasPrice": gas_price,
-        }
+        try:
+            signed_tx = self.sign_transaction(
+                function_name, args, sender_account, el_amount, gas_price, nonce
+            )
+            tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        except Exception:
+            if allocated_nonce:
+                self.nonce_manager.resync(sender_account.address)
+            raise
+
+        if not allocated_nonce:
+            self.nonce_manager.observe(sender_account.address, nonce)
+        return self.w3.to_hex(tx_hash)
+
+    def sign_transaction(
+        self,
+        function_name: str,
+        args,
+        sender_account: BaseAccount,
+        el_amount: Wei,
+        gas_price: Wei,
+        nonce: Nonce,
+    ) -> SignedTransaction:
+        """
+        :param gas_price: a legacy gas price, fees of the fee oracle if negative
+        """
+        fn = getattr(self.contract.functions, function_name)(*args)
+        call_attrs = {"from": sender_account.address}
         if el_amount:
-            attrs["value"] = el_amount
+            call_attrs["value"] = el_amount
 
-        tx = getattr(self.contract.functions, function_name)(*args).build_transaction(
-            attrs
+        # Without a nonce, because it can be ahead of the pending one during pipelined sending
+        gas = self.fee_oracle.estimate_gas(
+            self.contract_address, function_name, fn, call_attrs
         )
-        signed_tx = sender_account.sign_transaction(tx)
-        tx_hash = self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
-        return self.w3.to_hex(tx_hash)
+        fees = (
+            self.fee_oracle.get_fees().to_txn_params()
+            if gas_price < 0
+            else {"gasPrice": gas_price}
+        )
+        tx = fn.build_transaction(
+            {
+                **call_attrs,
+                "chainId": get_chain_id(self.w3),
+                "nonce": nonce,
+                "gas": gas,
+                **fees,
+            }
+        )
+        return sender_account.sign_transaction(tx)
+
+    def send_transactions(
+        self,
+        calls: List[ContractCall],
+        sender_account: BaseAccount,
+        gas_price: Wei = Wei(-1),
+        batch_size: int = 100,
+    ) -> List[PipelinedTransaction]:
+        """
+        Signs all transactions with consecutive nonces and sends them with JSON-RPC batches of eth_sendRawTransaction,
+        or one by one if batches aren't supported.
+        :return: results in the same order. A transaction without a response in a batch has an error, though it could be
+                 accepted. Transactions after a failed one will stay pending until the gap is filled
+        """
+        sender_address = sender_account.address
+
+        signed_txs = []
+        try:
+            for call in calls:
+                nonce = self.nonce_manager.allocate(sender_address)
+                signed_tx = self.sign_transaction(
+                    call.function_name,
+                    call.args,
+                    sender_account,
+                    call.el_amount,
+                    gas_price,
+                    nonce,
+                )
+                signed_txs.append((nonce, signed_tx))
+        except Exception:
+            self.nonce_manager.resync(sender_address)
+            raise
+
+        r: List[PipelinedTransaction] = []
+        try:
+            for start in range(0, len(signed_txs), batch_size):
+                r.extend(self._send_batch(signed_txs[start : start + batch_size]))
+        except Exception:
+            # Some of allocated nonces could be not sent
+            self.nonce_manager.resync(sender_address)
+            raise
+
+        if any(x.error for x in r):
+            self.nonce_manager.resync(sender_address)
+        return r
+
+    def _send_batch(
+        self, batch: List[Tuple[Nonce, SignedTransaction]]
+    ) -> List[PipelinedTransaction]:
+        try:
+            responses = rpc_metrics.make_batch_request(
+                self.w3,
+                [
+                    (
+                        RPCEndpoint("eth_sendRawTransaction"),
+                        [self.w3.to_hex(signed_tx.raw_transaction)],
+                    )
+                    for _, signed_tx in batch
+                ],
+            )
+        except rpc_metrics.BatchNotSupported:
+            return [self._send_one(nonce, signed_tx) for nonce, signed_tx in batch]
+
+        r = []
+        for (nonce, signed_tx), response in zip(batch, responses):
+            if response is None:
+                error = "No response in a batch"
+            else:
+                error = response.get("error")
+            r.append(
+                PipelinedTransaction(
+                    nonce=nonce,
+                    txn_hash=self.w3.to_hex(signed_tx.hash),
+                    error=str(error) if error else None,
+                )
+            )
+        return r
+
+    def _send_one(
+        self, nonce: Nonce, signed_tx: SignedTransaction
+    ) -> PipelinedTransaction:
+        error = None
+        try:
+            self.w3.eth.send_raw_transaction(signed_tx.raw_transaction)
+        except Exception as e:
+            error = str(e)
+        return PipelinedTransaction(
+            nonce=nonce, txn_hash=self.w3.to_hex(signed_tx.hash), error=error
+        )
+
+    def on_receipt(self, function_name: str, receipt: TxReceipt):
+        """
+        Forgets a cached gas limit of the function, if its transaction failed, e.g. ran out of gas
+        """
+        if receipt["status"] != 1:
+            self.fee_oracle.invalidate_gas(self.contract_address, function_name)
+
+    def wait_for_transaction_receipts(
+        self,
+        txn_hashes: List[HexStr],
+        timeout: float = 120,
+        sent_at: Optional[float] = None,
+    ) -> List[TrackedReceipt]:
+        """
+        Waits for many transactions with a few requests per poll, see ReceiptTracker
+        :return: receipts in the same order
+        """
+        return self.receipt_tracker.wait(txn_hashes, timeout, sent_at)
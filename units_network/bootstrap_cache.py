@@ -0,0 +1,116 @@
+import json
+import logging
+import os
+from time import time
+from typing import Any, Callable, Dict, Optional
+
+CACHE_VERSION = 1
+DEFAULT_TTL = 24 * 60 * 60  # In seconds
+
+
+def get_default_cache_dir() -> str:
+    r = os.getenv("UNITS_NETWORK_CACHE_DIR")
+    if r:
+        return r
+
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(
+        os.path.expanduser("~"), ".cache"
+    )
+    return os.path.join(base, "units-network")
+
+
+class BootstrapCache:
+    """
+    A local file with rarely changed chain contract metadata: bridge addresses, the native token, ERC20 details.
+    After the TTL the cache is checked with a validation probe once and either prolonged or dropped.
+    """
+
+    def __init__(
+        self,
+        chain_contract_address: str,
+        cache_dir: Optional[str] = None,
+        ttl: float = DEFAULT_TTL,
+        refresh: bool = False,
+    ):
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.path = os.path.join(
+            cache_dir or get_default_cache_dir(), f"{chain_contract_address}.json"
+        )
+        self.ttl = ttl
+        self.saved_at = 0.0
+        self.values: Dict[str, Any] = {}
+        if refresh:
+            self.log.debug(f"Ignore {self.path}, will be refreshed")
+        else:
+            self._load()
+
+    @property
+    def is_expired(self) -> bool:
+        return time() - self.saved_at >= self.ttl
+
+    def get_or_load(self, key: str, loader: Callable[[], Any]) -> Any:
+        if key in self.values:
+            return self.values[key]
+
+        value = loader()
+        self.values[key] = value
+        # Doesn't prolong other values
+        self._save(touch=self.saved_at == 0)
+        return value
+
+    def validate(self, probe: Callable[[Dict[str, Any]], bool]):
+        """
+        Checks cached values with probe if the cache is expired
+        :param probe: returns True if values are actual
+        """
+        if not (self.values and self.is_expired):
+            return
+
+        if probe(self.values):
+            self.log.debug(f"{self.path} is valid, prolong")
+            self._save(touch=True)
+        else:
+            self.log.info(f"{self.path} is outdated, drop")
+            self.clear()
+
+    def clear(self):
+        self.values = {}
+        self.saved_at = 0.0
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            self.log.warning(f"Can't read {self.path}: {e}")
+            return
+
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            self.log.debug(f"Ignore {self.path} of an unsupported version")
+            return
+
+        self.saved_at = float(data.get("saved_at", 0))
+        self.values = data.get("values", {})
+
+    def _save(self, touch: bool):
+        if touch:
+            self.saved_at = time()
+        data = {
+            "version": CACHE_VERSION,
+            "saved_at": self.saved_at,
+            "values": self.values,
+        }
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as file:
+                json.dump(data, file)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.log.warning(f"Can't write {self.path}: {e}")
@@ -1,16 +1,24 @@
 import logging
 from dataclasses import dataclass
-from typing import List, Optional, Union
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple, Union
 
-from eth_typing import ChecksumAddress, HexStr
+from eth_typing import BlockNumber, ChecksumAddress, HexStr
 from hexbytes import HexBytes
 from web3 import Web3
 from web3.types import FilterParams, LogReceipt
 
-from units_network.merkle import get_merkle_proofs
+from units_network import tracing
+from units_network.e2c_block_cache import E2CBlock, E2CBlockCache
+from units_network.e2c_log_decoder import E2CLogDecoder
+from units_network.log_ranges import LogRangeScanner
+from units_network.merkle import E2CMerkleTree
 from units_network.native_bridge import NativeBridge, SentNative
 from units_network.standard_bridge import ERC20BridgeInitiatedEvent, StandardBridge
 
+if TYPE_CHECKING:
+    from units_network.async_native_bridge import AsyncNativeBridge
+    from units_network.async_standard_bridge import AsyncStandardBridge
+
 
 @dataclass()
 class E2CTransferParams:
@@ -19,18 +27,22 @@ class E2CTransferParams:
     transfer_index_in_block: int
 
 
-class Bridges(object):
+class BridgesBase:
+    """
+    Parsing of bridge logs and building of transfer params, shared by Bridges and AsyncBridges
+    """
+
     def __init__(
         self,
-        w3: Web3,
-        el_native_bridge_address: ChecksumAddress,
-        el_standard_bridge_address: ChecksumAddress,
+        native_bridge: Union[NativeBridge, "AsyncNativeBridge"],
+        standard_bridge: Union[StandardBridge, "AsyncStandardBridge"],
+        block_cache: Optional[E2CBlockCache] = None,
     ):
-        self.log = logging.getLogger(__class__.__name__)
-        self.w3 = w3
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.block_cache = E2CBlockCache() if block_cache is None else block_cache
 
-        self.native_bridge = NativeBridge(w3, el_native_bridge_address)
-        self.standard_bridge = StandardBridge(w3, el_standard_bridge_address)
+        self.native_bridge = native_bridge
+        self.standard_bridge = standard_bridge
 
         self.e2c_topics = [
             self.native_bridge.sent_native_topic,
@@ -38,52 +50,84 @@ class Bridges(object):
         ]
         str_topics = ", ".join(self.e2c_topics)
         self.log.debug(f"Topics: {str_topics}")
+        self.e2c_log_decoder = E2CLogDecoder(
+            HexBytes(self.native_bridge.sent_native_topic),
+            HexBytes(self.standard_bridge.erc20_bridge_initiated_topic),
+        )
 
-    def get_e2c_transfer_params(
-        self, block_hash: HexBytes, transfer_txn_hash: HexBytes
+    def group_by_block(
+        self, transfers: List[Tuple[HexBytes, HexBytes]]
+    ) -> Dict[HexBytes, List[HexBytes]]:
+        """
+        :param transfers: (block hash, transfer transaction hash) pairs
+        :return: block hash -> transfer transaction hashes
+        """
+        r: Dict[HexBytes, List[HexBytes]] = {}
+        for block_hash, transfer_txn_hash in transfers:
+            r.setdefault(block_hash, []).append(transfer_txn_hash)
+        return r
+
+    def get_e2c_block_transfer_params(
+        self, block: E2CBlock, transfer_txn_hash: HexBytes
     ) -> E2CTransferParams:
-        block_logs = self.get_e2c_block_logs(block_hash)
+        transfer_index_in_block = block.transfer_indexes.get(transfer_txn_hash, -1)
         self.log.debug(
-            f"Bridge logs in block {block_hash.to_0x_hex()}: {Web3.to_json(block_logs)}"  # type: ignore
+            f"Found transfer transaction {transfer_txn_hash.to_0x_hex()} at #{transfer_index_in_block}"
         )
-
-        merkle_leaves = self.get_e2c_merkle_leaves(block_logs)
-        transfer_index_in_block = -1
-        for i, log in enumerate(block_logs):
-            if log["transactionHash"] == transfer_txn_hash:
-                self.log.debug(f"Found transfer transaction at #{i}")
-                transfer_index_in_block = i
-
         return E2CTransferParams(
-            block_with_transfer_hash=block_hash,
-            merkle_proofs=get_merkle_proofs(merkle_leaves, transfer_index_in_block),
+            block_with_transfer_hash=block.block_hash,
+            merkle_proofs=block.merkle_tree.get_proofs(transfer_index_in_block),
             transfer_index_in_block=transfer_index_in_block,
         )
 
-    def get_e2c_block_logs(self, block_hash: HexBytes) -> List[LogReceipt]:
-        return self.w3.eth.get_logs(
-            FilterParams(
-                blockHash=block_hash,
-                address=[
-                    self.native_bridge.contract_address,
-                    self.standard_bridge.contract_address,
-                ],
-            )
+    def create_e2c_block(
+        self, block_hash: HexBytes, block_logs: List[LogReceipt]
+    ) -> E2CBlock:
+        self.log.debug(
+            f"Bridge logs in block {block_hash.to_0x_hex()}: {Web3.to_json(block_logs)}"  # type: ignore
         )
 
-    def get_e2c_merkle_leaves(self, block_logs: List[LogReceipt]) -> List[HexBytes]:
-        merkle_leaves: List[HexBytes] = []
+        events = []
+        transfer_indexes: Dict[HexBytes, int] = {}
         for i, log in enumerate(block_logs):
             evt = self.parse_e2c_event(log)
-            if not evt:
-                continue
-            self.log.debug(f"Parsed event at #{i}: {evt}")
-            merkle_leaves.append(evt.to_merkle_leaf())
+            if evt:
+                self.log.debug(f"Parsed event at #{i}: {evt}")
+            events.append(evt)
+            transfer_indexes[log["transactionHash"]] = i
+
+        return E2CBlock(
+            block_hash=block_hash,
+            events=events,
+            transfer_indexes=transfer_indexes,
+            merkle_tree=E2CMerkleTree(self.get_e2c_merkle_leaves(block_logs)),
+        )
+
+    def invalidate_e2c_block(self, block_hash: Optional[HexBytes] = None):
+        """
+        :param block_hash: a block to remove from the cache, all blocks if None
+        """
+        self.block_cache.invalidate(block_hash)
+
+    def get_e2c_merkle_leaves(self, block_logs: List[LogReceipt]) -> List[HexBytes]:
+        merkle_leaves: List[HexBytes] = []
+        for log in block_logs:
+            leaf = self.e2c_log_decoder.to_merkle_leaf(log)
+            if leaf is not None:
+                merkle_leaves.append(HexBytes(leaf))
         return merkle_leaves
 
     def parse_e2c_event(
         self, log: LogReceipt
     ) -> Optional[Union[SentNative, ERC20BridgeInitiatedEvent]]:
+        return self.e2c_log_decoder.decode(log)
+
+    def parse_e2c_event_with_abi(
+        self, log: LogReceipt
+    ) -> Optional[Union[SentNative, ERC20BridgeInitiatedEvent]]:
+        """
+        A reference for parse_e2c_event: slower, uses web3 ABI decoding
+        """
         topics = log["topics"]
         if len(topics) == 0:
             return None
@@ -95,3 +139,101 @@ class Bridges(object):
             return self.standard_bridge.parse_erc20_bridge_initiated(log)
 
         return None
+
+
+class Bridges(BridgesBase):
+    def __init__(
+        self,
+        w3: Web3,
+        el_native_bridge_address: ChecksumAddress,
+        el_standard_bridge_address: ChecksumAddress,
+        block_cache: Optional[E2CBlockCache] = None,
+    ):
+        self.w3 = w3
+        super().__init__(
+            NativeBridge(w3, el_native_bridge_address),
+            StandardBridge(w3, el_standard_bridge_address),
+            block_cache,
+        )
+
+    def get_e2c_transfer_params(
+        self, block_hash: HexBytes, transfer_txn_hash: HexBytes
+    ) -> E2CTransferParams:
+        return self.get_e2c_transfers_params([(block_hash, transfer_txn_hash)])[0]
+
+    def get_e2c_transfers_params(
+        self, transfers: List[Tuple[HexBytes, HexBytes]]
+    ) -> List[E2CTransferParams]:
+        """
+        :param transfers: (block hash, transfer transaction hash) pairs
+        :return: transfer params in the same order. Logs are requested and a tree is built once per block
+        """
+        params: Dict[Tuple[HexBytes, HexBytes], E2CTransferParams] = {}
+        for block_hash, txn_hashes in self.group_by_block(transfers).items():
+            block = self.get_e2c_block(block_hash)
+            for transfer_txn_hash in txn_hashes:
+                params[(block_hash, transfer_txn_hash)] = (
+                    self.get_e2c_block_transfer_params(block, transfer_txn_hash)
+                )
+
+        return [params[x] for x in transfers]
+
+    def get_e2c_block(self, block_hash: HexBytes) -> E2CBlock:
+        r = self.block_cache.get(block_hash)
+        if r:
+            self.log.debug(f"Bridge logs in block {block_hash.to_0x_hex()} are cached")
+            return r
+
+        with tracing.span("logs"):
+            block_logs = self.get_e2c_block_logs(block_hash)
+        with tracing.span("proof"):
+            r = self.create_e2c_block(block_hash, block_logs)
+        self.block_cache.put(r)
+        return r
+
+    def get_e2c_block_logs(self, block_hash: HexBytes) -> List[LogReceipt]:
+        return self.w3.eth.get_logs(
+            FilterParams(
+                blockHash=block_hash,
+                address=[
+                    self.native_bridge.contract_address,
+                    self.standard_bridge.contract_address,
+                ],
+            )
+        )
+
+    def get_e2c_range_logs(
+        self, from_block: BlockNumber, to_block: BlockNumber
+    ) -> List[LogReceipt]:
+        """
+        :return: only transfer logs in blocks [from_block, to_block]
+        """
+        return self.w3.eth.get_logs(
+            FilterParams(
+                fromBlock=from_block,
+                toBlock=to_block,
+                address=[
+                    self.native_bridge.contract_address,
+                    self.standard_bridge.contract_address,
+                ],
+                topics=[self.e2c_topics],
+            )
+        )
+
+    def create_e2c_log_scanner(self, **kwargs) -> LogRangeScanner:
+        """
+        :param kwargs: LogRangeScanner settings
+        """
+        return LogRangeScanner(self.get_e2c_range_logs, **kwargs)
+
+    def scan_e2c_logs(
+        self,
+        from_block: int,
+        to_block: int,
+        scanner: Optional[LogRangeScanner] = None,
+    ) -> Iterator[LogReceipt]:
+        """
+        Streams transfer logs in the block order with adaptive chunks.
+        :param scanner: pass own one to see its stats
+        """
+        return (scanner or self.create_e2c_log_scanner()).scan(from_block, to_block)
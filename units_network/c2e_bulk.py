@@ -0,0 +1,265 @@
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from decimal import Decimal
+from threading import Lock
+from time import sleep, time
+from typing import Any, Dict, List
+
+import pywaves as pw
+from eth_typing import ChecksumAddress
+
+from units_network import units
+from units_network.cl_transport import ClTransport, ClTransportSettings
+from units_network.cli_utils import FoundAsset
+from units_network.confirmation_tracker import ConfirmationTracker, TransactionStatus
+from units_network.networks import Network
+
+STATUS_PENDING = "pending"
+STATUS_SIGNED = "signed"
+STATUS_BROADCASTED = "broadcasted"
+STATUS_CONFIRMED = "confirmed"
+STATUS_FAILED = "failed"
+
+# Parts of node error messages, when a transaction was broadcasted before
+ALREADY_BROADCASTED_MARKERS = ["already in the state", "already in utx"]
+
+
+@dataclass
+class C2EPayout:
+    # A line number in a manifest, identifies the payout in an output file
+    line: int
+    recipient: ChecksumAddress
+    asset: FoundAsset
+    amount: Decimal
+
+
+class C2EJournal:
+    """
+    An append-only JSONL file with payout states. The last record of a line wins.
+    A signed transaction is written before broadcasting, so a resumed run broadcasts the same transaction again instead
+    of a new one.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.records: Dict[int, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                for x in file:
+                    if x.strip():
+                        record = json.loads(x)
+                        self.records[record["line"]] = {
+                            **self.records.get(record["line"], {}),
+                            **record,
+                        }
+        self._lock = Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def get(self, line: int) -> Dict[str, Any]:
+        return self.records.get(line, {})
+
+    def write(self, line: int, **fields):
+        with self._lock:
+            self.records[line] = {**self.records.get(line, {}), **fields}
+            self._file.write(json.dumps({"line": line, **fields}) + "\n")
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class C2EBulkSender:
+    """
+    Sends many C2E transfers from one account:
+    - assets are resolved and transactions are signed locally in one thread with strictly increasing timestamps, so
+      identical payouts get different ids;
+    - transactions are broadcasted by a bounded pool of workers;
+    - confirmations of all broadcasted transactions are checked in batches, see ConfirmationTracker.
+    States are streamed to a journal, see C2EJournal.
+    """
+
+    def __init__(
+        self,
+        network: Network,
+        cl_account: pw.Address,
+        journal: C2EJournal,
+        workers: int = 8,
+        confirmations: int = 1,
+        timeout: float = 600,
+        poll_latency: float = 2,
+    ):
+        """
+        :param confirmations: a number of blocks with a transaction, 1 - the transaction is in a block
+        :param timeout: seconds to wait for confirmations since the last broadcasting
+        """
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.network = network
+        self.cl_account = cl_account
+        self.journal = journal
+        self.workers = workers
+        self.confirmations = confirmations
+        self.timeout = timeout
+        self.poll_latency = poll_latency
+        # Broadcasting isn't retried: a node can accept a transaction and fail to respond
+        self.broadcast_transport = ClTransport(
+            ClTransportSettings(
+                retries=0,
+                max_connections_per_host=workers,
+            )
+        )
+        # Transaction id -> a line, that owns it
+        self._lines_by_id: Dict[str, int] = {}
+        self._ids_lock = Lock()
+
+    def run(self, payouts: List[C2EPayout]) -> Dict[str, int]:
+        """
+        :return: a number of payouts by a status
+        """
+        pending = [
+            x
+            for x in payouts
+            if self.journal.get(x.line).get("status")
+            not in (STATUS_CONFIRMED, STATUS_FAILED)
+        ]
+        self.log.info(
+            f"{len(payouts) - len(pending)} payouts are done before, {len(pending)} left"
+        )
+
+        self._lines_by_id = {
+            r["id"]: line for line, r in self.journal.records.items() if "id" in r
+        }
+        self._sign(pending)
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(self._broadcast, pending))
+        self._wait_for_confirmations(pending)
+
+        r: Dict[str, int] = {}
+        for x in payouts:
+            status = self.journal.get(x.line).get("status", STATUS_PENDING)
+            r[status] = r.get(status, 0) + 1
+        return r
+
+    def _sign(self, payouts: List[C2EPayout]):
+        last_timestamp = max(
+            (
+                r["txn"]["timestamp"]
+                for r in self.journal.records.values()
+                if "txn" in r
+            ),
+            default=0,
+        )
+        for x in payouts:
+            if "txn" in self.journal.get(x.line):
+                continue
+
+            try:
+                timestamp = max(int(time() * 1000), last_timestamp + 1)
+                txn = self.network.cl_chain_contract.prepareTransfer(
+                    self.cl_account,
+                    x.recipient,
+                    x.asset.waves_asset,
+                    units.user_to_atomic(x.amount, x.asset.waves_asset.decimals),
+                    timestamp=timestamp,
+                )
+                last_timestamp = timestamp
+                self.journal.write(x.line, status=STATUS_SIGNED, txn=txn)
+            except Exception as e:
+                self.journal.write(x.line, status=STATUS_FAILED, error=str(e))
+                self.log.error(f"[C] Line {x.line}: can't sign: {e}")
+
+    def _broadcast(self, payout: C2EPayout):
+        record = self.journal.get(payout.line)
+        if record.get("status") != STATUS_SIGNED:
+            return
+
+        try:
+            txn = record["txn"]
+            response = self.broadcast_transport.post(
+                f"{self.network.cl_chain_contract.pw.NODE}/transactions/broadcast",
+                data=json.dumps(txn),
+                headers={"Content-Type": "application/json"},
+            )
+            r = response.json()
+            if response.status_code == 200 and "error" not in r:
+                txn_id = r["id"]
+            elif any(
+                x in str(r.get("message", "")).lower()
+                for x in ALREADY_BROADCASTED_MARKERS
+            ):
+                # Was broadcasted by a previous run
+                txn_id = r["transaction"]["id"]
+            else:
+                self.journal.write(payout.line, status=STATUS_FAILED, error=str(r))
+                self.log.error(f"[C] Line {payout.line}: can't broadcast: {r}")
+                return
+
+            with self._ids_lock:
+                owner = self._lines_by_id.setdefault(txn_id, payout.line)
+            if owner != payout.line:
+                self.journal.write(
+                    payout.line,
+                    status=STATUS_FAILED,
+                    error=f"Transaction {txn_id} belongs to line {owner}",
+                )
+                self.log.error(
+                    f"[C] Line {payout.line}: transaction {txn_id} belongs to line {owner}"
+                )
+                return
+
+            self.journal.write(payout.line, status=STATUS_BROADCASTED, id=txn_id)
+            self.log.debug(f"[C] Line {payout.line}: broadcasted {txn_id}")
+        except Exception as e:
+            # The status is kept: a node could accept the transaction, so it is broadcasted again on resume
+            self.journal.write(payout.line, error=str(e))
+            self.log.error(f"[C] Line {payout.line}: {e}")
+
+    def _wait_for_confirmations(self, payouts: List[C2EPayout]):
+        tracker = ConfirmationTracker(
+            confirmations=self.confirmations,
+            poll_latency=self.poll_latency,
+            pywaves=self.network.cl_chain_contract.pw,
+            transport=self.network.cl_chain_contract.getTransport(),
+        )
+        waiting = [
+            x
+            for x in payouts
+            if self.journal.get(x.line).get("status") == STATUS_BROADCASTED
+        ]
+        for x in waiting:
+            tracker.add(
+                self.journal.get(x.line)["id"],
+                lambda status, x=x: self._on_confirmed(x, status),
+            )
+
+        end_time = time() + self.timeout
+        while len(tracker) > 0:
+            tracker.poll()
+            self.log.info(
+                f"[C] Confirmed {len(waiting) - len(tracker)}, waiting for {len(tracker)}"
+            )
+
+            now = time()
+            if len(tracker) > 0 and now >= end_time:
+                for x in waiting:
+                    if self.journal.get(x.line).get("status") == STATUS_BROADCASTED:
+                        self.log.warning(
+                            f"[C] Line {x.line}: not confirmed in {self.timeout} seconds, run again to resume"
+                        )
+                break
+            if len(tracker) > 0:
+                sleep(min(self.poll_latency, end_time - now))
+
+    def _on_confirmed(self, payout: C2EPayout, status: TransactionStatus):
+        if status.succeeded:
+            self.journal.write(
+                payout.line, status=STATUS_CONFIRMED, height=status.height
+            )
+        else:
+            self.journal.write(
+                payout.line,
+                status=STATUS_FAILED,
+                error=f"Application status: {status.application_status}",
+            )
@@ -1,7 +1,8 @@
 import logging
+import os
 from dataclasses import dataclass
 from time import sleep, time
-from typing import List, Optional
+from typing import Dict, List, Optional
 from urllib.parse import quote
 
 import pywaves as pw
@@ -13,8 +14,16 @@ from web3 import Web3
 
 import units_network.exceptions
 from units_network import common_utils
+from units_network.cl_transport import ClTransport
 from units_network.extended_address import ExtendedAddress
 from units_network.extended_oracle import ExtendedOracle
+from units_network.polling import (
+    DEFAULT_BLOCK_DELAY,
+    AdaptivePolling,
+    FixedPolling,
+    PollingStrategy,
+    WaitState,
+)
 
 SEP = ","
 
@@ -50,15 +59,227 @@ WAVES_ASSET_LOWER_NAME = WAVES_ASSET_NAME.lower()
 WAVES_ASSET_ID_IN_CC = "WAVES"
 WAVES_ASSET_ID_IN_PW = ""
 
+REGISTRY_ASSET_KEY_PREFIX = "assetRegistry_"
+
+
+def asset_from_details(details: Optional[dict], asset_id: str, pywaves=pw) -> pw.Asset:
+    """
+    Creates pw.Asset without requests to a node. The only place, that sets pw.Asset fields instead of its
+    constructor, keep them in sync with pw.Asset.__init__ and pw.Asset.status.
+    :param details: a response of /assets/details, None for WAVES
+    """
+    r = pw.Asset.__new__(pw.Asset)
+    r.pywaves = pywaves
+    r.assetId = asset_id
+    r.issuer = r.name = r.description = ""
+    r.quantity = r.decimals = 0
+    r.reissuable = False
+    r.minSponsoredAssetFee = None
+    if asset_id == WAVES_ASSET_ID_IN_PW:
+        r.quantity = 10000000000000000
+        r.decimals = 8
+    elif details and details.get("assetId"):
+        r.issuer = details["issuer"]
+        r.quantity = details["quantity"]
+        r.decimals = details["decimals"]
+        r.reissuable = details["reissuable"]
+        r.name = details["name"].encode("ascii", "ignore")
+        r.description = details["description"].encode("ascii", "ignore")
+        r.minSponsoredAssetFee = details["minSponsoredAssetFee"]
+    return r
+
+
+def asset_to_details(asset: pw.Asset) -> dict:
+    """
+    A reverse of asset_from_details
+    """
+    return {
+        "assetId": asset.assetId,
+        "issuer": asset.issuer,
+        "quantity": asset.quantity,
+        "decimals": asset.decimals,
+        "reissuable": asset.reissuable,
+        "name": asset.name.decode("ascii") if asset.name else "",
+        "description": asset.description.decode("ascii") if asset.description else "",
+        "minSponsoredAssetFee": asset.minSponsoredAssetFee,
+    }
+
+
+class RegistrySnapshot:
+    """
+    Registered assets of a chain contract at some moment with lookups by an asset id, a lower-cased name,
+    an ERC20 address and a registry index.
+    """
+
+    def __init__(self, assets: List[RegisteredAsset]):
+        self.assets = sorted(assets, key=lambda x: x.index)
+        self.by_asset_id: Dict[str, RegisteredAsset] = {}
+        self.by_lower_name: Dict[str, RegisteredAsset] = {}
+        self.by_erc20_address: Dict[str, RegisteredAsset] = {}
+        self.by_index: Dict[int, RegisteredAsset] = {}
+        for x in self.assets:
+            asset_id = x.cl_asset.assetId
+            self.by_asset_id[asset_id] = x
+            if asset_id == WAVES_ASSET_ID_IN_PW:
+                self.by_lower_name.setdefault(WAVES_ASSET_LOWER_NAME, x)
+            elif x.cl_asset.name:
+                lower_name = x.cl_asset.name.decode("ascii").lower()
+                self.by_lower_name.setdefault(lower_name, x)
+            self.by_erc20_address[x.el_erc20_address.lower()] = x
+            self.by_index[x.index] = x
+
+    def __len__(self) -> int:
+        return len(self.assets)
+
+    def find_by_asset_id(self, asset_id: str) -> Optional[RegisteredAsset]:
+        if asset_id == WAVES_ASSET_ID_IN_CC:
+            asset_id = WAVES_ASSET_ID_IN_PW
+        return self.by_asset_id.get(asset_id)
+
+    def find_by_name(self, name: str) -> Optional[RegisteredAsset]:
+        return self.by_lower_name.get(name.lower())
+
+    def find_by_erc20_address(
+        self, erc20_address: AnyAddress
+    ) -> Optional[RegisteredAsset]:
+        return self.by_erc20_address.get(str(erc20_address).lower())
+
+    def find_by_index(self, index: int) -> Optional[RegisteredAsset]:
+        return self.by_index.get(index)
+
+
+def parse_registry_entries(xs: List[dict]) -> Dict[str, List[str]]:
+    """
+    :param xs: data entries of the asset registry
+    :return: an asset id in the chain contract -> registry settings
+    """
+    r: Dict[str, List[str]] = {}
+    for x in xs:
+        cc_id = x["key"][len(REGISTRY_ASSET_KEY_PREFIX) :]
+        parts = (x["value"] or "").split(SEP)
+        if len(parts) < 3:
+            raise Exception(f"Invalid data format in registry for {cc_id}: {x}")
+        r[cc_id] = parts
+    return r
+
+
+def registry_asset_ids(entries: Dict[str, List[str]]) -> List[str]:
+    """
+    :return: ids of registered assets with details on a node, i.e. without WAVES
+    """
+    return [x for x in entries.keys() if x != WAVES_ASSET_ID_IN_CC]
+
+
+def create_registry_snapshot(
+    entries: Dict[str, List[str]], details: List[dict], pywaves=pw
+) -> RegistrySnapshot:
+    """
+    Assets without details, e.g. if a node responded with an error for them, are skipped
+    """
+    log = logging.getLogger(os.path.basename(__file__))
+    details_by_id = {
+        x["assetId"]: x for x in details if isinstance(x, dict) and x.get("assetId")
+    }
+    assets = []
+    for cc_id, parts in entries.items():
+        asset_id = WAVES_ASSET_ID_IN_PW if cc_id == WAVES_ASSET_ID_IN_CC else cc_id
+        if asset_id != WAVES_ASSET_ID_IN_PW and asset_id not in details_by_id:
+            log.warning(f"Skip registered asset {asset_id}: no details")
+            continue
+        assets.append(
+            RegisteredAsset(
+                index=int(parts[0]),
+                cl_asset=asset_from_details(
+                    details_by_id.get(asset_id), asset_id, pywaves
+                ),
+                el_erc20_address=Web3.to_checksum_address(parts[1]),
+                ratio_exponent=int(parts[2]),
+            )
+        )
+    return RegistrySnapshot(assets)
+
+
+FINALIZED_BLOCK_KEY = "finalizedBlock"
+BLOCK_DELAY_KEY = "blockDelayInSeconds"
+
+# The finalized block hash and its meta in one request
+FINALIZED_BLOCK_EXPR = (
+    f'(getStringValue(this, "{FINALIZED_BLOCK_KEY}"), '
+    f'blockMeta(getStringValue(this, "{FINALIZED_BLOCK_KEY}")))'
+)
+
+
+def parse_finalized_block(r: dict) -> ContractBlock:
+    """
+    :param r: a result of FINALIZED_BLOCK_EXPR evaluation
+    """
+    value = r["result"]["value"]
+    hash = HexBytes(Web3.to_bytes(hexstr=value["_1"]["value"]))
+    return ContractBlock.from_meta(hash, value["_2"]["value"])
+
+
+def block_meta_expr(block_hash: HexBytes) -> str:
+    return f'blockMeta("{block_hash.hex()}")'
+
+
+def parse_block_meta(block_hash: HexBytes, r: dict) -> ContractBlock:
+    """
+    :param r: a result of block_meta_expr evaluation
+    """
+    try:
+        meta = r["result"]["value"]
+        return ContractBlock.from_meta(block_hash, meta)
+    except Exception:
+        raise units_network.exceptions.BlockNotFound(block_hash)
+
+
+def block_metas_expr(block_hashes: List[HexBytes]) -> str:
+    """
+    The whole expression fails if at least one block is not found
+    """
+    return f"[{SEP.join(block_meta_expr(x) for x in block_hashes)}]"
+
+
+def parse_block_metas(block_hashes: List[HexBytes], r: dict) -> List[ContractBlock]:
+    """
+    :param r: a result of block_metas_expr evaluation
+    """
+    metas = r["result"]["value"]
+    if len(metas) != len(block_hashes):
+        raise Exception(f"Expected {len(block_hashes)} metas, got: {r}")
+    return [
+        ContractBlock.from_meta(block_hash, meta["value"])
+        for block_hash, meta in zip(block_hashes, metas)
+    ]
+
 
 class ChainContract(ExtendedOracle):
-    def __init__(self, oracleAddress=None, seed=None, nonce=0, pywaves=pw):
+    def __init__(
+        self,
+        oracleAddress=None,
+        seed=None,
+        nonce=0,
+        pywaves=pw,
+        transport: Optional[ClTransport] = None,
+        polling: Optional[PollingStrategy] = None,
+        blockDelay: Optional[float] = None,
+    ):
+        """
+        :param blockDelay: seconds between blocks for the default polling strategy, see getBlockDelay
+        """
         # super().__init__(oracleAddress, seed, pywaves)  # Doesn't propagate nonce
         self.pw = pywaves
+        self.transport = transport
+        self.polling = polling or AdaptivePolling(
+            block_delay=blockDelay or DEFAULT_BLOCK_DELAY
+        )
+        # State of the last waitForBlock or waitForFinalized call: polls, observed finalized blocks
+        self.lastWaitState: Optional[WaitState] = None
         if seed is None:
             self.oracleAddress = oracleAddress
         else:
             self.oracleAcc = ExtendedAddress(seed=seed, nonce=nonce)
+            self.oracleAcc.transport = transport
             self.oracleAddress = self.oracleAcc.address
         self.log = logging.getLogger(self.__class__.__name__)
 
@@ -76,41 +297,31 @@ class ChainContract(ExtendedOracle):
     def getElStandardBridgeAddress(self) -> ChecksumAddress:
         return Web3.to_checksum_address(self.getData("elStandardBridgeAddress"))
 
+    def getBlockDelay(self) -> Optional[int]:
+        """
+        :return: seconds between blocks, set by setup(). None if the contract doesn't have it
+        """
+        xs = self.getData(regex=quote(f"^{BLOCK_DELAY_KEY}$"))
+        return int(xs[0]["value"]) if xs else None
+
+    def getRegistrySnapshot(self) -> RegistrySnapshot:
+        """
+        Loads the asset registry with one data request and one asset details request per 100 assets
+        """
+        entries = parse_registry_entries(
+            self.getData(regex=quote(f"^{REGISTRY_ASSET_KEY_PREFIX}.+$"))
+        )
+        details = self.getAssetsDetails(registry_asset_ids(entries))
+        return create_registry_snapshot(entries, details, self.pw)
+
     def getRegisteredAssets(self) -> List[pw.Asset]:
-        xs = self.getData(regex=quote("^assetRegistryIndex_.+$"))
-        assets = []
-        for x in xs:
-            asset_id = x["value"]
-            if asset_id == WAVES_ASSET_ID_IN_CC:
-                asset_id = ""
-            assets.append(pw.Asset(asset_id))
-        return assets
+        return [x.cl_asset for x in self.getRegistrySnapshot().assets]
 
     def getRegisteredAssetByErc20(
         self, erc20_address: AnyAddress
     ) -> Optional[pw.Asset]:
-        xs = self.getData(regex=quote(f"assetRegistryAssetE_{erc20_address.lower()}"))
-        n = len(xs)
-        if n == 0:
-            return None
-        elif n != 1:
-            raise Exception(
-                f"Found multiple registered asset entries for {erc20_address}"
-            )
-
-        index = xs[0]["value"]
-        xs = self.getData(regex=quote(f"^assetRegistryIndex_{index}$"))
-        return next(
-            (
-                pw.Asset(
-                    WAVES_ASSET_ID_IN_PW
-                    if x["value"] == WAVES_ASSET_ID_IN_CC
-                    else x["value"]
-                )
-                for x in xs
-            ),
-            None,
-        )
+        r = self.getRegistrySnapshot().find_by_erc20_address(erc20_address)
+        return r.cl_asset if r else None
 
     def getRegisteredAssetSettings(self, asset: pw.Asset) -> Optional[RegisteredAsset]:
         cc_id = asset.assetId
@@ -136,26 +347,32 @@ class ChainContract(ExtendedOracle):
         )
 
     def findRegisteredAsset(self, asset_name: str) -> Optional[pw.Asset]:
-        assets = self.getRegisteredAssets()
-        asset_name = asset_name.lower()
-        for asset in assets:
-            if (
-                asset_name == WAVES_ASSET_LOWER_NAME
-                and asset.assetId == WAVES_ASSET_ID_IN_PW
-                or asset.name
-                and asset.name.decode("ascii").lower() == asset_name
-            ):
-                return asset
-        return None
+        r = self.getRegistrySnapshot().find_by_name(asset_name)
+        return r.cl_asset if r else None
 
     def waitForFinalized(
-        self, block: ContractBlock, timeout: float = 60, poll_latency: float = 2
-    ):
+        self,
+        block: ContractBlock,
+        timeout: float = 60,
+        poll_latency: Optional[float] = None,
+        polling: Optional[PollingStrategy] = None,
+    ) -> WaitState:
+        """
+        :param poll_latency: poll with a fixed latency instead of polling strategy
+        :param polling: overrides the contract's polling strategy
+        :return: polls and observed finalized blocks
+        """
+        polling = self._getPolling(poll_latency, polling)
+        state = WaitState(started_at=time(), target_height=block.chain_height)
         last_finalized_block: List[Optional[ContractBlock]] = [None]
 
-        end_time = time() + timeout
+        end_time = state.started_at + timeout
         while True:
             curr_finalized_block = self.getFinalizedBlock()
+            state.polls += 1
+            state.observe(
+                curr_finalized_block.chain_height, curr_finalized_block.epoch_number
+            )
             message = f"Wait for {block.chain_height - curr_finalized_block.chain_height} blocks to finalize"
             if not (
                 last_finalized_block[0]
@@ -165,46 +382,110 @@ class ChainContract(ExtendedOracle):
                 message = f"Current finalized block is {curr_finalized_block}"
             self.log.debug(message)
             if curr_finalized_block.chain_height >= block.chain_height:
-                return
+                self._onWaitDone(state, f"{block} finalized")
+                return state
 
-            if time() >= end_time:
+            now = time()
+            if now >= end_time:
                 break
 
-            sleep(poll_latency)
+            sleep(min(polling.next_delay(state), end_time - now))
+        self._onWaitDone(state, f"{block} not finalized")
         raise units_network.exceptions.TimeExhausted(
             f"Block {block.hash.to_0x_hex()} not finalized on contract in {timeout} seconds. Try to increase --timeout"
         )
 
     def waitForBlock(
-        self, block_hash: HexBytes, timeout: float = 60, poll_latency: float = 2
+        self,
+        block_hash: HexBytes,
+        timeout: float = 60,
+        poll_latency: Optional[float] = None,
+        polling: Optional[PollingStrategy] = None,
     ) -> ContractBlock:
+        """
+        :param poll_latency: poll with a fixed latency instead of polling strategy
+        :param polling: overrides the contract's polling strategy
+        """
         self.log.debug(f"Wait for {block_hash.to_0x_hex()} on chain contract")
-        end_time = time() + timeout
+        polling = self._getPolling(poll_latency, polling)
+        state = WaitState(started_at=time())
+
+        end_time = state.started_at + timeout
         while True:
             try:
-                return self.getBlockMeta(block_hash)
+                state.polls += 1
+                r = self.getBlockMeta(block_hash)
+                self._onWaitDone(state, f"{r} found")
+                return r
             except units_network.exceptions.BlockNotFound:
                 pass
 
-            if time() >= end_time:
+            now = time()
+            if now >= end_time:
                 break
 
-            sleep(poll_latency)
+            sleep(min(polling.next_delay(state), end_time - now))
+        self._onWaitDone(state, f"{block_hash.to_0x_hex()} not found")
         raise units_network.exceptions.TimeExhausted(
             f"Block {block_hash.to_0x_hex()} not found on contract in {timeout} seconds. Try to increase --timeout"
         )
 
+    def _getPolling(
+        self, poll_latency: Optional[float], polling: Optional[PollingStrategy]
+    ) -> PollingStrategy:
+        if polling:
+            return polling
+        elif poll_latency is not None:
+            return FixedPolling(poll_latency)
+        return self.polling
+
+    def _onWaitDone(self, state: WaitState, message: str):
+        self.lastWaitState = state
+        self.log.debug(f"{message} after {state.polls} polls in {state.elapsed:.1f}s")
+
     def getFinalizedBlock(self) -> ContractBlock:
-        hash = HexBytes(Web3.to_bytes(hexstr=self.getData("finalizedBlock")))
+        r = self.evaluate(FINALIZED_BLOCK_EXPR)
+        try:
+            return parse_finalized_block(r)
+        except Exception:
+            self.log.debug(f"Can't get a finalized block in one request: {r}")
+
+        hash = HexBytes(Web3.to_bytes(hexstr=self.getData(FINALIZED_BLOCK_KEY)))
         return self.getBlockMeta(hash)
 
     def getBlockMeta(self, block_hash: HexBytes) -> ContractBlock:
-        r = self.evaluate(f'blockMeta("{block_hash.hex()}")')
+        return parse_block_meta(block_hash, self.evaluate(block_meta_expr(block_hash)))
+
+    def getBlockMetas(
+        self, block_hashes: List[HexBytes], chunk_size: int = 50
+    ) -> List[Optional[ContractBlock]]:
+        """
+        Gets metas of blocks with one request per chunk_size blocks.
+        :return: metas in the same order, None for blocks that not found on the contract
+        """
+        r: List[Optional[ContractBlock]] = []
+        for start in range(0, len(block_hashes), chunk_size):
+            r.extend(self._getBlockMetasChunk(block_hashes[start : start + chunk_size]))
+        return r
+
+    def _getBlockMetasChunk(
+        self, block_hashes: List[HexBytes]
+    ) -> List[Optional[ContractBlock]]:
+        if len(block_hashes) == 1:
+            try:
+                return [self.getBlockMeta(block_hashes[0])]
+            except units_network.exceptions.BlockNotFound:
+                return [None]
+
+        r = self.evaluate(block_metas_expr(block_hashes))
         try:
-            meta = r["result"]["value"]
-            return ContractBlock.from_meta(block_hash, meta)
+            return parse_block_metas(block_hashes, r)  # type: ignore
         except Exception:
-            raise units_network.exceptions.BlockNotFound(block_hash)
+            # The whole expression fails if at least one block is not found
+            middle = len(block_hashes) // 2
+            return self._getBlockMetasChunk(
+                block_hashes[:middle]
+            ) + self._getBlockMetasChunk(block_hashes[middle:])
 
     def setScript(self, script: str, txFee: int = 5_000_000):
         return self.oracleAcc.setScript(script, txFee)
@@ -385,7 +666,27 @@ class ChainContract(ExtendedOracle):
         atomicAmount: int,
         txFee: int = 500_000,
     ):
-        return fromWavesAccount.invokeScript(
+        txn = self.prepareTransfer(
+            fromWavesAccount, toEthAddress, token, atomicAmount, txFee
+        )
+        return fromWavesAccount.broadcastTx(txn)
+
+    def prepareTransfer(
+        self,
+        fromWavesAccount: pw.Address,
+        toEthAddress: ChecksumAddress,
+        token: pw.Asset,
+        atomicAmount: int,
+        txFee: int = 500_000,
+        timestamp: int = 0,
+    ):
+        """
+        :param timestamp: in milliseconds, 0 - now. Identical transactions with the same timestamp have the same id
+        """
+        generator = TxGenerator(self.pw)  # type: ignore
+        signer = TxSigner(self.pw)  # type: ignore
+        txn = generator.generateInvokeScript(
+            publicKey=fromWavesAccount.publicKey,
             dappAddress=self.oracleAddress,
             functionName="transfer",
             params=[
@@ -396,7 +697,10 @@ class ChainContract(ExtendedOracle):
             ],
             payments=[{"amount": atomicAmount, "assetId": token.assetId}],
             txFee=txFee,
+            timestamp=timestamp,
         )
+        signer.signTx(txn, privateKey=fromWavesAccount.privateKey)
+        return txn
 
     def withdraw(
         self,
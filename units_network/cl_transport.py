@@ -0,0 +1,106 @@
+from dataclasses import dataclass
+from threading import Lock
+from time import perf_counter
+from typing import Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from units_network import metrics
+from units_network.metrics import MetricsRegistry
+
+
+@dataclass
+class ClTransportSettings:
+    # (connect, read) in seconds
+    timeout: Tuple[float, float] = (5, 30)
+    max_connections_per_host: int = 10
+    max_hosts: int = 4
+    retries: int = 3
+    # Sleeps backoff_factor * 2^(retry - 1) seconds between retries
+    backoff_factor: float = 0.5
+    retry_on_statuses: Tuple[int, ...] = (429, 500, 502, 503, 504)
+
+
+class ClTransport:
+    """
+    A pooled HTTP client for Consensus Layer node API: keeps connections alive, requests gzip responses and retries
+    failed requests with a backoff. Only use it for idempotent requests, e.g. not for broadcasting.
+    """
+
+    def __init__(
+        self,
+        settings: Optional[ClTransportSettings] = None,
+        registry: Optional[MetricsRegistry] = None,
+    ):
+        """
+        :param registry: records requests, the shared one if None
+        """
+        self.settings = settings or ClTransportSettings()
+        self.registry = registry or metrics.get_default()
+        retry = Retry(
+            total=self.settings.retries,
+            backoff_factor=self.settings.backoff_factor,
+            status_forcelist=self.settings.retry_on_statuses,
+            allowed_methods=frozenset(["GET", "POST"]),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=self.settings.max_hosts,
+            pool_maxsize=self.settings.max_connections_per_host,
+            pool_block=True,
+            max_retries=retry,
+        )
+        self.session = requests.Session()
+        self.session.headers.update({"Accept-Encoding": "gzip, deflate"})
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.settings.timeout)
+        start = perf_counter()
+        response = None
+        try:
+            response = self.session.request(method, url, **kwargs)
+            return response
+        finally:
+            self.registry.record(
+                metrics.CLIENT_CL,
+                metrics.cl_method(method, url),
+                perf_counter() - start,
+                response is None or response.status_code >= 400,
+                len(response.request.body or b"") if response is not None else 0,
+                len(response.content) if response is not None else 0,
+            )
+
+    def close(self):
+        self.session.close()
+
+
+_default: Optional[ClTransport] = None
+_default_lock = Lock()
+
+
+def get_default() -> ClTransport:
+    global _default
+    with _default_lock:
+        if _default is None:
+            _default = ClTransport()
+        return _default
+
+
+def configure(settings: ClTransportSettings) -> ClTransport:
+    """Replaces the shared transport"""
+    global _default
+    with _default_lock:
+        if _default is not None:
+            _default.close()
+        _default = ClTransport(settings)
+        return _default
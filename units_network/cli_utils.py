@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 
 from pywaves import pw
 
@@ -36,7 +36,7 @@ def find_asset(
             "Either waves_asset_id or waves_asset_name required to find an asset"
         )
 
-    native_token = network.cl_chain_contract.getNativeToken()
+    native_token = network.native_token
     if (
         waves_asset_id == native_token.assetId
         or waves_asset_name
@@ -44,22 +44,60 @@ def find_asset(
     ):
         return FoundAsset(native_token, units.UNIT0_EL_DECIMALS)
 
+    registry = network.cl_chain_contract.getRegistrySnapshot()
     if waves_asset_id:
-        asset = pw.Asset(waves_asset_id)
+        registered_asset = registry.find_by_asset_id(waves_asset_id)
     elif waves_asset_name:
-        asset = network.cl_chain_contract.findRegisteredAsset(waves_asset_name)
+        registered_asset = registry.find_by_name(waves_asset_name)
     else:
-        asset = None
+        registered_asset = None
 
-    if not asset:
-        raise Exception(
-            f"{waves_asset_id}/{waves_asset_name} is not a registered in the chain contract"
-        )
-
-    registered_asset = network.cl_chain_contract.getRegisteredAssetSettings(asset)
     if not registered_asset:
         raise Exception(
-            f"{waves_asset_id} is neither a native token {native_token.assetId}, nor a registered asset"
+            f"{waves_asset_id}/{waves_asset_name} is neither a native token {native_token.assetId}, nor a registered asset"
         )
+
     erc20 = network.get_erc20(registered_asset.el_erc20_address)
-    return FoundAsset(asset, erc20.decimals, erc20)
+    return FoundAsset(registered_asset.cl_asset, erc20.decimals, erc20)
+
+
+class AssetFinder:
+    """
+    find_asset with a cache, so assets of a manifest are resolved once
+    """
+
+    def __init__(self, network: Network):
+        self.network = network
+        self._found: Dict[Tuple[Optional[str], Optional[str]], FoundAsset] = {}
+
+    def find(
+        self,
+        waves_asset_id: Optional[str] = None,
+        waves_asset_name: Optional[str] = None,
+    ) -> FoundAsset:
+        """
+        :return: the native token if both are None
+        """
+        key = (waves_asset_id, waves_asset_name)
+        r = self._found.get(key)
+        if r is None:
+            if key == (None, None):
+                r = find_asset(self.network, self.network.native_token.assetId)
+            else:
+                r = find_asset(self.network, waves_asset_id, waves_asset_name)
+            self._found[key] = r
+        return r
+
+    def find_in_line(
+        self,
+        x: Dict[str, Any],
+        default_asset_id: Optional[str] = None,
+        default_asset_name: Optional[str] = None,
+    ) -> FoundAsset:
+        """
+        Finds an asset of a manifest line by its asset_id or asset_name. The defaults are used only if the line has
+        neither, so they don't mix.
+        """
+        if x.get("asset_id") or x.get("asset_name"):
+            return self.find(x.get("asset_id"), x.get("asset_name"))
+        return self.find(default_asset_id, default_asset_name)
@@ -2,20 +2,23 @@ import base64
 import logging
 import logging.config
 import os
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
 from base58 import b58decode
-from ens.ens import HexAddress
-from hexbytes import HexBytes
-from pywaves import pw
 from importlib.resources import files
 
+# Scripts import this module before checking arguments, so heavy modules are only for type checking
+if TYPE_CHECKING:
+    from ens.ens import HexAddress
+    from hexbytes import HexBytes
+    from pywaves import pw
 
-def hex_to_base64(x: HexBytes) -> str:
+
+def hex_to_base64(x: "HexBytes") -> str:
     return base64.b64encode(x).decode("utf-8")
 
 
-def waves_public_key_hash_bytes(acc: pw.Address) -> HexAddress:
+def waves_public_key_hash_bytes(acc: "pw.Address") -> "HexAddress":
     return b58decode(acc.address)[2:22]  # type: ignore
 
 
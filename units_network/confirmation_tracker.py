@@ -0,0 +1,152 @@
+import logging
+from dataclasses import dataclass
+from time import sleep, time
+from typing import Callable, Dict, List, Optional
+
+import pywaves as pw
+
+from units_network import cl_transport
+from units_network.cl_transport import ClTransport
+
+STATUS_CONFIRMED = "confirmed"
+STATUS_UNCONFIRMED = "unconfirmed"
+STATUS_NOT_FOUND = "not_found"
+
+APPLICATION_STATUS_SUCCEEDED = "succeeded"
+
+
+@dataclass
+class TransactionStatus:
+    id: str
+    # confirmed, unconfirmed (in UTX) or not_found
+    status: str
+    height: Optional[int] = None
+    # A number of blocks after the transaction's block
+    confirmations: int = 0
+    # succeeded or script_execution_failed, None for unconfirmed transactions and old nodes
+    application_status: Optional[str] = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.application_status in (None, APPLICATION_STATUS_SUCCEEDED)
+
+    @classmethod
+    def from_json(cls, x: dict) -> "TransactionStatus":
+        return cls(
+            id=x["id"],
+            status=x["status"],
+            height=x.get("height"),
+            confirmations=x.get("confirmations", 0),
+            application_status=x.get("applicationStatus"),
+        )
+
+
+class ConfirmationTracker:
+    """
+    Waits for many CL transactions with one /transactions/status request per chunk_size transactions per poll instead of
+    one request per transaction.
+    """
+
+    def __init__(
+        self,
+        confirmations: int = 1,
+        chunk_size: int = 1000,
+        poll_latency: float = 2,
+        pywaves=pw,
+        transport: Optional[ClTransport] = None,
+    ):
+        """
+        :param confirmations: a number of blocks with a transaction, 1 - the transaction is in a block
+        :param chunk_size: not more than rest-api.transactions-by-address-limit of a node, 1000 by default
+        :param transport: the shared one if None
+        """
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.confirmations = confirmations
+        self.chunk_size = chunk_size
+        self.poll_latency = poll_latency
+        self.pw = pywaves
+        self.transport = transport
+        self.polls = 0
+        self._callbacks: Dict[str, List[Callable[[TransactionStatus], None]]] = {}
+
+    def add(
+        self,
+        txn_id: str,
+        callback: Optional[Callable[[TransactionStatus], None]] = None,
+    ):
+        """
+        :param callback: called during poll() with a status of the confirmed transaction
+        """
+        callbacks = self._callbacks.setdefault(txn_id, [])
+        if callback:
+            callbacks.append(callback)
+
+    def __len__(self) -> int:
+        return len(self._callbacks)
+
+    def poll(self) -> Dict[str, TransactionStatus]:
+        """
+        Requests statuses of waiting transactions and resolves confirmed ones
+        :return: statuses of all waiting transactions before the poll
+        """
+        self.polls += 1
+        txn_ids = list(self._callbacks.keys())
+        r: Dict[str, TransactionStatus] = {}
+        for start in range(0, len(txn_ids), self.chunk_size):
+            for x in self.get_statuses(txn_ids[start : start + self.chunk_size]):
+                r[x.id] = x
+
+        resolved = 0
+        for txn_id, x in r.items():
+            if (
+                x.status == STATUS_CONFIRMED
+                and x.confirmations + 1 >= self.confirmations
+            ):
+                resolved += 1
+                for callback in self._callbacks.pop(txn_id, []):
+                    callback(x)
+        self.log.debug(f"Confirmed {resolved}, waiting for {len(self._callbacks)}")
+        return r
+
+    def wait(
+        self, txn_ids: List[str], timeout: Optional[float] = None
+    ) -> Dict[str, TransactionStatus]:
+        """
+        :param timeout: seconds, infinite if None
+        :return: statuses of confirmed transactions, and the last known statuses of others after the timeout
+        """
+        r: Dict[str, TransactionStatus] = {}
+
+        def on_confirmed(x: TransactionStatus):
+            r[x.id] = x
+
+        for x in txn_ids:
+            self.add(x, on_confirmed)
+
+        end_time = None if timeout is None else time() + timeout
+        while True:
+            last = self.poll()
+            if all(x in r for x in txn_ids):
+                return r
+
+            now = time()
+            if end_time is not None and now >= end_time:
+                for x in txn_ids:
+                    if x not in r:
+                        r[x] = last.get(x) or TransactionStatus(x, STATUS_NOT_FOUND)
+                        self._callbacks.pop(x, None)
+                return r
+
+            delay = self.poll_latency
+            if end_time is not None:
+                delay = min(delay, end_time - now)
+            sleep(delay)
+
+    def get_statuses(self, txn_ids: List[str]) -> List[TransactionStatus]:
+        url = f"{self.pw.NODE}/transactions/status"
+        transport = self.transport or cl_transport.get_default()
+        response = transport.post(url, json={"ids": txn_ids})
+        if response.status_code == 200:
+            return [TransactionStatus.from_json(x) for x in response.json()]
+        else:
+            raise Exception(f"Error: {response.status_code}, {response.text}")
@@ -0,0 +1,120 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cached_property
+from threading import Lock
+from typing import Dict, List, Optional, Union
+
+from hexbytes import HexBytes
+
+from units_network.merkle import E2CMerkleTree
+from units_network.native_bridge import SentNative
+from units_network.standard_bridge import ERC20BridgeInitiatedEvent
+
+E2CEvent = Union[SentNative, ERC20BridgeInitiatedEvent]
+
+
+@dataclass
+class E2CBlock:
+    block_hash: HexBytes
+    # Parsed bridge logs in the block order, None for logs that are not transfers
+    events: List[Optional[E2CEvent]]
+    # Transaction hash -> index of its (last) log in the block
+    transfer_indexes: Dict[HexBytes, int]
+    merkle_tree: E2CMerkleTree
+
+    @cached_property
+    def size_in_bytes(self) -> int:
+        # An estimation: tree nodes and leaves dominate
+        r = 32 * len(self.transfer_indexes)
+        for layer in self.merkle_tree.layers:
+            r += 32 * len(layer)
+        for evt in self.events:
+            if evt:
+                r += len(evt.to_merkle_leaf())
+        return r
+
+
+@dataclass
+class E2CBlockCacheInfo:
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    size_in_bytes: int
+
+
+class E2CBlockCache:
+    """
+    A thread-safe LRU cache of E2C blocks by a block hash.
+    Logs of a block with the specified hash never change, so entries don't expire.
+    Blocks without logs aren't cached: a node returns no logs for a block it hasn't indexed yet.
+    """
+
+    def __init__(self, max_entries: int = 256, max_size_in_bytes: int = 64 * 1024**2):
+        self.max_entries = max_entries
+        self.max_size_in_bytes = max_size_in_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size_in_bytes = 0
+        self._entries: "OrderedDict[HexBytes, E2CBlock]" = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, block_hash: HexBytes) -> Optional[E2CBlock]:
+        with self._lock:
+            r = self._entries.get(block_hash)
+            if r is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(block_hash)
+            return r
+
+    def put(self, block: E2CBlock):
+        if not block.events:
+            return
+
+        size = block.size_in_bytes
+        if self.max_entries <= 0 or size > self.max_size_in_bytes:
+            return
+
+        with self._lock:
+            self._remove(block.block_hash)
+            self._entries[block.block_hash] = block
+            self.size_in_bytes += size
+            while (
+                len(self._entries) > self.max_entries
+                or self.size_in_bytes > self.max_size_in_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self.size_in_bytes -= evicted.size_in_bytes
+                self.evictions += 1
+
+    def invalidate(self, block_hash: Optional[HexBytes] = None):
+        """
+        :param block_hash: a block to remove, all blocks if None
+        """
+        with self._lock:
+            if block_hash is None:
+                self._entries.clear()
+                self.size_in_bytes = 0
+            else:
+                self._remove(block_hash)
+
+    def info(self) -> E2CBlockCacheInfo:
+        with self._lock:
+            return E2CBlockCacheInfo(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                entries=len(self._entries),
+                size_in_bytes=self.size_in_bytes,
+            )
+
+    def _remove(self, block_hash: HexBytes):
+        removed = self._entries.pop(block_hash, None)
+        if removed:
+            self.size_in_bytes -= removed.size_in_bytes
@@ -0,0 +1,220 @@
+import logging
+import sqlite3
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Union
+
+from eth_typing import BlockNumber
+from hexbytes import HexBytes
+from web3.types import LogReceipt
+
+from units_network.bridges import Bridges
+from units_network.log_ranges import LogRangeScanner
+from units_network.native_bridge import SentNative
+from units_network.standard_bridge import ERC20BridgeInitiatedEvent
+
+SCHEMA_VERSION = 1
+
+TRANSFER_KIND_NATIVE = "native"
+TRANSFER_KIND_ERC20 = "erc20"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transfers (
+    block_hash BLOB NOT NULL,
+    block_number INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    leaf_index INTEGER NOT NULL,
+    transaction_hash BLOB NOT NULL,
+    kind TEXT NOT NULL,
+    sender TEXT,
+    recipient TEXT NOT NULL,
+    token TEXT,
+    amount INTEGER NOT NULL,
+    PRIMARY KEY (block_hash, log_index)
+);
+CREATE INDEX IF NOT EXISTS transfers_transaction_hash ON transfers (transaction_hash);
+CREATE INDEX IF NOT EXISTS transfers_recipient ON transfers (recipient);
+CREATE INDEX IF NOT EXISTS transfers_block_number ON transfers (block_number);
+"""
+
+
+@dataclass
+class IndexedTransfer:
+    block_hash: HexBytes
+    block_number: BlockNumber
+    # Of the log in the block
+    log_index: int
+    # Of the transfer in the block Merkle tree
+    leaf_index: int
+    transaction_hash: HexBytes
+    kind: str
+    # Lower-cased hex, None for native transfers: SentNative doesn't have it
+    sender: Optional[str]
+    # Lower-cased hex of a Waves public key hash
+    recipient: str
+    # Lower-cased ERC20 address, None for native transfers
+    token: Optional[str]
+    amount: int
+
+
+def normalize_hex(x: Union[str, bytes]) -> str:
+    if isinstance(x, (bytes, bytearray)):
+        return "0x" + bytes(x).hex()
+    return ("0x" + x[2:] if x[:2].lower() == "0x" else "0x" + x).lower()
+
+
+class E2CTransferIndex:
+    """
+    A local SQLite index of E2C transfers from EL bridge logs.
+    sync() scans blocks after the last checkpoint, so the index resumes where it stopped.
+    """
+
+    def __init__(self, bridges: Bridges, db_path: str, start_block: int = 0):
+        """
+        :param start_block: the first block to scan if the index is empty
+        """
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.bridges = bridges
+        self.start_block = start_block
+        self.db = sqlite3.connect(db_path)
+        self.db.executescript(SCHEMA)
+        version = self._get_meta("schema_version")
+        if version is None:
+            self._set_meta("schema_version", str(SCHEMA_VERSION))
+            self.db.commit()
+        elif int(version) != SCHEMA_VERSION:
+            raise Exception(
+                f"Unsupported index schema version {version} in {db_path}, expected {SCHEMA_VERSION}"
+            )
+
+    def close(self):
+        self.db.close()
+
+    @property
+    def last_indexed_block(self) -> Optional[BlockNumber]:
+        r = self._get_meta("last_indexed_block")
+        return None if r is None else BlockNumber(int(r))
+
+    def sync(
+        self,
+        to_block: Optional[int] = None,
+        confirmations: int = 10,
+        scanner: Optional[LogRangeScanner] = None,
+    ) -> int:
+        """
+        :param to_block: the last block to index, the latest minus confirmations if None
+        :param scanner: pass own one to see its stats or change chunk settings
+        :return: a number of indexed transfers
+        """
+        if to_block is None:
+            to_block = self.bridges.w3.eth.block_number - confirmations
+
+        last = self.last_indexed_block
+        from_block = self.start_block if last is None else last + 1
+        scanner = scanner or self.bridges.create_e2c_log_scanner()
+        total = 0
+        for chunk_from_block, chunk_to_block, logs in scanner.scan_chunks(
+            from_block, to_block
+        ):
+            total += self._store(logs, chunk_to_block)
+            self.log.debug(
+                f"Indexed blocks [{chunk_from_block}, {chunk_to_block}]: {len(logs)} logs"
+            )
+        return total
+
+    def find_by_txn_hash(self, txn_hash: bytes) -> List[IndexedTransfer]:
+        return self._select("transaction_hash = ?", bytes(txn_hash))
+
+    def find_by_recipient(self, recipient: Union[str, bytes]) -> List[IndexedTransfer]:
+        return self._select("recipient = ?", normalize_hex(recipient))
+
+    def find_by_block(self, block_hash: bytes) -> List[IndexedTransfer]:
+        return self._select("block_hash = ?", bytes(block_hash))
+
+    def find_by_block_number(self, block_number: int) -> List[IndexedTransfer]:
+        return self._select("block_number = ?", block_number)
+
+    def _store(self, logs: List[LogReceipt], last_block: int) -> int:
+        leaf_indexes: Dict[bytes, int] = {}
+        rows = []
+        for log in logs:
+            evt = self.bridges.parse_e2c_event(log)
+            if not evt:
+                continue
+
+            block_hash = bytes(log["blockHash"])
+            leaf_index = leaf_indexes.get(block_hash, 0)
+            leaf_indexes[block_hash] = leaf_index + 1
+
+            if isinstance(evt, SentNative):
+                kind, sender, recipient, token, amount = (
+                    TRANSFER_KIND_NATIVE,
+                    None,
+                    normalize_hex(evt.waves_recipient),
+                    None,
+                    evt.amount,
+                )
+            elif isinstance(evt, ERC20BridgeInitiatedEvent):
+                kind, sender, recipient, token, amount = (
+                    TRANSFER_KIND_ERC20,
+                    normalize_hex(evt.from_address),
+                    normalize_hex(evt.cl_to),
+                    normalize_hex(evt.local_token),
+                    evt.cl_amount,
+                )
+            else:
+                continue
+
+            rows.append(
+                (
+                    block_hash,
+                    log["blockNumber"],
+                    log["logIndex"],
+                    leaf_index,
+                    bytes(log["transactionHash"]),
+                    kind,
+                    sender,
+                    recipient,
+                    token,
+                    amount,
+                )
+            )
+
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO transfers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._set_meta("last_indexed_block", str(last_block))
+        return len(rows)
+
+    def _select(self, condition: str, value) -> List[IndexedTransfer]:
+        cursor = self.db.execute(
+            f"SELECT * FROM transfers WHERE {condition} ORDER BY block_number, log_index",
+            (value,),
+        )
+        return [
+            IndexedTransfer(
+                block_hash=HexBytes(x[0]),
+                block_number=BlockNumber(x[1]),
+                log_index=x[2],
+                leaf_index=x[3],
+                transaction_hash=HexBytes(x[4]),
+                kind=x[5],
+                sender=x[6],
+                recipient=x[7],
+                token=x[8],
+                amount=x[9],
+            )
+            for x in cursor
+        ]
+
+    def _get_meta(self, key: str) -> Optional[str]:
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _set_meta(self, key: str, value: str):
+        self.db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
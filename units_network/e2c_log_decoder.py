@@ -0,0 +1,103 @@
+from typing import Optional, Union
+
+from eth_typing import HexAddress
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.types import LogReceipt, Wei
+
+from units_network.native_bridge import SentNative
+from units_network.standard_bridge import ERC20BridgeInitiatedEvent
+
+WORD = 32
+INT64_MIN = -(2**63)
+INT64_MAX = 2**63 - 1
+
+
+def _int64_word(word: memoryview) -> int:
+    r = int.from_bytes(word[:WORD], byteorder="big", signed=True)
+    if r < INT64_MIN or r > INT64_MAX:
+        raise ValueError(f"Expected int64, got {bytes(word[:WORD]).hex()}")
+    return r
+
+
+def _address_word(word: bytes) -> memoryview:
+    r = memoryview(word)
+    if len(r) != WORD or any(r[: WORD - 20]):
+        raise ValueError(f"Expected an address, got {bytes(word).hex()}")
+    return r[WORD - 20 :]
+
+
+class E2CLogDecoder:
+    """
+    Decodes SentNative and ERC20BridgeInitiated logs by their fixed layouts without the ABI decoding:
+    - SentNative(bytes20 wavesRecipient, int64 amount): two data words;
+    - ERC20BridgeInitiated(address indexed localToken, address indexed from, address indexed clTo, int64 clAmount):
+      addresses in topics, one data word.
+    Gives the same results as NativeBridge.parse_sent_native and StandardBridge.parse_erc20_bridge_initiated.
+    """
+
+    def __init__(self, sent_native_topic: bytes, erc20_bridge_initiated_topic: bytes):
+        self.sent_native_topic = bytes(sent_native_topic)
+        self.erc20_bridge_initiated_topic = bytes(erc20_bridge_initiated_topic)
+
+    def decode(
+        self, log: LogReceipt
+    ) -> Optional[Union[SentNative, ERC20BridgeInitiatedEvent]]:
+        topics = log["topics"]
+        if len(topics) == 0:
+            return None
+
+        topic = topics[0]
+        if topic == self.sent_native_topic:
+            data = memoryview(log["data"])
+            self._check_size(data, 2 * WORD)
+            return SentNative(
+                waves_recipient=HexBytes(data[:20]),
+                amount=Wei(_int64_word(data[WORD:])),
+                data=HexBytes(log["data"]),
+            )
+        elif topic == self.erc20_bridge_initiated_topic:
+            data = memoryview(log["data"])
+            self._check_size(data, WORD)
+            return ERC20BridgeInitiatedEvent(
+                local_token=self._address(topics[1]),
+                from_address=self._address(topics[2]),
+                cl_to=self._address(topics[3]),
+                cl_amount=_int64_word(data),
+            )
+
+        return None
+
+    def to_merkle_leaf(self, log: LogReceipt) -> Optional[bytes]:
+        """
+        The same as decode(log).to_merkle_leaf(), but without creating an event
+        """
+        topics = log["topics"]
+        if len(topics) == 0:
+            return None
+
+        topic = topics[0]
+        if topic == self.sent_native_topic:
+            data = memoryview(log["data"])
+            self._check_size(data, 2 * WORD)
+            _int64_word(data[WORD:])
+            return bytes(data)
+        elif topic == self.erc20_bridge_initiated_topic:
+            data = memoryview(log["data"])
+            self._check_size(data, WORD)
+            if _int64_word(data) < 0:
+                raise ValueError(f"Negative amount in {bytes(data).hex()}")
+            _address_word(topics[1])
+            _address_word(topics[3])
+            return bytes(topics[1]) + bytes(topics[3]) + bytes(data)
+
+        return None
+
+    @staticmethod
+    def _address(topic: bytes) -> HexAddress:
+        return HexAddress(Web3.to_checksum_address(bytes(_address_word(topic))))
+
+    @staticmethod
+    def _check_size(data: memoryview, expected: int):
+        if len(data) != expected:
+            raise ValueError(f"Expected {expected} bytes of log data, got {len(data)}")
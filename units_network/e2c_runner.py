@@ -0,0 +1,312 @@
+import logging
+from dataclasses import dataclass
+from decimal import Decimal
+from time import sleep, time
+from typing import Any, Dict, List, Optional, Tuple
+
+import pywaves as pw
+from eth_account.signers.base import BaseAccount
+from eth_typing import HexStr
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.types import Wei
+
+from units_network import common_utils, units
+from units_network.base_contract import (
+    BaseContract,
+    ContractCall,
+    PipelinedTransaction,
+)
+from units_network.bridges import E2CTransferParams
+from units_network.chain_contract import ContractBlock
+from units_network.cli_utils import FoundAsset
+from units_network.finalization_tracker import FinalizationTracker
+from units_network.networks import Network
+from units_network.receipt_tracker import ReceiptTracker, TrackedReceipt
+
+STATUS_SENT = "sent"
+STATUS_MINED = "mined"
+STATUS_ON_CONTRACT = "on_contract"
+STATUS_WITHDRAWN = "withdrawn"
+STATUS_FAILED = "failed"
+
+
+@dataclass
+class E2CTransferRequest:
+    # A recipient, also signs the withdraw transaction
+    cl_account: pw.Address
+    asset: FoundAsset
+    amount: Decimal
+
+
+@dataclass
+class E2CTransfer:
+    index: int
+    request: E2CTransferRequest
+    status: str = STATUS_SENT
+    send_txn_hash: Optional[HexStr] = None
+    params: Optional[E2CTransferParams] = None
+    contract_block: Optional[ContractBlock] = None
+    withdraw_result: Optional[Any] = None
+    error: Optional[str] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in (STATUS_WITHDRAWN, STATUS_FAILED)
+
+    def fail(self, error: str):
+        self.status = STATUS_FAILED
+        self.error = error
+
+    def to_json_dict(self) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "status": self.status,
+            "sendTxnHash": self.send_txn_hash,
+            "blockHash": (
+                self.params.block_with_transfer_hash.to_0x_hex()
+                if self.params
+                else None
+            ),
+            "withdrawTxnId": (
+                self.withdraw_result.get("id")
+                if isinstance(self.withdraw_result, dict)
+                else None
+            ),
+            "error": self.error,
+        }
+
+
+class E2CBatchRunner:
+    """
+    Runs many E2C transfers at once:
+    1. Sends all EL transactions with locally allocated nonces and JSON-RPC batches without waiting for receipts.
+    2. Polls receipts with JSON-RPC batches and builds transfer params once per block.
+    3. Polls the chain contract for all blocks with transfers with one request.
+    4. Polls the finalized block once for all transfers and broadcasts a withdraw as soon as its block is finalized.
+    So the total time is close to one transfer time.
+    """
+
+    def __init__(
+        self,
+        network: Network,
+        el_account: BaseAccount,
+        timeout: float = 180,
+        poll_latency: float = 2,
+    ):
+        """
+        :param timeout: seconds to wait for all transfers since sending
+        :param poll_latency: seconds between polls of receipts and blocks on the chain contract
+        """
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.network = network
+        self.el_account = el_account
+        self.timeout = timeout
+        self.poll_latency = poll_latency
+        self.tracker = FinalizationTracker(network.cl_chain_contract)
+        self.receipt_tracker = ReceiptTracker(network.w3)
+        self._mined: List[Tuple[E2CTransfer, TrackedReceipt]] = []
+
+    def run(self, requests: List[E2CTransferRequest]) -> List[E2CTransfer]:
+        transfers = [E2CTransfer(i, x) for i, x in enumerate(requests)]
+        self._send(transfers)
+
+        end_time = time() + self.timeout
+        while not all(x.done for x in transfers):
+            # A failed request is repeated in the next iteration
+            if len(self.receipt_tracker) > 0:
+                try:
+                    self.receipt_tracker.poll()
+                except Exception as e:
+                    self.log.warning(f"[E] Can't poll receipts: {e}")
+            self._on_mined()
+            self._poll_contract_blocks(
+                [x for x in transfers if x.status == STATUS_MINED]
+            )
+            if len(self.tracker) > 0:
+                try:
+                    self.tracker.poll()
+                except Exception as e:
+                    self.log.warning(f"[C] Can't poll the finalized block: {e}")
+
+            if all(x.done for x in transfers):
+                break
+
+            now = time()
+            if now >= end_time:
+                for x in transfers:
+                    if not x.done:
+                        x.fail(
+                            f"Not withdrawn in {self.timeout} seconds, last status: {x.status}"
+                        )
+                break
+
+            if any(x.status in (STATUS_SENT, STATUS_MINED) for x in transfers):
+                delay = self.poll_latency
+            else:
+                delay = self.tracker.next_delay()
+            sleep(min(delay, end_time - now))
+
+        return transfers
+
+    def _send(self, transfers: List[E2CTransfer]):
+        """
+        Sends transactions of each bridge with pipelined batches
+        """
+        bridges = self.network.bridges
+        native_transfers = [x for x in transfers if not x.request.asset.erc20]
+        erc20_transfers = [x for x in transfers if x.request.asset.erc20]
+        for contract, group in [
+            (bridges.native_bridge, native_transfers),
+            (bridges.standard_bridge, erc20_transfers),
+        ]:
+            if not group:
+                continue
+
+            error = None
+            results: List[Optional[PipelinedTransaction]]
+            try:
+                results = contract.send_transactions(
+                    [self._contract_call(x.request) for x in group], self.el_account
+                )
+            except Exception as e:
+                results = [None] * len(group)
+                error = f"Can't send: {e}"
+            for transfer, result in zip(group, results):
+                if result is None:
+                    transfer.fail(error or "Can't send")
+                elif result.error:
+                    transfer.fail(f"Can't send: {result.error}")
+                else:
+                    self._on_sent(transfer, result.txn_hash)
+                if transfer.error:
+                    self.log.error(f"[E] #{transfer.index}: {transfer.error}")
+
+    def _contract(self, request: E2CTransferRequest) -> BaseContract:
+        bridges = self.network.bridges
+        return bridges.standard_bridge if request.asset.erc20 else bridges.native_bridge
+
+    @staticmethod
+    def _contract_call(request: E2CTransferRequest) -> ContractCall:
+        el_atomic_amount = Wei(
+            units.user_to_atomic(request.amount, request.asset.el_decimals)
+        )
+        cl_to = common_utils.waves_public_key_hash_bytes(request.cl_account)
+        if request.asset.erc20:
+            return ContractCall(
+                "bridgeERC20",
+                [
+                    request.asset.erc20.contract_address,
+                    Web3.to_checksum_address(cl_to),
+                    el_atomic_amount,
+                ],
+            )
+        return ContractCall("sendNative", [cl_to], el_atomic_amount)
+
+    def _on_sent(self, transfer: E2CTransfer, txn_hash: HexStr):
+        request = transfer.request
+        transfer.send_txn_hash = txn_hash
+        self.receipt_tracker.add(
+            txn_hash, lambda r, x=transfer: self._mined.append((x, r))
+        )
+        self.log.info(
+            f"[E] #{transfer.index}: sent {request.amount} {request.asset.waves_asset_name} "
+            f"to {request.cl_account.address} in {txn_hash}"
+        )
+
+    def _on_mined(self):
+        """
+        Builds params of mined transfers once per block. Transfers of a block, that can't be requested, are kept for the
+        next iteration
+        """
+        by_block: Dict[HexBytes, List[Tuple[E2CTransfer, TrackedReceipt]]] = {}
+        for x, r in self._mined:
+            if r.error:
+                x.fail(f"Can't get a receipt of {x.send_txn_hash}: {r.error}")
+            elif r.receipt["status"] != 1:  # type: ignore
+                self._contract(x.request).on_receipt(
+                    self._contract_call(x.request).function_name, r.receipt  # type: ignore
+                )
+                x.fail(f"Transaction {x.send_txn_hash} failed")
+            else:
+                by_block.setdefault(r.receipt["blockHash"], []).append((x, r))  # type: ignore
+                self.log.debug(f"[E] #{x.index}: receipt in {r.latency:.1f}s")
+
+        bridges = self.network.bridges
+        retry: List[Tuple[E2CTransfer, TrackedReceipt]] = []
+        for block_hash, group in by_block.items():
+            try:
+                block = bridges.get_e2c_block(block_hash)
+            except Exception as e:
+                self.log.warning(
+                    f"[E] Can't get transfers in {block_hash.to_0x_hex()}: {e}"
+                )
+                retry.extend(group)
+                continue
+
+            for x, r in group:
+                try:
+                    x.params = bridges.get_e2c_block_transfer_params(
+                        block, r.receipt["transactionHash"]  # type: ignore
+                    )
+                except Exception as e:
+                    x.fail(f"Can't get transfer params: {e}")
+                    self.log.error(f"[E] #{x.index}: {x.error}")
+                    continue
+
+                x.status = STATUS_MINED
+                self.log.info(f"[E] #{x.index}: mined in {block_hash.to_0x_hex()}")
+        self._mined = retry
+
+    def _poll_contract_blocks(self, transfers: List[E2CTransfer]):
+        if not transfers:
+            return
+
+        block_hashes = list(
+            {x.params.block_with_transfer_hash: None for x in transfers}.keys()  # type: ignore
+        )
+        try:
+            block_metas = self.network.cl_chain_contract.getBlockMetas(block_hashes)
+        except Exception as e:
+            self.log.warning(f"[C] Can't get blocks on chain contract: {e}")
+            return
+
+        contract_blocks = {
+            block_hash: block
+            for block_hash, block in zip(block_hashes, block_metas)
+            if block
+        }
+        for x in transfers:
+            block = contract_blocks.get(x.params.block_with_transfer_hash)  # type: ignore
+            if not block:
+                continue
+
+            x.contract_block = block
+            x.status = STATUS_ON_CONTRACT
+            self.log.info(f"[C] #{x.index}: found {block} on chain contract")
+            self.tracker.add(block, lambda _, x=x: self._withdraw(x))
+
+    def _withdraw(self, transfer: E2CTransfer):
+        request = transfer.request
+        params: E2CTransferParams = transfer.params  # type: ignore
+        try:
+            r = self.network.cl_chain_contract.withdrawAsset(
+                sender=request.cl_account,
+                blockHashWithTransfer=params.block_with_transfer_hash,
+                merkleProofs=params.merkle_proofs,
+                transferIndexInBlock=params.transfer_index_in_block,
+                atomicAmount=units.user_to_atomic(
+                    request.amount, request.asset.waves_asset.decimals
+                ),
+                asset=request.asset.waves_asset,
+            )
+        except Exception as e:
+            r = {"error": str(e)}
+
+        transfer.withdraw_result = r
+        if not r or r == "ERROR" or "error" in r:
+            transfer.fail(f"Can't withdraw: {r}")
+            self.log.error(f"[C] #{transfer.index}: {transfer.error}")
+        else:
+            transfer.status = STATUS_WITHDRAWN
+            self.log.info(f"[C] #{transfer.index}: withdrawn in {r.get('id')}")
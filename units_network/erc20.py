@@ -1,34 +1,78 @@
-import json
-from functools import cached_property
-from importlib.resources import files
+from dataclasses import dataclass, field
+from typing import Any, List, Optional, Tuple
 
 from eth_account.signers.base import BaseAccount
-from eth_typing import ChecksumAddress
+from eth_typing import ChecksumAddress, HexStr
 from web3 import Web3
-from web3.types import Wei
+from web3.types import BlockIdentifier, RPCEndpoint, RPCResponse, Wei
 
+from units_network import rpc_metrics
+from units_network.abi_cache import load_abi
 from units_network.base_contract import BaseContract
 
 
 class Erc20(BaseContract):
-    def __init__(self, w3: Web3, contract_address: ChecksumAddress):
-        json_abi = files("units_network").joinpath("abi/Erc20.json").read_text()
-        abi = json.loads(json_abi)
+    def __init__(
+        self,
+        w3: Web3,
+        contract_address: ChecksumAddress,
+        name: Optional[str] = None,
+        decimals: Optional[int] = None,
+    ):
+        """
+        :param name: a known name, requested from the contract if None
+        :param decimals: known decimals, requested from the contract if None
+        """
+        abi = load_abi("Erc20")
         super().__init__(w3, contract_address, abi)
+        self._name = name
+        self._decimals = decimals
 
-    @cached_property
-    def name(self) -> int:
-        return self.contract.functions.name().call()
+    @property
+    def name(self) -> str:
+        if self._name is None:
+            self._name = self.contract.functions.name().call()
+        return self._name
 
-    @cached_property
+    @property
     def decimals(self) -> int:
-        return self.contract.functions.decimals().call()
+        if self._decimals is None:
+            self._decimals = self.contract.functions.decimals().call()
+        return self._decimals
+
+    @decimals.setter
+    def decimals(self, value: int):
+        self._decimals = value
+
+    @property
+    def known_decimals(self) -> Optional[int]:
+        """
+        :return: decimals without a request, None if they weren't requested yet
+        """
+        return self._decimals
 
     def get_balance(self, address: ChecksumAddress) -> Wei:
         return self.contract.functions.balanceOf(address).call(
             block_identifier="pending"
         )
 
+    def get_allowance(
+        self, owner_address: ChecksumAddress, spender_address: ChecksumAddress
+    ) -> Wei:
+        return self.contract.functions.allowance(owner_address, spender_address).call(
+            block_identifier="pending"
+        )
+
+    def approve_if_needed(
+        self, spender_address: ChecksumAddress, amount: Wei, sender_account: BaseAccount
+    ) -> Optional[HexStr]:
+        """
+        :return: None if the current allowance already covers the amount, otherwise a hash of the approve transaction
+        """
+        if self.get_allowance(sender_account.address, spender_address) >= amount:
+            return None
+        return self.approve(spender_address, amount, sender_account)
+
     def approve(
         self, spender_address: ChecksumAddress, amount: Wei, sender_account: BaseAccount
     ):
@@ -42,3 +86,123 @@ class Erc20(BaseContract):
         self, to_address: ChecksumAddress, amount: Wei, sender_account: BaseAccount
     ):
         return self.send_transaction("transfer", [to_address, amount], sender_account)
+
+
+@dataclass
+class Erc20Read:
+    token: Erc20
+    # balanceOf, allowance, decimals or other view function
+    function_name: str
+    args: List[Any] = field(default_factory=list)
+
+
+def read_many(
+    w3: Web3,
+    reads: List[Erc20Read],
+    batch_size: int = 100,
+    block_identifier: BlockIdentifier = "pending",
+) -> List[Any]:
+    """
+    Reads many ERC20 values with JSON-RPC batches of eth_call, or with a request per value if a provider doesn't support
+    batches
+    :return: values in the same order
+    :raises Exception: if a value can't be read
+    """
+    block = (
+        block_identifier
+        if isinstance(block_identifier, str)
+        else w3.to_hex(block_identifier)  # type: ignore
+    )
+    r: List[Any] = []
+    for start in range(0, len(reads), batch_size):
+        batch = reads[start : start + batch_size]
+        try:
+            responses = _read_batch(w3, batch, block)
+        except rpc_metrics.BatchNotSupported:
+            r.extend(_read(x, block_identifier) for x in batch)
+            continue
+
+        for x, response in zip(batch, responses):
+            if response is None:
+                # Responses can't be matched to requests, see rpc_metrics.make_batch_request
+                r.append(_read(x, block_identifier))
+                continue
+            if response.get("error"):
+                raise Exception(
+                    f"Can't call {x.function_name}{tuple(x.args)} of {x.token.contract_address}: {response['error']}"
+                )
+            fn = getattr(x.token.contract.functions, x.function_name)
+            output_types = [o["type"] for o in fn.abi["outputs"]]
+            values = w3.codec.decode(
+                output_types, bytes.fromhex(response["result"][2:])
+            )
+            r.append(values[0] if len(values) == 1 else values)
+    return r
+
+
+def _read_batch(
+    w3: Web3, batch: List[Erc20Read], block: BlockIdentifier
+) -> List[Optional[RPCResponse]]:
+    return rpc_metrics.make_batch_request(
+        w3,
+        [
+            (
+                RPCEndpoint("eth_call"),
+                [
+                    {
+                        "to": x.token.contract_address,
+                        "data": x.token.contract.encode_abi(x.function_name, x.args),
+                    },
+                    block,
+                ],
+            )
+            for x in batch
+        ],
+    )
+
+
+def _read(x: Erc20Read, block_identifier: BlockIdentifier) -> Any:
+    return getattr(x.token.contract.functions, x.function_name)(*x.args).call(
+        block_identifier=block_identifier
+    )
+
+
+def get_balances(
+    w3: Web3, pairs: List[Tuple[Erc20, ChecksumAddress]], batch_size: int = 100
+) -> List[Wei]:
+    """
+    :param pairs: (token, holder) pairs
+    """
+    return read_many(
+        w3,
+        [Erc20Read(token, "balanceOf", [holder]) for token, holder in pairs],
+        batch_size,
+    )
+
+
+def get_allowances(
+    w3: Web3,
+    triples: List[Tuple[Erc20, ChecksumAddress, ChecksumAddress]],
+    batch_size: int = 100,
+) -> List[Wei]:
+    """
+    :param triples: (token, owner, spender) triples
+    """
+    return read_many(
+        w3,
+        [
+            Erc20Read(token, "allowance", [owner, spender])
+            for token, owner, spender in triples
+        ],
+        batch_size,
+    )
+
+
+def load_decimals(w3: Web3, tokens: List[Erc20], batch_size: int = 100):
+    """
+    Requests decimals of tokens, which don't know them, at once
+    """
+    unknown = [x for x in tokens if x.known_decimals is None]
+    values = read_many(w3, [Erc20Read(x, "decimals") for x in unknown], batch_size)
+    for x, decimals in zip(unknown, values):
+        x.decimals = decimals
@@ -1,11 +1,18 @@
-import requests
+from typing import Optional
+
 from pywaves import pw
 
+from units_network import cl_transport
+from units_network.cl_transport import ClTransport
+
 
 class ExtendedAddress(pw.Address):
+    # The shared one if None
+    transport: Optional[ClTransport] = None
+
     def scriptInfo(self):
         url = f"{self.pywaves.NODE}/addresses/scriptInfo/{self.address}"
-        response = requests.get(url)
+        response = (self.transport or cl_transport.get_default()).get(url)
 
         if response.status_code == 200:
             return response.json()
@@ -1,16 +1,54 @@
+from typing import List, Optional
+
 import pywaves as pw
-import requests
+
+from units_network import cl_transport
+from units_network.cl_transport import ClTransport
 
 
 class ExtendedOracle(pw.Oracle):
+    # The shared one if None
+    transport: Optional[ClTransport] = None
+
+    def getTransport(self) -> ClTransport:
+        return self.transport or cl_transport.get_default()
+
     def evaluate(self, query):
         url = f"{self.pw.NODE}/utils/script/evaluate/{self.oracleAddress}"
         headers = {"Content-Type": "application/json"}
         data = {"expr": query}
 
-        response = requests.post(url, headers=headers, json=data)
+        response = self.getTransport().post(url, headers=headers, json=data)
 
         if response.status_code == 200:
             return response.json()
         else:
             raise Exception(f"Error: {response.status_code}, {response.text}")
+
+    def _getDataWithRegex(self, regex):
+        url = f"{self.pw.NODE}/addresses/data/{self.oracleAddress}?matches={regex}"
+        return self.getTransport().get(url).json()
+
+    def _getDataWithoutKey(self):
+        url = f"{self.pw.NODE}/addresses/data/{self.oracleAddress}"
+        return self.getTransport().get(url).json()
+
+    def _getDataWithKey(self, key):
+        url = f"{self.pw.NODE}/addresses/data/{self.oracleAddress}/{key}"
+        return self.getTransport().get(url).json()["value"]
+
+    def getAssetsDetails(self, assetIds: List[str], chunkSize: int = 100) -> List[dict]:
+        """
+        Gets details of many assets with one request per chunkSize assets.
+        :param assetIds: Base58 ids, without WAVES
+        """
+        url = f"{self.pw.NODE}/assets/details"
+        r = []
+        for start in range(0, len(assetIds), chunkSize):
+            data = {"ids": assetIds[start : start + chunkSize]}
+            response = self.getTransport().post(url, json=data)
+            if response.status_code == 200:
+                r.extend(response.json())
+            else:
+                raise Exception(f"Error: {response.status_code}, {response.text}")
+        return r
@@ -0,0 +1,261 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from threading import Lock
+from time import time
+from typing import Any, Dict, Optional, Tuple
+from weakref import WeakKeyDictionary
+
+from eth_typing import ChecksumAddress
+from web3 import AsyncWeb3, Web3
+from web3.types import FeeHistory, Wei
+
+
+@dataclass
+class FeePolicy:
+    # A percentile of priority fees paid in recent blocks
+    reward_percentile: float
+    # Covers a growth of the base fee in next blocks: 2 - up to 6 full blocks in a row
+    base_fee_multiplier: float
+    min_priority_fee: Wei = Wei(1)
+
+
+POLICY_SLOW = FeePolicy(reward_percentile=10, base_fee_multiplier=1.25)
+POLICY_NORMAL = FeePolicy(reward_percentile=50, base_fee_multiplier=2)
+POLICY_FAST = FeePolicy(reward_percentile=90, base_fee_multiplier=3)
+
+
+@dataclass
+class Fees:
+    max_fee_per_gas: Wei
+    max_priority_fee_per_gas: Wei
+    # Only for nodes without EIP-1559 support, then other fields are ignored
+    gas_price: Optional[Wei] = None
+
+    def to_txn_params(self) -> Dict[str, Any]:
+        if self.gas_price is not None:
+            return {"gasPrice": self.gas_price}
+        return {
+            "maxFeePerGas": self.max_fee_per_gas,
+            "maxPriorityFeePerGas": self.max_priority_fee_per_gas,
+        }
+
+
+class FeeOracle:
+    """
+    Provides type-2 transaction fees from eth_feeHistory and gas limits from eth_estimateGas with caching:
+    - fees are requested at most once per cache_ttl seconds, about an EL block time. Falls back to eth_gasPrice if a
+      node doesn't support eth_feeHistory;
+    - a gas limit is estimated once per (contract, function, sender) and multiplied by gas_margin, because next calls
+      with other arguments can touch other storage slots. Set gas_margin to None to estimate each transaction.
+    A call with a cached gas limit isn't simulated before sending, so a reverting call fails on chain. Call
+    invalidate_gas after a transaction failed, e.g. ran out of gas, see BaseContract.on_receipt.
+    """
+
+    def __init__(
+        self,
+        w3: Web3,
+        policy: FeePolicy = POLICY_NORMAL,
+        history_blocks: int = 10,
+        cache_ttl: float = 5,
+        gas_margin: Optional[float] = 1.3,
+    ):
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.w3 = w3
+        self.policy = policy
+        self.history_blocks = history_blocks
+        self.cache_ttl = cache_ttl
+        self.gas_margin = gas_margin
+        self._fees: Optional[Fees] = None
+        self._fees_updated_at = 0.0
+        self._gas_limits: Dict[Tuple[ChecksumAddress, str, ChecksumAddress], int] = {}
+        self._lock = Lock()
+
+    def get_fees(self) -> Fees:
+        with self._lock:
+            now = time()
+            if self._fees is None or now - self._fees_updated_at >= self.cache_ttl:
+                self._fees = self._request_fees()
+                self._fees_updated_at = now
+                self.log.debug(f"Updated fees: {self._fees}")
+            return self._fees
+
+    def estimate_gas(
+        self,
+        contract_address: ChecksumAddress,
+        function_name: str,
+        fn,
+        call_attrs: Dict[str, Any],
+    ) -> int:
+        """
+        :param fn: a contract function with arguments
+        """
+        if self.gas_margin is None:
+            return fn.estimate_gas(call_attrs)
+
+        key = (contract_address, function_name, call_attrs["from"])
+        with self._lock:
+            r = self._gas_limits.get(key)
+        if r is None:
+            r = int(fn.estimate_gas(call_attrs) * self.gas_margin)
+            with self._lock:
+                self._gas_limits[key] = r
+        return r
+
+    def invalidate_gas(self, contract_address: ChecksumAddress, function_name: str):
+        """Call after a transaction failed or ran out of gas"""
+        with self._lock:
+            for key in list(self._gas_limits.keys()):
+                if key[0] == contract_address and key[1] == function_name:
+                    del self._gas_limits[key]
+
+    def _request_fees(self) -> Fees:
+        try:
+            history = self.w3.eth.fee_history(
+                self.history_blocks, "latest", [self.policy.reward_percentile]
+            )
+        except Exception as e:
+            self.log.debug(f"Can't get a fee history, using a gas price: {e}")
+            return self._legacy_fees()
+
+        return fees_from_history(history, self.policy) or self._legacy_fees()
+
+    def _legacy_fees(self) -> Fees:
+        gas_price = self.w3.eth.gas_price
+        return Fees(gas_price, gas_price, gas_price=gas_price)
+
+
+def fees_from_history(history: FeeHistory, policy: FeePolicy) -> Optional[Fees]:
+    """
+    :return: None if the history has no base fees, so a node doesn't support EIP-1559
+    """
+    base_fees = history.get("baseFeePerGas") or []
+    if not base_fees or not base_fees[-1]:
+        return None
+
+    rewards = sorted(x[0] for x in history.get("reward") or [] if x)
+    priority_fee = Wei(
+        max(
+            rewards[len(rewards) // 2] if rewards else 0,
+            policy.min_priority_fee,
+        )
+    )
+    # The last one is the base fee of the next block
+    max_fee = Wei(int(base_fees[-1] * policy.base_fee_multiplier) + priority_fee)
+    return Fees(max_fee_per_gas=max_fee, max_priority_fee_per_gas=priority_fee)
+
+
+class AsyncFeeOracle:
+    """
+    FeeOracle for AsyncWeb3 with the same policy and caching
+    """
+
+    def __init__(
+        self,
+        w3: AsyncWeb3,
+        policy: FeePolicy = POLICY_NORMAL,
+        history_blocks: int = 10,
+        cache_ttl: float = 5,
+        gas_margin: Optional[float] = 1.3,
+    ):
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.w3 = w3
+        self.policy = policy
+        self.history_blocks = history_blocks
+        self.cache_ttl = cache_ttl
+        self.gas_margin = gas_margin
+        self._fees: Optional[Fees] = None
+        self._fees_updated_at = 0.0
+        self._gas_limits: Dict[Tuple[ChecksumAddress, str, ChecksumAddress], int] = {}
+        # A lock works only in the loop, where it was used first
+        self._locks: "WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+            WeakKeyDictionary()
+        )
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        r = self._locks.get(loop)
+        if r is None:
+            r = asyncio.Lock()
+            self._locks[loop] = r
+        return r
+
+    async def get_fees(self) -> Fees:
+        async with self._get_lock():
+            now = time()
+            if self._fees is None or now - self._fees_updated_at >= self.cache_ttl:
+                self._fees = await self._request_fees()
+                self._fees_updated_at = now
+                self.log.debug(f"Updated fees: {self._fees}")
+            return self._fees
+
+    async def estimate_gas(
+        self,
+        contract_address: ChecksumAddress,
+        function_name: str,
+        fn,
+        call_attrs: Dict[str, Any],
+    ) -> int:
+        """
+        See FeeOracle.estimate_gas
+        """
+        if self.gas_margin is None:
+            return await fn.estimate_gas(call_attrs)
+
+        key = (contract_address, function_name, call_attrs["from"])
+        r = self._gas_limits.get(key)
+        if r is None:
+            r = int(await fn.estimate_gas(call_attrs) * self.gas_margin)
+            self._gas_limits[key] = r
+        return r
+
+    def invalidate_gas(self, contract_address: ChecksumAddress, function_name: str):
+        """Call after a transaction failed or ran out of gas"""
+        for key in list(self._gas_limits.keys()):
+            if key[0] == contract_address and key[1] == function_name:
+                del self._gas_limits[key]
+
+    async def _request_fees(self) -> Fees:
+        try:
+            history = await self.w3.eth.fee_history(
+                self.history_blocks, "latest", [self.policy.reward_percentile]
+            )
+        except Exception as e:
+            self.log.debug(f"Can't get a fee history, using a gas price: {e}")
+            history = None
+
+        r = fees_from_history(history, self.policy) if history else None
+        if r is None:
+            gas_price = await self.w3.eth.gas_price
+            r = Fees(gas_price, gas_price, gas_price=gas_price)
+        return r
+
+
+_fee_oracles: "WeakKeyDictionary[Web3, FeeOracle]" = WeakKeyDictionary()
+_fee_oracles_lock = Lock()
+
+
+def get_fee_oracle(w3: Web3) -> FeeOracle:
+    """
+    :return: an oracle shared by all contracts of this Web3 instance
+    """
+    with _fee_oracles_lock:
+        r = _fee_oracles.get(w3)
+        if r is None:
+            r = FeeOracle(w3)
+            _fee_oracles[w3] = r
+        return r
+
+
+_async_fee_oracles: "WeakKeyDictionary[AsyncWeb3, AsyncFeeOracle]" = WeakKeyDictionary()
+
+
+def get_async_fee_oracle(w3: AsyncWeb3) -> AsyncFeeOracle:
+    """
+    :return: an oracle shared by all contracts of this AsyncWeb3 instance
+    """
+    r = _async_fee_oracles.get(w3)
+    if r is None:
+        r = AsyncFeeOracle(w3)
+        _async_fee_oracles[w3] = r
+    return r
@@ -0,0 +1,83 @@
+import logging
+from time import time
+from typing import Callable, List, Optional, Tuple
+
+from units_network.chain_contract import ChainContract, ContractBlock
+from units_network.polling import PollingStrategy, WaitState
+
+
+class FinalizationTracker:
+    """
+    Polls the finalized block of a chain contract once for all waiters and calls their callbacks when their blocks
+    are finalized.
+    """
+
+    def __init__(
+        self,
+        chain_contract: ChainContract,
+        polling: Optional[PollingStrategy] = None,
+    ):
+        """
+        :param polling: the polling strategy of the chain contract if None
+        """
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.chain_contract = chain_contract
+        self.polling = polling or chain_contract.polling
+        self.state = WaitState(started_at=time())
+        self.finalized_block: Optional[ContractBlock] = None
+        self._waiters: List[Tuple[ContractBlock, Callable[[ContractBlock], None]]] = []
+
+    def add(self, block: ContractBlock, callback: Callable[[ContractBlock], None]):
+        """
+        :param callback: called with the block during add() or poll(), when the block is finalized
+        """
+        if (
+            self.finalized_block
+            and self.finalized_block.chain_height >= block.chain_height
+        ):
+            callback(block)
+        else:
+            self._waiters.append((block, callback))
+            self._update_target()
+
+    def __len__(self) -> int:
+        return len(self._waiters)
+
+    def poll(self) -> ContractBlock:
+        """
+        Requests the finalized block and calls callbacks of finalized blocks
+        """
+        self.finalized_block = self.chain_contract.getFinalizedBlock()
+        self.state.polls += 1
+        self.state.observe(
+            self.finalized_block.chain_height, self.finalized_block.epoch_number
+        )
+
+        finalized_height = self.finalized_block.chain_height
+        waiting = []
+        for block, callback in self._waiters:
+            if block.chain_height <= finalized_height:
+                callback(block)
+            else:
+                waiting.append((block, callback))
+        if len(waiting) != len(self._waiters):
+            self.log.debug(
+                f"{len(self._waiters) - len(waiting)} blocks finalized at {self.finalized_block}, "
+                f"{len(waiting)} left"
+            )
+        self._waiters = waiting
+        self._update_target()
+        return self.finalized_block
+
+    def next_delay(self) -> float:
+        """
+        :return: seconds before the next poll by the polling strategy for the lowest waiting block
+        """
+        return self.polling.next_delay(self.state)
+
+    def _update_target(self):
+        self.state.target_height = (
+            min(block.chain_height for block, _ in self._waiters)
+            if self._waiters
+            else None
+        )
@@ -0,0 +1,242 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from time import sleep, time
+from typing import AsyncIterator, Awaitable, Callable, Iterator, List, Optional, Tuple
+
+import requests
+from eth_typing import BlockNumber
+from web3.types import LogReceipt
+
+# Parts of error messages from popular EL clients and providers when a range is too wide or has too many logs
+TOO_LARGE_ERROR_MARKERS = [
+    "query returned more than",
+    "exceed maximum block range",
+    "exceeds maximum block range",
+    "exceeds the range",
+    "block range is too large",
+    "block range too large",
+    "range is too large",
+    "requested too many blocks",
+    "too many logs",
+    "too many results",
+    "response size exceeded",
+    "response size should not exceed",
+    "is limited to a",
+    "timeout",
+    "timed out",
+]
+
+# Parts of error messages when a provider limits a request rate
+RATE_LIMIT_ERROR_MARKERS = [
+    "rate limit",
+    "rate-limit",
+    "ratelimit",
+    "too many requests",
+    "request limit",
+    "requests limit",
+]
+
+
+def is_rate_limit_error(e: Exception) -> bool:
+    response = getattr(e, "response", None)
+    if getattr(response, "status_code", None) == 429:
+        return True
+    message = str(e).lower()
+    return any(x in message for x in RATE_LIMIT_ERROR_MARKERS)
+
+
+def is_too_large_error(e: Exception) -> bool:
+    if isinstance(e, (requests.exceptions.Timeout, TimeoutError)):
+        return True
+    if is_rate_limit_error(e):
+        return False
+    message = str(e).lower()
+    return any(x in message for x in TOO_LARGE_ERROR_MARKERS)
+
+
+@dataclass
+class LogScanStats:
+    started_at: float = field(default_factory=time)
+    requests: int = 0
+    failed_requests: int = 0
+    rate_limited_requests: int = 0
+    blocks: int = 0
+    logs: int = 0
+
+    @property
+    def elapsed(self) -> float:
+        return time() - self.started_at
+
+    @property
+    def blocks_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.blocks / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def logs_per_second(self) -> float:
+        elapsed = self.elapsed
+        return self.logs / elapsed if elapsed > 0 else 0.0
+
+
+class LogRangeScanner:
+    """
+    Walks a block range with get_logs requests in chunks of blocks.
+    A chunk shrinks when a node rejects it as too large or times out, and grows while responses have less than
+    target_logs logs. A rate-limited request is retried with the same chunk after an exponential backoff.
+    Only one chunk of logs is kept in memory.
+    """
+
+    def __init__(
+        self,
+        get_logs: Callable[[BlockNumber, BlockNumber], List[LogReceipt]],
+        chunk_size: int = 1000,
+        min_chunk_size: int = 1,
+        max_chunk_size: int = 100_000,
+        target_logs: int = 2000,
+        rate_limit_delay: float = 1,
+        max_rate_limit_delay: float = 30,
+        max_rate_limit_retries: int = 8,
+    ):
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.get_logs = get_logs
+        self.chunk_size = chunk_size
+        self.min_chunk_size = min_chunk_size
+        self.max_chunk_size = max_chunk_size
+        self.target_logs = target_logs
+        self.rate_limit_delay = rate_limit_delay
+        self.max_rate_limit_delay = max_rate_limit_delay
+        self.max_rate_limit_retries = max_rate_limit_retries
+        self._rate_limit_retries = 0
+        self.stats = LogScanStats()
+        # The smallest chunk a node has rejected, growth approaches it by halves
+        self.rejected_chunk_size: Optional[int] = None
+
+    def scan_chunks(
+        self, from_block: int, to_block: int
+    ) -> Iterator[Tuple[BlockNumber, BlockNumber, List[LogReceipt]]]:
+        """
+        :return: (first block, last block, logs) of each chunk in the block order
+        """
+        while from_block <= to_block:
+            chunk_to_block = self._next_chunk_to_block(from_block, to_block)
+            try:
+                logs = self.get_logs(
+                    BlockNumber(from_block), BlockNumber(chunk_to_block)
+                )
+            except Exception as e:
+                delay = self._on_error(e)
+                if delay > 0:
+                    sleep(delay)
+                continue
+
+            self._on_chunk(from_block, chunk_to_block, logs)
+            yield BlockNumber(from_block), BlockNumber(chunk_to_block), logs
+            from_block = chunk_to_block + 1
+
+    def scan(self, from_block: int, to_block: int) -> Iterator[LogReceipt]:
+        for _, _, logs in self.scan_chunks(from_block, to_block):
+            yield from logs
+
+    def _next_chunk_to_block(self, from_block: int, to_block: int) -> int:
+        self.stats.requests += 1
+        return min(to_block, from_block + self.chunk_size - 1)
+
+    def _on_error(self, e: Exception) -> float:
+        """
+        Shrinks a chunk or re-raises e
+        :return: seconds to wait before a retry
+        """
+        self.stats.failed_requests += 1
+        if is_rate_limit_error(e):
+            if self._rate_limit_retries >= self.max_rate_limit_retries:
+                raise e
+            delay = min(
+                self.max_rate_limit_delay,
+                self.rate_limit_delay * 2**self._rate_limit_retries,
+            )
+            self._rate_limit_retries += 1
+            self.stats.rate_limited_requests += 1
+            self.log.debug(f"Rate limited, retry in {delay}s: {e}")
+            return delay
+
+        if not is_too_large_error(e) or self.chunk_size <= self.min_chunk_size:
+            raise e
+        if (
+            self.rejected_chunk_size is None
+            or self.chunk_size < self.rejected_chunk_size
+        ):
+            self.rejected_chunk_size = self.chunk_size
+        self.chunk_size = max(self.min_chunk_size, self.chunk_size // 2)
+        self.log.debug(f"Shrink chunk to {self.chunk_size} blocks: {e}")
+        return 0
+
+    def _on_chunk(self, from_block: int, to_block: int, logs: List[LogReceipt]):
+        self._rate_limit_retries = 0
+        blocks = to_block - from_block + 1
+        self.stats.blocks += blocks
+        self.stats.logs += len(logs)
+        self._adapt(blocks, len(logs))
+
+    def _adapt(self, blocks: int, logs: int):
+        if blocks < self.chunk_size:
+            # The last chunk of a range
+            return
+
+        if logs > self.target_logs:
+            # Proportionally, but not more than twice
+            new_size = max(
+                self.chunk_size // 2, self.chunk_size * self.target_logs // logs
+            )
+        elif logs < self.target_logs // 2:
+            new_size = self.chunk_size * 2
+            if self.rejected_chunk_size is not None:
+                new_size = min(
+                    new_size, (self.chunk_size + self.rejected_chunk_size) // 2
+                )
+        else:
+            return
+
+        new_size = min(self.max_chunk_size, max(self.min_chunk_size, new_size))
+        if new_size != self.chunk_size:
+            self.log.debug(f"Chunk {self.chunk_size} -> {new_size} blocks, {logs} logs")
+            self.chunk_size = new_size
+
+
+class AsyncLogRangeScanner(LogRangeScanner):
+    """
+    LogRangeScanner with an async get_logs
+    """
+
+    def __init__(
+        self,
+        get_logs: Callable[[BlockNumber, BlockNumber], Awaitable[List[LogReceipt]]],
+        **kwargs,
+    ):
+        super().__init__(get_logs, **kwargs)  # type: ignore
+
+    async def scan_chunks(  # type: ignore
+        self, from_block: int, to_block: int
+    ) -> AsyncIterator[Tuple[BlockNumber, BlockNumber, List[LogReceipt]]]:
+        while from_block <= to_block:
+            chunk_to_block = self._next_chunk_to_block(from_block, to_block)
+            try:
+                logs = await self.get_logs(  # type: ignore
+                    BlockNumber(from_block), BlockNumber(chunk_to_block)
+                )
+            except Exception as e:
+                delay = self._on_error(e)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                continue
+
+            self._on_chunk(from_block, chunk_to_block, logs)
+            yield BlockNumber(from_block), BlockNumber(chunk_to_block), logs
+            from_block = chunk_to_block + 1
+
+    async def scan(  # type: ignore
+        self, from_block: int, to_block: int
+    ) -> AsyncIterator[LogReceipt]:
+        async for _, _, logs in self.scan_chunks(from_block, to_block):
+            for log in logs:
+                yield log
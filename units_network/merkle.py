@@ -4,7 +4,8 @@ from typing import List
 from hexbytes import HexBytes
 from pymerkle import InmemoryTree as BaseMerkleTree
 
-MIN_E2C_TRANSFERS = 1024
+MIN_E2C_TRANSFERS = 1024  # Must be a power of two
+EMPTY_E2C_LEAF = bytes([0])
 
 
 def blake2b_hash(data=None):
@@ -14,6 +15,21 @@ def blake2b_hash(data=None):
         return blake2b(digest_size=32)
 
 
+def _hash(data: bytes) -> bytes:
+    return blake2b(data, digest_size=32).digest()
+
+
+def _empty_subtree_hashes(min_size: int) -> List[bytes]:
+    # r[k] is a root of a perfect subtree with 2^k empty leaves
+    r = [_hash(EMPTY_E2C_LEAF)]
+    while (1 << (len(r) - 1)) < min_size:
+        r.append(_hash(r[-1] + r[-1]))
+    return r
+
+
+EMPTY_E2C_SUBTREES = _empty_subtree_hashes(MIN_E2C_TRANSFERS)
+
+
 # Custom hasher class with blake2b algorithm
 class Blake2bHashMerkleTree(BaseMerkleTree):
     def __init__(self):
@@ -23,18 +39,75 @@ class Blake2bHashMerkleTree(BaseMerkleTree):
         self.prefx01 = b""
 
 
+class E2CMerkleTree:
+    """
+    A Merkle tree of E2C transfers in one EL block, which is padded with empty leaves up to MIN_E2C_TRANSFERS.
+    Has the same shape and hashes as Blake2bHashMerkleTree, but the padding is taken from EMPTY_E2C_SUBTREES,
+    so the construction costs O(leaves + log(MIN_E2C_TRANSFERS)) hashes.
+    """
+
+    def __init__(self, leaves: List[bytes]):
+        self.size = len(leaves)
+        self.width = max(self.size, MIN_E2C_TRANSFERS)
+
+        # layers[0] are leaf hashes, layers[-1] is [root]. Only nodes with real leaves are stored
+        layer = [_hash(x) for x in leaves]
+        width = self.width
+        self.layers = [layer]
+        while width > 1:
+            level = len(self.layers) - 1
+            n = len(layer)
+            next_layer = [_hash(layer[i] + layer[i + 1]) for i in range(0, n - 1, 2)]
+            if n % 2 == 1:
+                if n < width:
+                    next_layer.append(_hash(layer[-1] + EMPTY_E2C_SUBTREES[level]))
+                else:
+                    # An odd last node without a sibling is promoted to the next level
+                    next_layer.append(layer[-1])
+            layer = next_layer
+            width = (width + 1) // 2
+            self.layers.append(layer)
+
+    @property
+    def root(self) -> HexBytes:
+        top = self.layers[-1]
+        return HexBytes(top[0] if top else EMPTY_E2C_SUBTREES[-1])
+
+    def get_proofs(self, leaf_index: int) -> List[HexBytes]:
+        if leaf_index < 0 or leaf_index >= self.size:
+            raise ValueError(f"{leaf_index} not in leaf range [0, {self.size})")
+
+        proofs: List[HexBytes] = []
+        i = leaf_index
+        width = self.width
+        for level, layer in enumerate(self.layers[:-1]):
+            sibling = i ^ 1
+            if sibling < len(layer):
+                proofs.append(HexBytes(layer[sibling]))
+            elif sibling < width:
+                proofs.append(HexBytes(EMPTY_E2C_SUBTREES[level]))
+            i >>= 1
+            width = (width + 1) // 2
+        return proofs
+
+
 def get_merkle_proofs(
     hex_leaves: List[HexBytes], for_leaf_index: int
+) -> List[HexBytes]:
+    return E2CMerkleTree(hex_leaves).get_proofs(for_leaf_index)
+
+
+def get_merkle_proofs_pymerkle(
+    hex_leaves: List[HexBytes], for_leaf_index: int
 ) -> List[HexBytes]:
     tree = Blake2bHashMerkleTree()
 
     for leaf in hex_leaves:
         tree.append_entry(leaf)
 
-    empty_hashed_leaf = bytes([0])
     empty_leaves = max(0, MIN_E2C_TRANSFERS - (tree.get_size() or 0))
     for _ in range(empty_leaves):
-        tree.append_entry(empty_hashed_leaf)
+        tree.append_entry(EMPTY_E2C_LEAF)
 
     # A number is required instead of index
     proof = tree.prove_inclusion(for_leaf_index + 1)
@@ -0,0 +1,186 @@
+import atexit
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from threading import Lock
+from time import perf_counter
+from typing import Any, Dict, List, Optional, Tuple
+
+CLIENT_CL = "cl"
+CLIENT_EL = "el"
+
+# Upper bounds in seconds, the last bucket is +Inf
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Addresses, ids and hashes in CL API paths
+_CL_PATH_ID_REGEX = re.compile(r"^[1-9A-HJ-NP-Za-km-z]{26,}$")
+
+
+@dataclass
+class MethodMetrics:
+    count: int = 0
+    errors: int = 0
+    seconds: float = 0
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    # Counts by LATENCY_BUCKETS, not cumulative
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+
+    def to_json_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "seconds": self.seconds,
+            "bytesSent": self.bytes_sent,
+            "bytesReceived": self.bytes_received,
+            "buckets": dict(
+                zip([str(x) for x in LATENCY_BUCKETS] + ["+Inf"], self.buckets)
+            ),
+        }
+
+
+class MetricsRegistry:
+    """
+    In-process counters of node API calls by (client, method): CL - by a normalized path, EL - by a JSON-RPC method.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[Tuple[str, str], MethodMetrics] = {}
+        self._lock = Lock()
+
+    def record(
+        self,
+        client: str,
+        method: str,
+        seconds: float,
+        error: bool = False,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+    ):
+        bucket = len(LATENCY_BUCKETS)
+        for i, x in enumerate(LATENCY_BUCKETS):
+            if seconds <= x:
+                bucket = i
+                break
+
+        with self._lock:
+            m = self._metrics.get((client, method))
+            if m is None:
+                m = MethodMetrics()
+                self._metrics[(client, method)] = m
+            m.count += 1
+            m.errors += int(error)
+            m.seconds += seconds
+            m.bytes_sent += bytes_sent
+            m.bytes_received += bytes_received
+            m.buckets[bucket] += 1
+
+    def snapshot(self) -> Dict[Tuple[str, str], MethodMetrics]:
+        with self._lock:
+            return {
+                k: MethodMetrics(
+                    v.count,
+                    v.errors,
+                    v.seconds,
+                    v.bytes_sent,
+                    v.bytes_received,
+                    list(v.buckets),
+                )
+                for k, v in self._metrics.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._metrics.clear()
+
+    def to_json_dict(self) -> Dict[str, Dict[str, Any]]:
+        r: Dict[str, Dict[str, Any]] = {}
+        for (client, method), m in sorted(self.snapshot().items()):
+            r.setdefault(client, {})[method] = m.to_json_dict()
+        return r
+
+    def to_prometheus(self) -> str:
+        lines = [
+            "# TYPE units_rpc_requests_total counter",
+            "# TYPE units_rpc_errors_total counter",
+            "# TYPE units_rpc_sent_bytes_total counter",
+            "# TYPE units_rpc_received_bytes_total counter",
+            "# TYPE units_rpc_duration_seconds histogram",
+        ]
+        for (client, method), m in sorted(self.snapshot().items()):
+            labels = f'client="{client}",method="{_escape_label(method)}"'
+            lines.append(f"units_rpc_requests_total{{{labels}}} {m.count}")
+            lines.append(f"units_rpc_errors_total{{{labels}}} {m.errors}")
+            lines.append(f"units_rpc_sent_bytes_total{{{labels}}} {m.bytes_sent}")
+            lines.append(
+                f"units_rpc_received_bytes_total{{{labels}}} {m.bytes_received}"
+            )
+            cumulative = 0
+            for le, x in zip([str(x) for x in LATENCY_BUCKETS] + ["+Inf"], m.buckets):
+                cumulative += x
+                lines.append(
+                    f'units_rpc_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}'
+                )
+            lines.append(f"units_rpc_duration_seconds_sum{{{labels}}} {m.seconds}")
+            lines.append(f"units_rpc_duration_seconds_count{{{labels}}} {m.count}")
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str):
+        """
+        :param path: JSON if ends with .json, otherwise Prometheus text format
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            if path.endswith(".json"):
+                json.dump(self.to_json_dict(), file, indent=2)
+            else:
+                file.write(self.to_prometheus())
+
+    def summary(self) -> str:
+        """
+        :return: one line per method, the slowest in total first
+        """
+        items = sorted(self.snapshot().items(), key=lambda x: -x[1].seconds)
+        return "\n".join(
+            f"{client} {method}: {m.count} calls, {m.errors} errors, {m.seconds:.3f}s, "
+            f"{m.bytes_sent}B sent, {m.bytes_received}B received"
+            for (client, method), m in items
+        )
+
+
+def _escape_label(x: str) -> str:
+    return x.replace("\\", "\\\\").replace('"', '\\"')
+
+
+_default = MetricsRegistry()
+
+
+def get_default() -> MetricsRegistry:
+    return _default
+
+
+def dump_at_exit(path: str, registry: Optional[MetricsRegistry] = None):
+    registry = registry or _default
+
+    def dump():
+        registry.dump(path)
+        logging.getLogger(__name__).info(f"RPC metrics are written to {path}")
+
+    atexit.register(dump)
+
+
+def cl_method(http_method: str, url: str) -> str:
+    """
+    :return: for example, "GET /addresses/data/*/*" for "https://node/addresses/data/3F.../key?x=1"
+    """
+    path = re.sub(r"^[a-z]+://[^/]+", "", url).split("?", 1)[0]
+    segments = []
+    after_id = False
+    for x in path.split("/"):
+        # Data keys and other segments after an id are variable too
+        if after_id or _CL_PATH_ID_REGEX.match(x):
+            segments.append("*")
+            after_id = True
+        else:
+            segments.append(x)
+    return f"{http_method} {'/'.join(segments)}"
@@ -1,7 +1,6 @@
-import json
 from dataclasses import dataclass
 from functools import cached_property
-from importlib.resources import files
+from typing import Any
 
 import pywaves as pw
 from eth_account.signers.base import BaseAccount
@@ -12,6 +11,7 @@ from web3 import Web3
 from web3.types import LogReceipt, Nonce, Wei
 
 from units_network import common_utils
+from units_network.abi_cache import load_abi
 from units_network.base_contract import BaseContract
 
 
@@ -31,10 +31,31 @@ class SentNative:
         )
 
 
-class NativeBridge(BaseContract):
+class NativeBridgeEvents:
+    """
+    Decoding of NativeBridge events, shared by NativeBridge and AsyncNativeBridge
+    """
+
+    contract: Any
+
+    @cached_property
+    def sent_native_topic(self) -> HexStr:
+        return HexStr(
+            "0x" + event_abi_to_log_topic(self.contract.events.SentNative().abi).hex()
+        )
+
+    def parse_sent_native(self, log: LogReceipt) -> SentNative:
+        args = self.contract.events.SentNative().process_log(log)["args"]
+        return SentNative(
+            waves_recipient=HexBytes(args["wavesRecipient"]),
+            amount=Wei(args["amount"]),
+            data=log["data"],
+        )
+
+
+class NativeBridge(NativeBridgeEvents, BaseContract):
     def __init__(self, w3: Web3, contract_address: ChecksumAddress):
-        json_abi = files("units_network").joinpath("abi/NativeBridge.json").read_text()
-        abi = json.loads(json_abi)
+        abi = load_abi("NativeBridge")
         super().__init__(w3, contract_address, abi)
 
     def send_native(
@@ -53,17 +74,3 @@ class NativeBridge(BaseContract):
             gas_price,
             nonce,
         )
-
-    @cached_property
-    def sent_native_topic(self) -> HexStr:
-        return HexStr(
-            "0x" + event_abi_to_log_topic(self.contract.events.SentNative().abi).hex()
-        )
-
-    def parse_sent_native(self, log: LogReceipt) -> SentNative:
-        args = self.contract.events.SentNative().process_log(log)["args"]
-        return SentNative(
-            waves_recipient=HexBytes(args["wavesRecipient"]),
-            amount=Wei(args["amount"]),
-            data=log["data"],
-        )
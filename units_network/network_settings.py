@@ -0,0 +1,49 @@
+from dataclasses import dataclass
+
+
+@dataclass
+class NetworkSettings:
+    name: str
+    cl_chain_id_str: str
+    cl_node_api_url: str
+    el_node_api_url: str
+    chain_contract_address: str
+
+    def __post_init__(self):
+        self.chain_id = ord(self.cl_chain_id_str)
+
+
+# Creating instances for each network
+stage_net = NetworkSettings(
+    name="StageNet",
+    cl_chain_id_str="S",
+    cl_node_api_url="https://nodes-stagenet.wavesnodes.com",
+    el_node_api_url="https://rpc-stagenet.unit0.dev",
+    chain_contract_address="3MjDHGn2ZbeXYj7YQ5ALArv5R2Vy914Phf7",
+)
+
+test_net = NetworkSettings(
+    name="TestNet",
+    cl_chain_id_str="T",
+    cl_node_api_url="https://nodes-testnet.wavesnodes.com",
+    el_node_api_url="https://rpc-testnet.unit0.dev",
+    chain_contract_address="3Msx4Aq69zWUKy4d1wyKnQ4ofzEDAfv5Ngf",
+)
+
+main_net = NetworkSettings(
+    name="MainNet",
+    cl_chain_id_str="W",
+    cl_node_api_url="https://nodes.wavesnodes.com",
+    el_node_api_url="https://rpc.unit0.dev",
+    chain_contract_address="3PKgN8rfmvF7hK7RWJbpvkh59e1pQkUzero",
+)
+
+networks = {n.cl_chain_id_str: n for n in [stage_net, test_net, main_net]}
+
+
+def get_predefined_network_settings(chain_id_str: str) -> NetworkSettings:
+    r = networks.get(chain_id_str)
+    if not r:
+        raise ValueError(f"Unknown network {chain_id_str}")
+
+    return r
@@ -1,92 +1,195 @@
 import logging
 import os
-from dataclasses import dataclass
 from functools import cached_property
+from typing import TYPE_CHECKING, Any, Dict, Optional
+from urllib.parse import quote
 
 from ens.ens import ChecksumAddress
 from pywaves import pw
-from web3 import Web3
+from web3 import AsyncWeb3, Web3
 
+from units_network import rpc_metrics
+from units_network.bootstrap_cache import BootstrapCache
 from units_network.bridges import Bridges
-from units_network.chain_contract import ChainContract
+from units_network.chain_contract import (
+    BLOCK_DELAY_KEY,
+    ChainContract,
+    asset_from_details,
+    asset_to_details,
+)
 from units_network.erc20 import Erc20
+from units_network.network_settings import (  # noqa: F401
+    NetworkSettings,
+    get_predefined_network_settings,
+    main_net,
+    networks,
+    stage_net,
+    test_net,
+)
 
-
-@dataclass
-class NetworkSettings:
-    name: str
-    cl_chain_id_str: str
-    cl_node_api_url: str
-    el_node_api_url: str
-    chain_contract_address: str
-
-    def __post_init__(self):
-        self.chain_id = ord(self.cl_chain_id_str)
+if TYPE_CHECKING:
+    from units_network.async_bridges import AsyncBridges
+    from units_network.async_chain_contract import AsyncChainContract
+    from units_network.async_erc20 import AsyncErc20
 
 
-# Creating instances for each network
-stage_net = NetworkSettings(
-    name="StageNet",
-    cl_chain_id_str="S",
-    cl_node_api_url="https://nodes-stagenet.wavesnodes.com",
-    el_node_api_url="https://rpc-stagenet.unit0.dev",
-    chain_contract_address="3MjDHGn2ZbeXYj7YQ5ALArv5R2Vy914Phf7",
-)
+class Network:
+    def __init__(self, settings: NetworkSettings, refresh_cache: bool = False):
+        self.settings = settings
+        self.refresh_cache = refresh_cache
+        rpc_metrics.instrument_pywaves()
 
-test_net = NetworkSettings(
-    name="TestNet",
-    cl_chain_id_str="T",
-    cl_node_api_url="https://nodes-testnet.wavesnodes.com",
-    el_node_api_url="https://rpc-testnet.unit0.dev",
-    chain_contract_address="3Msx4Aq69zWUKy4d1wyKnQ4ofzEDAfv5Ngf",
-)
+    @cached_property
+    def w3(self) -> Web3:
+        r = Web3(Web3.HTTPProvider(self.settings.el_node_api_url))
+        rpc_metrics.instrument_web3(r)
+        return r
 
-main_net = NetworkSettings(
-    name="MainNet",
-    cl_chain_id_str="W",
-    cl_node_api_url="https://nodes.wavesnodes.com",
-    el_node_api_url="https://rpc.unit0.dev",
-    chain_contract_address="3PKgN8rfmvF7hK7RWJbpvkh59e1pQkUzero",
-)
+    @cached_property
+    def async_w3(self) -> AsyncWeb3:
+        r = AsyncWeb3(AsyncWeb3.AsyncHTTPProvider(self.settings.el_node_api_url))
+        rpc_metrics.instrument_web3(r)
+        return r
 
-networks = {n.cl_chain_id_str: n for n in [stage_net, test_net, main_net]}
+    @cached_property
+    def cl_chain_contract(self) -> ChainContract:
+        return ChainContract(
+            oracleAddress=self.settings.chain_contract_address,
+            blockDelay=self.block_delay,
+        )
 
+    @cached_property
+    def async_cl_chain_contract(self) -> "AsyncChainContract":
+        """
+        The block delay is taken from the cache, so the first call can block
+        """
+        from units_network.async_chain_contract import AsyncChainContract
+
+        return AsyncChainContract(
+            oracleAddress=self.settings.chain_contract_address,
+            blockDelay=self.block_delay,
+        )
 
-def get_predefined_network_settings(chain_id_str: str) -> NetworkSettings:
-    r = networks.get(chain_id_str)
-    if not r:
-        raise ValueError(f"Unknown network {chain_id_str}")
+    @cached_property
+    def block_delay(self) -> Optional[int]:
+        """
+        :return: seconds between blocks of the chain contract, None if it doesn't have them
+        """
+        return self.bootstrap_cache.get_or_load(
+            BLOCK_DELAY_KEY, self._metadata_chain_contract.getBlockDelay
+        )
 
-    return r
+    @cached_property
+    def _metadata_chain_contract(self) -> ChainContract:
+        """
+        Reads the cached metadata, so doesn't depend on it
+        """
+        return ChainContract(oracleAddress=self.settings.chain_contract_address)
 
+    @cached_property
+    def bootstrap_cache(self) -> BootstrapCache:
+        r = BootstrapCache(
+            self.settings.chain_contract_address, refresh=self.refresh_cache
+        )
+        r.validate(self._validate_bootstrap_cache)
+        return r
 
-class Network:
-    def __init__(self, settings: NetworkSettings):
-        self.settings = settings
+    @cached_property
+    def el_native_bridge_address(self) -> ChecksumAddress:
+        return Web3.to_checksum_address(
+            self.bootstrap_cache.get_or_load(
+                "elNativeBridgeAddress", self.cl_chain_contract.getElNativeBridgeAddress
+            )
+        )
 
     @cached_property
-    def w3(self) -> Web3:
-        return Web3(Web3.HTTPProvider(self.settings.el_node_api_url))
+    def el_standard_bridge_address(self) -> ChecksumAddress:
+        return Web3.to_checksum_address(
+            self.bootstrap_cache.get_or_load(
+                "elStandardBridgeAddress",
+                self.cl_chain_contract.getElStandardBridgeAddress,
+            )
+        )
 
     @cached_property
-    def cl_chain_contract(self) -> ChainContract:
-        return ChainContract(oracleAddress=self.settings.chain_contract_address)
+    def native_token(self) -> pw.Asset:
+        details = self.bootstrap_cache.get_or_load(
+            "nativeToken",
+            lambda: asset_to_details(self.cl_chain_contract.getNativeToken()),
+        )
+        return asset_from_details(details, details["assetId"])
 
     @cached_property
     def bridges(self) -> Bridges:
         return Bridges(
             self.w3,
-            self.cl_chain_contract.getElNativeBridgeAddress(),
-            self.cl_chain_contract.getElStandardBridgeAddress(),
+            self.el_native_bridge_address,
+            self.el_standard_bridge_address,
+        )
+
+    @cached_property
+    def async_bridges(self) -> "AsyncBridges":
+        from units_network.async_bridges import AsyncBridges
+
+        return AsyncBridges(
+            self.async_w3,
+            self.el_native_bridge_address,
+            self.el_standard_bridge_address,
         )
 
     def get_erc20(self, address: ChecksumAddress) -> Erc20:
-        return Erc20(self.w3, address)
+        def load():
+            erc20 = Erc20(self.w3, address)
+            return {"name": erc20.name, "decimals": erc20.decimals}
+
+        details = self.bootstrap_cache.get_or_load(f"erc20_{address.lower()}", load)
+        return Erc20(
+            self.w3, address, name=details["name"], decimals=details["decimals"]
+        )
+
+    def get_async_erc20(self, address: ChecksumAddress) -> "AsyncErc20":
+        """
+        Name and decimals are taken from the cache, so the first call can block
+        """
+        from units_network.async_erc20 import AsyncErc20
+
+        erc20 = self.get_erc20(address)
+        return AsyncErc20(
+            self.async_w3, address, name=erc20.name, decimals=erc20.decimals
+        )
+
+    async def close_async(self):
+        """
+        Closes HTTP sessions of the async clients in the running event loop, call before the loop stops
+        """
+        if "async_cl_chain_contract" in self.__dict__:
+            await self.async_cl_chain_contract.close()
+        if "async_w3" in self.__dict__:
+            await self.async_w3.provider.disconnect()  # type: ignore
+
+    def _validate_bootstrap_cache(self, values: Dict[str, Any]) -> bool:
+        keys = {
+            "tokenId": values.get("nativeToken", {}).get("assetId"),
+            "elBridgeAddress": values.get("elNativeBridgeAddress"),
+            "elStandardBridgeAddress": values.get("elStandardBridgeAddress"),
+            BLOCK_DELAY_KEY: values.get(BLOCK_DELAY_KEY),
+        }
+        xs = self._metadata_chain_contract.getData(
+            regex=quote(f"^({'|'.join(keys.keys())})$")
+        )
+        actual = {x["key"]: x["value"] for x in xs}
+        for key, cached in keys.items():
+            if (
+                cached is not None
+                and str(actual.get(key)).lower() != str(cached).lower()
+            ):
+                return False
+        return True
 
 
-def create_manual(settings: NetworkSettings) -> Network:
+def create_manual(settings: NetworkSettings, refresh_cache: bool = False) -> Network:
     prepare(settings)
-    return Network(settings)
+    return Network(settings, refresh_cache)
 
 
 def prepare(settings: NetworkSettings):
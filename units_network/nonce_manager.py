@@ -0,0 +1,119 @@
+import asyncio
+import logging
+from threading import Lock
+from typing import Dict
+from weakref import WeakKeyDictionary
+
+from eth_typing import ChecksumAddress
+from web3 import AsyncWeb3, Web3
+from web3.types import Nonce
+
+
+class NonceManager:
+    """
+    Allocates nonces of accounts locally: the pending transaction count is requested once per account.
+    Call resync after a failed sending, so the next allocation requests the count again.
+    """
+
+    def __init__(self, w3: Web3):
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.w3 = w3
+        self._next_nonces: Dict[ChecksumAddress, int] = {}
+        self._lock = Lock()
+
+    def allocate(self, address: ChecksumAddress) -> Nonce:
+        with self._lock:
+            r = self._next_nonces.get(address)
+            if r is None:
+                r = self.w3.eth.get_transaction_count(address, "pending")
+                self.log.debug(f"Synced nonce of {address}: {r}")
+            self._next_nonces[address] = r + 1
+            return Nonce(r)
+
+    def observe(self, address: ChecksumAddress, nonce: Nonce):
+        """
+        Records a nonce, that was used without allocation
+        """
+        with self._lock:
+            r = self._next_nonces.get(address)
+            if r is not None and r <= nonce:
+                self._next_nonces[address] = nonce + 1
+
+    def resync(self, address: ChecksumAddress):
+        with self._lock:
+            self._next_nonces.pop(address, None)
+
+
+_nonce_managers: "WeakKeyDictionary[Web3, NonceManager]" = WeakKeyDictionary()
+_nonce_managers_lock = Lock()
+
+
+def get_nonce_manager(w3: Web3) -> NonceManager:
+    """
+    :return: a shared manager for all contracts of w3
+    """
+    with _nonce_managers_lock:
+        r = _nonce_managers.get(w3)
+        if r is None:
+            r = NonceManager(w3)
+            _nonce_managers[w3] = r
+        return r
+
+
+class AsyncNonceManager:
+    """
+    NonceManager for AsyncWeb3
+    """
+
+    def __init__(self, w3: AsyncWeb3):
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.w3 = w3
+        self._next_nonces: Dict[ChecksumAddress, int] = {}
+        # A lock works only in the loop, where it was used first
+        self._locks: "WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]" = (
+            WeakKeyDictionary()
+        )
+
+    def _get_lock(self) -> asyncio.Lock:
+        loop = asyncio.get_running_loop()
+        r = self._locks.get(loop)
+        if r is None:
+            r = asyncio.Lock()
+            self._locks[loop] = r
+        return r
+
+    async def allocate(self, address: ChecksumAddress) -> Nonce:
+        async with self._get_lock():
+            r = self._next_nonces.get(address)
+            if r is None:
+                r = await self.w3.eth.get_transaction_count(address, "pending")
+                self.log.debug(f"Synced nonce of {address}: {r}")
+            self._next_nonces[address] = r + 1
+            return Nonce(r)
+
+    def observe(self, address: ChecksumAddress, nonce: Nonce):
+        """
+        See NonceManager.observe
+        """
+        r = self._next_nonces.get(address)
+        if r is not None and r <= nonce:
+            self._next_nonces[address] = nonce + 1
+
+    def resync(self, address: ChecksumAddress):
+        self._next_nonces.pop(address, None)
+
+
+_async_nonce_managers: "WeakKeyDictionary[AsyncWeb3, AsyncNonceManager]" = (
+    WeakKeyDictionary()
+)
+
+
+def get_async_nonce_manager(w3: AsyncWeb3) -> AsyncNonceManager:
+    """
+    :return: a shared manager for all contracts of w3
+    """
+    r = _async_nonce_managers.get(w3)
+    if r is None:
+        r = AsyncNonceManager(w3)
+        _async_nonce_managers[w3] = r
+    return r
@@ -0,0 +1,129 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from time import time
+from typing import List, Optional
+
+# Seconds between blocks of a chain contract, if it isn't known
+DEFAULT_BLOCK_DELAY = 2
+
+
+@dataclass
+class Observation:
+    at: float
+    chain_height: int
+    epoch_number: int
+
+
+@dataclass
+class WaitState:
+    started_at: float
+    polls: int = 0
+    # A height that should be finalized, None if it is unknown yet
+    target_height: Optional[int] = None
+    # Finalized blocks, only changes are recorded
+    observations: List[Observation] = field(default_factory=list)
+
+    def observe(self, chain_height: int, epoch_number: int, at: Optional[float] = None):
+        last = self.observations[-1] if self.observations else None
+        if last and last.chain_height == chain_height:
+            return
+        self.observations.append(
+            Observation(time() if at is None else at, chain_height, epoch_number)
+        )
+
+    @property
+    def remaining_blocks(self) -> Optional[int]:
+        if self.target_height is None or not self.observations:
+            return None
+        return max(0, self.target_height - self.observations[-1].chain_height)
+
+    @property
+    def elapsed(self) -> float:
+        return time() - self.started_at
+
+
+class PollingStrategy(ABC):
+    @abstractmethod
+    def next_delay(self, state: WaitState) -> float:
+        """
+        :return: seconds to sleep before the next poll
+        """
+
+
+class FixedPolling(PollingStrategy):
+    def __init__(self, poll_latency: float = 2):
+        self.poll_latency = poll_latency
+
+    def next_delay(self, state: WaitState) -> float:
+        return self.poll_latency
+
+
+class AdaptivePolling(PollingStrategy):
+    """
+    Schedules polls by an estimated time of arrival.
+    A finalized height moves in steps, when a new epoch starts, so an advance rate and an epoch duration are taken
+    from observed finalized blocks. Until there are enough observations, block_delay is used for the estimation.
+    """
+
+    def __init__(
+        self,
+        block_delay: float = DEFAULT_BLOCK_DELAY,
+        min_delay: float = 0.5,
+        max_delay: float = 30,
+        eta_fraction: float = 0.5,
+        window: int = 8,
+        appearance_max_blocks: float = 2,
+    ):
+        """
+        :param appearance_max_blocks: a limit of a delay in block_delay units while waiting for a block to appear
+        """
+        self.block_delay = block_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.eta_fraction = eta_fraction
+        self.window = window
+        self.appearance_max_blocks = appearance_max_blocks
+
+    def next_delay(self, state: WaitState) -> float:
+        remaining = state.remaining_blocks
+        if remaining is None:
+            # Waiting for a block to appear: it should happen in about block_delay, then back off a little,
+            # so a late block is seen soon
+            delay = min(
+                self.block_delay * 0.5 * 1.5**state.polls,
+                self.block_delay * self.appearance_max_blocks,
+            )
+            return self._clamp(delay)
+
+        observations = state.observations[-self.window :]
+        eta = remaining / self._blocks_per_second(observations)
+
+        epoch_duration = self._epoch_duration(observations)
+        if epoch_duration and eta <= epoch_duration:
+            # The target will be finalized in the next epoch
+            next_epoch_at = observations[-1].at + epoch_duration
+            return self._clamp(next_epoch_at - time())
+
+        return self._clamp(eta * self.eta_fraction)
+
+    def _blocks_per_second(self, observations: List[Observation]) -> float:
+        if len(observations) >= 2:
+            first, last = observations[0], observations[-1]
+            duration = last.at - first.at
+            blocks = last.chain_height - first.chain_height
+            if duration > 0 and blocks > 0:
+                return blocks / duration
+        return 1 / self.block_delay
+
+    @staticmethod
+    def _epoch_duration(observations: List[Observation]) -> Optional[float]:
+        if len(observations) < 2:
+            return None
+        first, last = observations[0], observations[-1]
+        epochs = last.epoch_number - first.epoch_number
+        if epochs <= 0:
+            return None
+        return (last.at - first.at) / epochs
+
+    def _clamp(self, delay: float) -> float:
+        return min(self.max_delay, max(self.min_delay, delay))
@@ -0,0 +1,146 @@
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import re
+import subprocess
+import sys
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+
+from units_network import metrics
+from units_network.args import Args
+
+# "import time:       self [us] |  cumulative | imported package"
+_IMPORT_TIME_REGEX = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+class Profiler:
+    """
+    Runs a script and writes to out_dir:
+    - profile.pstats and profile.txt: cProfile stats, the text is sorted by cumulative time;
+    - memory.txt instead of cProfile stats, if memory: top allocations by tracemalloc, which distorts timings;
+    - rpc.json: node API calls, see metrics;
+    - imports.txt: import time by a top-level package, measured in a separate interpreter with -X importtime.
+    """
+
+    def __init__(self, out_dir: str, module: str, top: int = 30, memory: bool = False):
+        """
+        :param module: a module of the script, its imports are measured
+        :param top: a number of lines in text reports
+        :param memory: trace allocations instead of cProfile
+        """
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.out_dir = out_dir
+        self.module = module
+        self.top = top
+        self.memory = memory
+
+    def run(self, main: Callable[[], None]):
+        os.makedirs(self.out_dir, exist_ok=True)
+        metrics.get_default().reset()
+        if self.memory:
+            self._run_memory(main)
+        else:
+            self._run_profile(main)
+
+    def _run_profile(self, main: Callable[[], None]):
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            main()
+        finally:
+            profile.disable()
+            self._write_profile(profile)
+            self._write_common()
+
+    def _run_memory(self, main: Callable[[], None]):
+        tracemalloc.start()
+        try:
+            main()
+        finally:
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            self._write_memory(snapshot)
+            self._write_common()
+
+    def _write_common(self):
+        metrics.get_default().dump(os.path.join(self.out_dir, "rpc.json"))
+        self._write_imports()
+        self.log.info(f"Profile is written to {self.out_dir}")
+
+    def _write_profile(self, profile: cProfile.Profile):
+        profile.dump_stats(os.path.join(self.out_dir, "profile.pstats"))
+        text = io.StringIO()
+        pstats.Stats(profile, stream=text).sort_stats("cumulative").print_stats(
+            self.top
+        )
+        self._write_text("profile.txt", text.getvalue())
+
+    def _write_memory(self, snapshot: tracemalloc.Snapshot):
+        stats = snapshot.statistics("lineno")
+        total = sum(x.size for x in stats)
+        lines = [f"Total allocated and not freed: {total / 1024:.1f} KiB"]
+        lines.extend(str(x) for x in stats[: self.top])
+        self._write_text("memory.txt", "\n".join(lines) + "\n")
+
+    def _write_imports(self):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {self.module}"],
+            capture_output=True,
+            text=True,
+        )
+        packages, total = parse_import_times(result.stderr)
+        lines = [f"Import of {self.module}: {total / 1000:.1f} ms"]
+        for package, us in sorted(packages.items(), key=lambda x: -x[1])[: self.top]:
+            lines.append(f"{package}: {us / 1000:.1f} ms ({100 * us / total:.1f}%)")
+        self._write_text("imports.txt", "\n".join(lines) + "\n")
+
+    def _write_text(self, file_name: str, text: str):
+        with open(os.path.join(self.out_dir, file_name), "w", encoding="utf-8") as file:
+            file.write(text)
+
+
+def parse_import_times(stderr: str) -> Tuple[Dict[str, int], int]:
+    """
+    :param stderr: an output of python -X importtime
+    :return: self import time in microseconds by a top-level package, and a total time
+    """
+    packages: Dict[str, int] = {}
+    roots: List[int] = []
+    for line in stderr.splitlines():
+        m = _IMPORT_TIME_REGEX.match(line)
+        if not m:
+            continue
+
+        self_us, cumulative_us, indent, name = m.groups()
+        package = name.split(".", 1)[0]
+        packages[package] = packages.get(package, 0) + int(self_us)
+        # Top-level imports have one space of indentation
+        if len(indent) == 1:
+            roots.append(int(cumulative_us))
+    return packages, sum(roots)
+
+
+def profiled(main: Callable[[], None]) -> Callable[[], None]:
+    """
+    Runs the main function under Profiler if there is a --profile <directory> argument. Allocations are traced instead
+    of cProfile with --profile-memory
+    """
+
+    @functools.wraps(main)
+    def wrapper():
+        args = Args()
+        out_dir = args.profile
+        if not out_dir:
+            return main()
+        module = main.__module__
+        if module == "__main__":
+            # Run as a file
+            file_name = os.path.basename(main.__globals__["__file__"])
+            module = f"units_network.scripts.{os.path.splitext(file_name)[0]}"
+        Profiler(out_dir, module, memory=args.profile_memory).run(main)
+
+    return wrapper
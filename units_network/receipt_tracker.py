@@ -0,0 +1,299 @@
+import logging
+from dataclasses import dataclass
+from threading import Lock, RLock
+from time import sleep, time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from weakref import WeakKeyDictionary
+
+from eth_typing import HexStr
+from eth_utils import to_checksum_address, to_int
+from hexbytes import HexBytes
+from web3 import Web3
+from web3.datastructures import AttributeDict
+from web3.exceptions import TransactionNotFound, Web3RPCError
+from web3.types import RPCEndpoint, TxReceipt
+
+from units_network import rpc_metrics
+
+# Fields of receipts and logs in JSON-RPC, that Web3.eth.get_transaction_receipt converts
+_INT_FIELDS = {
+    "blockNumber",
+    "transactionIndex",
+    "cumulativeGasUsed",
+    "status",
+    "gasUsed",
+    "effectiveGasPrice",
+    "type",
+    "blobGasPrice",
+    "blobGasUsed",
+}
+_LOG_INT_FIELDS = {"blockNumber", "transactionIndex", "logIndex"}
+_BYTES_FIELDS = {"blockHash", "transactionHash", "logsBloom", "data"}
+_ADDRESS_FIELDS = {"contractAddress", "from", "to", "address"}
+
+
+def format_receipt(raw: Dict[str, Any]) -> TxReceipt:
+    """
+    :return: a receipt from JSON-RPC in the same format as of Web3.eth.get_transaction_receipt
+    """
+
+    def format_entry(entry: Dict[str, Any], int_fields: Set[str]) -> Dict[str, Any]:
+        return {k: format_value(k, v, int_fields) for k, v in entry.items()}
+
+    def format_value(key: str, value: Any, int_fields: Set[str]) -> Any:
+        if value is None:
+            return None
+        if key in int_fields and isinstance(value, str):
+            return to_int(hexstr=value)
+        if key in _BYTES_FIELDS:
+            return HexBytes(value)
+        if key in _ADDRESS_FIELDS:
+            return to_checksum_address(value)
+        if key == "topics":
+            return [HexBytes(x) for x in value]
+        if key == "logs":
+            return [format_entry(x, _LOG_INT_FIELDS) for x in value]
+        return value
+
+    return AttributeDict.recursive(format_entry(raw, _INT_FIELDS))  # type: ignore
+
+
+@dataclass
+class TrackedReceipt:
+    txn_hash: HexStr
+    # None if a node returned an error for this transaction
+    receipt: Optional[TxReceipt]
+    # Seconds from sending to the first poll that found the receipt
+    latency: float
+    error: Optional[str] = None
+
+
+@dataclass
+class _Waiter:
+    sent_at: float
+    callbacks: List[Callable[[TrackedReceipt], None]]
+
+
+class ReceiptTracker:
+    """
+    Waits for receipts of many EL transactions:
+    - receipts of new transactions are requested with JSON-RPC batches of eth_getTransactionReceipt;
+    - then, if use_block_receipts, with one eth_getBlockReceipts per new block for all waiting transactions, otherwise
+      with batches again.
+    Falls back to a request per transaction if a provider doesn't support batches.
+    If a node returns an error for a transaction, it is resolved with TrackedReceipt.error.
+    """
+
+    def __init__(
+        self,
+        w3: Web3,
+        batch_size: int = 100,
+        poll_latency: float = 1,
+        use_block_receipts: bool = False,
+    ):
+        """
+        :param use_block_receipts: cheaper for thousands of waiting transactions, requires eth_getBlockReceipts
+        """
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.w3 = w3
+        self.batch_size = batch_size
+        self.poll_latency = poll_latency
+        self.use_block_receipts = use_block_receipts
+        self.requests = 0
+        self._waiters: Dict[HexStr, _Waiter] = {}
+        # Not checked with eth_getTransactionReceipt yet
+        self._unchecked: Set[HexStr] = set()
+        self._last_block: Optional[int] = None
+        self._lock = RLock()
+
+    def add(
+        self,
+        txn_hash: HexStr,
+        callback: Optional[Callable[[TrackedReceipt], None]] = None,
+        sent_at: Optional[float] = None,
+    ):
+        """
+        :param callback: called during poll() when the receipt is found
+        :param sent_at: time() of sending, now if None
+        """
+        txn_hash = HexStr(HexBytes(txn_hash).to_0x_hex())
+        with self._lock:
+            waiter = self._waiters.get(txn_hash)
+            if waiter is None:
+                waiter = _Waiter(sent_at=sent_at or time(), callbacks=[])
+                self._waiters[txn_hash] = waiter
+                self._unchecked.add(txn_hash)
+            if callback:
+                waiter.callbacks.append(callback)
+
+    def __len__(self) -> int:
+        return len(self._waiters)
+
+    def poll(self) -> int:
+        """
+        :return: a number of found receipts
+        """
+        with self._lock:
+            if not self._waiters:
+                return 0
+
+            found: Dict[HexStr, TxReceipt] = {}
+            errors: Dict[HexStr, str] = {}
+            if self.use_block_receipts:
+                head = self.w3.eth.block_number
+                self.requests += 1
+                if self._last_block is not None:
+                    for n in range(self._last_block + 1, head + 1):
+                        found.update(self._get_block_receipts(n))
+                self._last_block = head
+
+                # Could be mined before adding
+                unchecked = [x for x in self._unchecked if x not in found]
+                r, errors = self._get_receipts(unchecked)
+                found.update(r)
+            else:
+                found, errors = self._get_receipts(list(self._waiters.keys()))
+
+            now = time()
+            resolved = []
+            for txn_hash, receipt in [
+                *found.items(),
+                *((x, None) for x in errors.keys()),
+            ]:
+                self._unchecked.discard(txn_hash)
+                waiter = self._waiters.pop(txn_hash, None)
+                if waiter:
+                    resolved.append(
+                        (
+                            waiter,
+                            TrackedReceipt(
+                                txn_hash,
+                                receipt,
+                                now - waiter.sent_at,
+                                errors.get(txn_hash),
+                            ),
+                        )
+                    )
+
+            self.log.debug(
+                f"Found {len(resolved)} receipts, waiting for {len(self._waiters)}"
+            )
+            for waiter, x in resolved:
+                for callback in waiter.callbacks:
+                    callback(x)
+            return len(resolved)
+
+    def wait(
+        self,
+        txn_hashes: List[HexStr],
+        timeout: float = 120,
+        sent_at: Optional[float] = None,
+    ) -> List[TrackedReceipt]:
+        """
+        :return: receipts in the same order
+        :raises TimeoutError: if some receipts aren't found in timeout seconds
+        :raises Exception: if a node returned an error for a transaction
+        """
+        r: Dict[HexStr, TrackedReceipt] = {}
+
+        def on_receipt(x: TrackedReceipt):
+            r[x.txn_hash] = x
+
+        keys = [HexStr(HexBytes(x).to_0x_hex()) for x in txn_hashes]
+        for x in keys:
+            self.add(x, on_receipt, sent_at)
+
+        end_time = time() + timeout
+        while True:
+            self.poll()
+            if all(x in r for x in keys):
+                for x in keys:
+                    if r[x].error:
+                        raise Exception(f"Can't get a receipt of {x}: {r[x].error}")
+                return [r[x] for x in keys]
+
+            now = time()
+            if now >= end_time:
+                with self._lock:
+                    for x in keys:
+                        if x not in r:
+                            self._waiters.pop(x, None)
+                            self._unchecked.discard(x)
+                raise TimeoutError(
+                    f"{len(keys) - len(r)} of {len(keys)} transactions are not mined in {timeout} seconds"
+                )
+            sleep(min(self.poll_latency, end_time - now))
+
+    def _get_receipts(
+        self, txn_hashes: List[HexStr]
+    ) -> Tuple[Dict[HexStr, TxReceipt], Dict[HexStr, str]]:
+        """
+        Marks answered transactions as checked. A transaction without a response in a batch is checked again in the
+        next poll.
+        :return: found receipts and errors by transaction hashes
+        """
+        r: Dict[HexStr, TxReceipt] = {}
+        errors: Dict[HexStr, str] = {}
+        for start in range(0, len(txn_hashes), self.batch_size):
+            batch = txn_hashes[start : start + self.batch_size]
+            self.requests += 1
+            try:
+                responses = rpc_metrics.make_batch_request(
+                    self.w3,
+                    [(RPCEndpoint("eth_getTransactionReceipt"), [x]) for x in batch],
+                )
+            except rpc_metrics.BatchNotSupported:
+                for x in batch:
+                    self._get_receipt(x, r, errors)
+                continue
+
+            for txn_hash, response in zip(batch, responses):
+                if response is None:
+                    continue
+
+                self._unchecked.discard(txn_hash)
+                if response.get("error"):
+                    errors[txn_hash] = str(response["error"])
+                elif response.get("result"):
+                    r[txn_hash] = format_receipt(response["result"])
+        return r, errors
+
+    def _get_receipt(
+        self,
+        txn_hash: HexStr,
+        r: Dict[HexStr, TxReceipt],
+        errors: Dict[HexStr, str],
+    ):
+        self.requests += 1
+        try:
+            r[txn_hash] = self.w3.eth.get_transaction_receipt(txn_hash)
+        except TransactionNotFound:
+            pass
+        except Web3RPCError as e:
+            errors[txn_hash] = str(e)
+        self._unchecked.discard(txn_hash)
+
+    def _get_block_receipts(self, block_number: int) -> Dict[HexStr, TxReceipt]:
+        self.requests += 1
+        r: Dict[HexStr, TxReceipt] = {}
+        for receipt in self.w3.eth.get_block_receipts(block_number):
+            txn_hash = HexStr(receipt["transactionHash"].to_0x_hex())
+            if txn_hash in self._waiters:
+                r[txn_hash] = receipt
+        return r
+
+
+_receipt_trackers: "WeakKeyDictionary[Web3, ReceiptTracker]" = WeakKeyDictionary()
+_receipt_trackers_lock = Lock()
+
+
+def get_receipt_tracker(w3: Web3) -> ReceiptTracker:
+    """
+    :return: a tracker shared by all contracts of this Web3 instance
+    """
+    with _receipt_trackers_lock:
+        r = _receipt_trackers.get(w3)
+        if r is None:
+            r = ReceiptTracker(w3)
+            _receipt_trackers[w3] = r
+        return r
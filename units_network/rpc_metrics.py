@@ -0,0 +1,207 @@
+import json
+from time import perf_counter
+from typing import Any, List, Optional, Tuple, Union
+from weakref import WeakKeyDictionary
+
+import pywaves as pw
+import requests
+from web3 import AsyncWeb3, Web3
+from web3.middleware import Web3Middleware
+from web3.types import RPCEndpoint, RPCResponse
+
+from units_network.metrics import (
+    CLIENT_CL,
+    CLIENT_EL,
+    MetricsRegistry,
+    cl_method,
+    get_default,
+)
+
+
+def instrument_pywaves(pywaves=pw, registry: Optional[MetricsRegistry] = None):
+    """
+    Records calls of pywaves.wrapper, which makes requests of pywaves.Address, Asset and other objects.
+    Received bytes aren't known there, so they are estimated by a size of JSON.
+    """
+    if getattr(pywaves.wrapper, "_units_metrics", False):
+        return
+
+    registry = registry or get_default()
+    original = pywaves.wrapper
+
+    def wrapper(api, postData="", host="", headers=""):
+        if pywaves.OFFLINE:
+            return original(api, postData, host, headers)
+
+        start = perf_counter()
+        error = True
+        r = None
+        try:
+            r = original(api, postData, host, headers)
+            error = isinstance(r, dict) and "error" in r
+            return r
+        finally:
+            registry.record(
+                CLIENT_CL,
+                cl_method("POST" if postData else "GET", api),
+                perf_counter() - start,
+                error,
+                len(postData or ""),
+                len(json.dumps(r, default=str)) if r is not None else 0,
+            )
+
+    wrapper._units_metrics = True  # type: ignore
+    pywaves.wrapper = wrapper
+
+
+class RpcMetricsMiddleware(Web3Middleware):
+    """
+    Records EL JSON-RPC calls, see instrument_web3. Bytes are estimated by a size of JSON.
+    """
+
+    @property
+    def registry(self) -> MetricsRegistry:
+        return _instrumented.get(self._w3, get_default())  # type: ignore
+
+    def wrap_make_request(self, make_request):
+        def middleware(method: RPCEndpoint, params: Any):
+            start = perf_counter()
+            r = None
+            try:
+                r = make_request(method, params)
+                return r
+            finally:
+                self._record(method, params, r, perf_counter() - start)
+
+        return middleware
+
+    def wrap_make_batch_request(self, make_batch_request):
+        def middleware(requests_info):
+            start = perf_counter()
+            r = None
+            try:
+                r = make_batch_request(requests_info)
+                return r
+            finally:
+                self._record_batch(requests_info, r, perf_counter() - start)
+
+        return middleware
+
+    async def async_wrap_make_request(self, make_request):
+        async def middleware(method: RPCEndpoint, params: Any):
+            start = perf_counter()
+            r = None
+            try:
+                r = await make_request(method, params)
+                return r
+            finally:
+                self._record(method, params, r, perf_counter() - start)
+
+        return middleware
+
+    async def async_wrap_make_batch_request(self, make_batch_request):
+        async def middleware(requests_info):
+            start = perf_counter()
+            r = None
+            try:
+                r = await make_batch_request(requests_info)
+                return r
+            finally:
+                self._record_batch(requests_info, r, perf_counter() - start)
+
+        return middleware
+
+    def _record(self, method: str, params: Any, response: Any, seconds: float):
+        self.registry.record(
+            CLIENT_EL,
+            method,
+            seconds,
+            response is None or "error" in response,
+            _json_size(params),
+            _json_size(response),
+        )
+
+    def _record_batch(self, requests_info: Any, response: Any, seconds: float):
+        record_el_batch(self.registry, requests_info, response, seconds)
+
+
+def _json_size(x: Any) -> int:
+    return len(json.dumps(x, default=str)) if x is not None else 0
+
+
+def record_el_batch(
+    registry: MetricsRegistry, requests_info: Any, response: Any, seconds: float
+):
+    """
+    Records a JSON-RPC batch as one call of "batch:<methods>"
+    """
+    methods = sorted({str(method) for method, _ in requests_info})
+    registry.record(
+        CLIENT_EL,
+        f"batch:{','.join(methods)}",
+        seconds,
+        not isinstance(response, list)
+        or any("error" in x for x in response if isinstance(x, dict)),
+        _json_size([params for _, params in requests_info]),
+        _json_size(response),
+    )
+
+
+class BatchNotSupported(Exception):
+    """
+    A provider or a node doesn't process JSON-RPC batches, requests should be sent one by one
+    """
+
+
+def make_batch_request(
+    w3: Web3, requests_info: List[Tuple[RPCEndpoint, Any]]
+) -> List[Optional[RPCResponse]]:
+    """
+    Web3.provider.make_batch_request, which is recorded when the Web3 instance is instrumented.
+    The provider method is called directly, because Web3.batch_requests fails on null results, e.g. unknown receipts.
+    :return: a response per request in the same order. None if a response is missing: the provider assigns request ids,
+             so if a node returned another number of responses, none of them can be matched to a request
+    :raises BatchNotSupported: if the provider doesn't have batches or a node rejected the whole batch, so no request
+                               was processed
+    """
+    make = getattr(w3.provider, "make_batch_request", None)
+    if make is None:
+        raise BatchNotSupported(f"{w3.provider.__class__.__name__} has no batches")
+
+    start = perf_counter()
+    r = None
+    try:
+        r = make(requests_info)
+    except NotImplementedError as e:
+        raise BatchNotSupported(str(e) or "Not implemented") from e
+    except requests.HTTPError as e:
+        status = e.response.status_code if e.response is not None else None
+        if status is not None and 400 <= status < 500 and status != 429:
+            raise BatchNotSupported(str(e)) from e
+        raise
+    finally:
+        registry = _instrumented.get(w3)
+        if registry is not None:
+            record_el_batch(registry, requests_info, r, perf_counter() - start)
+
+    if not isinstance(r, list):
+        # One error for all requests
+        raise BatchNotSupported(f"The batch is rejected: {r}")
+    if len(r) != len(requests_info):
+        return [None] * len(requests_info)
+    return list(r)
+
+
+_instrumented: "WeakKeyDictionary[Union[Web3, AsyncWeb3], MetricsRegistry]" = (
+    WeakKeyDictionary()
+)
+
+
+def instrument_web3(
+    w3: Union[Web3, AsyncWeb3], registry: Optional[MetricsRegistry] = None
+):
+    if w3 in _instrumented:
+        return
+
+    w3.middleware_onion.add(RpcMetricsMiddleware, "rpc_metrics")
+    _instrumented[w3] = registry or get_default()
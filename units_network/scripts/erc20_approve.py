@@ -1,14 +1,12 @@
 #!/usr/bin/env python
 import sys
 
-from web3 import Web3
-from web3.types import TxReceipt, Wei
-
-from units_network import common_utils, networks, units
+from units_network import common_utils, metrics, tracing, units
 from units_network.args import Args
-from units_network.cli_utils import find_asset
+from units_network.profiling import profiled
 
 
+@profiled
 def main():
     log = common_utils.configure_cli_logger(__file__)
 
@@ -26,12 +24,28 @@ Required arguments:
 Additional optional arguments:
   --chain-id <S|T|W> (default: S): S - StageNet, T - TestNet. W - MainNet
   --amount N (default: 0.01): amount of transferred Unit0 tokens
+  --refresh-cache: reload chain contract metadata instead of using the local cache
+  --metrics-out <path>: write node API call counts and latencies to a .json or Prometheus text file on exit
+  --profile <directory>: write cProfile stats, node API calls and import times
+  --profile-memory: with --profile, write top memory allocations instead of cProfile stats
+  --trace-out <path>: write timings of stages to a JSON file on exit
   --args <path/to/args.json>: take default argument values from this file""",
             file=sys.stderr,
         )
         exit(1)
 
-    network = networks.create_manual(args.network_settings)
+    # Heavy modules are imported after the usage check, so the usage is printed fast
+    from web3 import Web3
+    from web3.types import TxReceipt, Wei
+
+    from units_network import networks
+    from units_network.cli_utils import find_asset
+
+    if args.metrics_out:
+        metrics.dump_at_exit(args.metrics_out)
+    tracing.report_at_exit(args.trace_out, log)
+
+    network = networks.create_manual(args.network_settings, args.refresh_cache)
 
     asset = find_asset(network, args.asset_id, args.asset_name)
     erc20 = asset.erc20
@@ -45,10 +59,18 @@ Additional optional arguments:
         f"Approve a transfer of {args.amount} (in atomic units: {el_atomic_amount}) assets '{erc20.name}' ({erc20.contract_address}) of {owner_account.address} by {spender_address}"
     )
 
-    approve_txn_hash = erc20.approve(spender_address, el_atomic_amount, owner_account)
-    approve_receipt: TxReceipt = network.w3.eth.wait_for_transaction_receipt(
-        approve_txn_hash,
-    )
+    with tracing.span("approve"):
+        approve_txn_hash = erc20.approve_if_needed(
+            spender_address, el_atomic_amount, owner_account
+        )
+    if approve_txn_hash is None:
+        log.info("The current allowance covers the amount, nothing to approve")
+        return
+
+    with tracing.span("receipt"):
+        approve_receipt: TxReceipt = network.w3.eth.wait_for_transaction_receipt(
+            approve_txn_hash,
+        )
     log.info(f"ERC20.approve receipt: {Web3.to_json(approve_receipt)}")  # type: ignore
     log.info("Done")
 
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+import sys
+import time
+
+from units_network import common_utils
+from units_network.args import get_argument_value
+from units_network.profiling import profiled
+
+
+@profiled
+def main():
+    if "--help" in sys.argv:
+        print(
+            """Runs a deterministic local stand-in of Unit0: a simulated EL node and a fake CL node on this machine.
+Usage:
+  local_network.py
+Additional optional arguments:
+  --args-out <path> (default: local-network-args.json): write --args for other commands with keys of a funded user
+  --user N (default: 0): a user for --args-out
+  --users N (default: 4): a number of funded users on both layers
+  --block-time N (default: 2): seconds between blocks
+  --finalization-depth N (default: 2): EL blocks between the head and the finalized block
+  --el-port N (default: 18545): a port of the EL JSON-RPC
+  --cl-port N (default: 16869): a port of the CL node API
+  --profile <directory>: write cProfile stats, node API calls and import times at exit
+  --profile-memory: with --profile, write top memory allocations instead of cProfile stats""",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    log = common_utils.configure_cli_logger(__file__)
+
+    # Heavy modules are imported after the usage check, so the usage is printed fast
+    from units_network.simulator.local_network import LocalNetwork
+
+    args_out = get_argument_value("--args-out") or "local-network-args.json"
+    user = int(get_argument_value("--user") or "0")
+    network = LocalNetwork(
+        users=int(get_argument_value("--users") or "4"),
+        block_time=int(get_argument_value("--block-time") or "2"),
+        finalization_depth=int(get_argument_value("--finalization-depth") or "2"),
+        el_port=int(get_argument_value("--el-port") or "18545"),
+        cl_port=int(get_argument_value("--cl-port") or "16869"),
+    )
+    network.start()
+    network.write_args(args_out, user)
+
+    settings = network.network_settings
+    log.info(
+        f"EL node: {settings.el_node_api_url}, CL node: {settings.cl_node_api_url}"
+    )
+    log.info(f"Chain contract: {settings.chain_contract_address}")
+    for el_user, cl_user in zip(network.el_users, network.cl_users):
+        log.info(f"User: {el_user.address} (E), {cl_user.address} (C)")
+    log.info(
+        f"Wrote arguments of user {user} to {args_out}, run commands with --args {args_out}"
+    )
+
+    network.start_clock()
+    try:
+        while True:
+            time.sleep(60)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        network.stop()
+        log.info("Stopped")
+
+
+if __name__ == "__main__":
+    main()
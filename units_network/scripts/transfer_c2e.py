@@ -1,14 +1,12 @@
 #!/usr/bin/env python
 import sys
 
-import pywaves as pw
-from web3.types import Wei
-
-from units_network import common_utils, networks, units
+from units_network import common_utils, metrics, tracing, units
 from units_network.args import Args
-from units_network.cli_utils import find_asset
+from units_network.profiling import profiled
 
 
+@profiled
 def main():
     log = common_utils.configure_cli_logger(__file__)
 
@@ -23,12 +21,28 @@ Additional optional arguments:
   --asset-id <Waves asset id in Base58> (default: Unit0 of selected network)
   --asset-name <Waves asset name>: an alternative to --asset-id
   --amount N (default: 0.01): amount of transferred assets
+  --refresh-cache: reload chain contract metadata instead of using the local cache
+  --metrics-out <path>: write node API call counts and latencies to a .json or Prometheus text file on exit
+  --profile <directory>: write cProfile stats, node API calls and import times
+  --profile-memory: with --profile, write top memory allocations instead of cProfile stats
+  --trace-out <path>: write timings of stages to a JSON file on exit
   --args <path/to/args.json>: take default argument values from this file""",
             file=sys.stderr,
         )
         sys.exit(1)
 
-    network = networks.create_manual(args.network_settings)
+    # Heavy modules are imported after the usage check, so the usage is printed fast
+    import pywaves as pw
+    from web3.types import Wei
+
+    from units_network import networks
+    from units_network.cli_utils import find_asset
+
+    if args.metrics_out:
+        metrics.dump_at_exit(args.metrics_out)
+    tracing.report_at_exit(args.trace_out, log)
+
+    network = networks.create_manual(args.network_settings, args.refresh_cache)
 
     cl_account = pw.Address(privateKey=args.waves_private_key)
     el_account = network.w3.eth.account.from_key(args.eth_private_key)
@@ -45,9 +59,12 @@ Additional optional arguments:
     )
     log.debug(f"C atomic units: {cl_atomic_amount}, E atomic units: {el_atomic_amount}")
 
-    transfer_result = network.cl_chain_contract.transfer(
-        cl_account, el_account.address, asset.waves_asset, cl_atomic_amount
-    )
+    with tracing.span("sign"):
+        txn = network.cl_chain_contract.prepareTransfer(
+            cl_account, el_account.address, asset.waves_asset, cl_atomic_amount
+        )
+    with tracing.span("broadcast"):
+        transfer_result = cl_account.broadcastTx(txn)
 
     log.info(f"[C] ChainContract.transfer result: {transfer_result}")
     log.info("Done")
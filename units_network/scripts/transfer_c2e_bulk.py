@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+import json
+import sys
+from decimal import Decimal
+
+from units_network import common_utils, metrics
+from units_network.args import Args
+from units_network.profiling import profiled
+
+
+@profiled
+def main():
+    log = common_utils.configure_cli_logger(__file__)
+
+    args = Args()
+    if not (args.waves_private_key and args.manifest and args.output):
+        print(
+            """Transfer many assets from Consensus Layer (Waves) to Execution Layer (Ethereum).
+Usage:
+  transfer-c2e-bulk.py --waves-private-key <Waves private key in base58> --manifest <path/to/payouts.jsonl> --output <path/to/results.jsonl>
+Each line of the manifest is a JSON object, missing fields are taken from arguments:
+  {"recipient": "<Ethereum address>", "asset_id": "<id>", "asset_name": "<name>", "amount": "0.01"}
+Results are appended to the output file. Run the command with the same output again to resume.
+Additional optional arguments:
+  --chain-id <S|T|W> (default: S): S - StageNet, T - TestNet, W - MainNet
+  --asset-id <Waves asset id in Base58>: a default asset (default: Unit0 of selected network)
+  --asset-name <Waves asset name>: an alternative to --asset-id
+  --amount N (default: 0.01): a default amount
+  --workers N (default: 8): concurrent broadcasts
+  --timeout N (default: 180): seconds to wait for confirmations
+  --refresh-cache: reload chain contract metadata instead of using the local cache
+  --metrics-out <path>: write node API call counts and latencies to a .json or Prometheus text file on exit
+  --profile <directory>: write cProfile stats, node API calls and import times
+  --profile-memory: with --profile, write top memory allocations instead of cProfile stats
+  --args <path/to/args.json>: take default argument values from this file""",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+    # Heavy modules are imported after the usage check, so the usage is printed fast
+    import pywaves as pw
+    from web3 import Web3
+
+    from units_network import networks
+    from units_network.c2e_bulk import (
+        STATUS_CONFIRMED,
+        C2EBulkSender,
+        C2EJournal,
+        C2EPayout,
+    )
+    from units_network.cli_utils import AssetFinder
+
+    if args.metrics_out:
+        metrics.dump_at_exit(args.metrics_out)
+
+    network = networks.create_manual(args.network_settings, args.refresh_cache)
+    cl_account = pw.Address(privateKey=args.waves_private_key)
+
+    asset_finder = AssetFinder(network)
+    payouts = []
+    with open(args.manifest, "r", encoding="utf-8") as file:  # type: ignore
+        for line, x in enumerate(file):
+            if not x.strip():
+                continue
+
+            x = json.loads(x)
+            payouts.append(
+                C2EPayout(
+                    line=line,
+                    recipient=Web3.to_checksum_address(x["recipient"]),
+                    asset=asset_finder.find_in_line(x, args.asset_id, args.asset_name),
+                    amount=Decimal(x["amount"]) if "amount" in x else args.amount,
+                )
+            )
+
+    log.info(f"Loaded {len(payouts)} payouts")
+    journal = C2EJournal(args.output)  # type: ignore
+    try:
+        sender = C2EBulkSender(
+            network,
+            cl_account,
+            journal,
+            workers=args.workers,
+            timeout=args.timeout,
+        )
+        statuses = sender.run(payouts)
+    finally:
+        journal.close()
+
+    log.info(f"Done: {statuses}")
+    if len(statuses) > 1 or STATUS_CONFIRMED not in statuses:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,12 @@
 #!/usr/bin/env python
 import sys
 
-import pywaves as pw
-from web3 import Web3
-from web3.types import TxReceipt, Wei
-
-from units_network import common_utils, networks, units
+from units_network import common_utils, metrics, tracing, units
 from units_network.args import Args
-from units_network.cli_utils import find_asset
+from units_network.profiling import profiled
 
 
+@profiled
 def main():
     log = common_utils.configure_cli_logger(__file__)
 
@@ -25,12 +22,29 @@ Additional optional arguments:
   --asset-name <Waves asset name>: an alternative to --asset-id
   --amount N (default: 0.01): amount of transferred Unit0 tokens
   --timeout N (default: 180): seconds to wait for a block or its finalization on the chain contract
+  --refresh-cache: reload chain contract metadata instead of using the local cache
+  --metrics-out <path>: write node API call counts and latencies to a .json or Prometheus text file on exit
+  --profile <directory>: write cProfile stats, node API calls and import times
+  --profile-memory: with --profile, write top memory allocations instead of cProfile stats
+  --trace-out <path>: write timings of stages to a JSON file on exit
   --args <path/to/args.json>: take default argument values from this file""",
             file=sys.stderr,
         )
         exit(1)
 
-    network = networks.create_manual(args.network_settings)
+    # Heavy modules are imported after the usage check, so the usage is printed fast
+    import pywaves as pw
+    from web3 import Web3
+    from web3.types import TxReceipt, Wei
+
+    from units_network import networks
+    from units_network.cli_utils import find_asset
+
+    if args.metrics_out:
+        metrics.dump_at_exit(args.metrics_out)
+    tracing.report_at_exit(args.trace_out, log)
+
+    network = networks.create_manual(args.network_settings, args.refresh_cache)
 
     cl_account = pw.Address(privateKey=args.waves_private_key)
     el_account = network.w3.eth.account.from_key(args.eth_private_key)
@@ -47,54 +61,63 @@ Additional optional arguments:
         f"in C atomic units: {cl_atomic_amount}, in E atomic units: {el_atomic_amount}"
     )
 
-    if asset.erc20:
-        log.info(f"[E] {sending_str} StandardBridge.bridgeERC20. {atomic_units_str}")
-        send_txn_hash = network.bridges.standard_bridge.bridge_erc20(
-            token=asset.erc20.contract_address,
-            cl_to=Web3.to_checksum_address(
-                common_utils.waves_public_key_hash_bytes(cl_account)
-            ),
-            el_amount=el_atomic_amount,
-            sender_account=el_account,
-        )
-    else:
-        log.info(f"[E] {sending_str} NativeBridge. {atomic_units_str}")
-        send_txn_hash = network.bridges.native_bridge.send_native(
-            cl_to=cl_account,
-            el_amount=el_atomic_amount,
-            sender_account=el_account,
-        )
+    with tracing.span("send"):
+        if asset.erc20:
+            log.info(
+                f"[E] {sending_str} StandardBridge.bridgeERC20. {atomic_units_str}"
+            )
+            send_txn_hash = network.bridges.standard_bridge.bridge_erc20(
+                token=asset.erc20.contract_address,
+                cl_to=Web3.to_checksum_address(
+                    common_utils.waves_public_key_hash_bytes(cl_account)
+                ),
+                el_amount=el_atomic_amount,
+                sender_account=el_account,
+            )
+        else:
+            log.info(f"[E] {sending_str} NativeBridge. {atomic_units_str}")
+            send_txn_hash = network.bridges.native_bridge.send_native(
+                cl_to=cl_account,
+                el_amount=el_atomic_amount,
+                sender_account=el_account,
+            )
     log.info(f"[E] Transaction hash: {send_txn_hash}")
 
-    send_receipt: TxReceipt = network.w3.eth.wait_for_transaction_receipt(
-        send_txn_hash,
-    )
+    with tracing.span("receipt"):
+        send_receipt: TxReceipt = network.w3.eth.wait_for_transaction_receipt(
+            send_txn_hash,
+        )
     log.info(f"[E] NativeBridge.sendNative receipt: {Web3.to_json(send_receipt)}")  # type: ignore
 
-    transfer_params = network.bridges.get_e2c_transfer_params(
-        send_receipt["blockHash"], send_receipt["transactionHash"]
-    )
+    # Includes "logs" and "proof"
+    with tracing.span("params"):
+        transfer_params = network.bridges.get_e2c_transfer_params(
+            send_receipt["blockHash"], send_receipt["transactionHash"]
+        )
     log.info(f"[C] E2C transfer params: {transfer_params}")
 
-    withdraw_contract_block = network.cl_chain_contract.waitForBlock(
-        transfer_params.block_with_transfer_hash, timeout=args.timeout
-    )
+    with tracing.span("waitForBlock"):
+        withdraw_contract_block = network.cl_chain_contract.waitForBlock(
+            transfer_params.block_with_transfer_hash, timeout=args.timeout
+        )
     log.info(
         f"[C] Found a block with transfer on chain contract: {withdraw_contract_block}"
     )
 
-    network.cl_chain_contract.waitForFinalized(
-        withdraw_contract_block, timeout=args.timeout
-    )
+    with tracing.span("waitForFinalized"):
+        network.cl_chain_contract.waitForFinalized(
+            withdraw_contract_block, timeout=args.timeout
+        )
 
-    withdraw_result = network.cl_chain_contract.withdrawAsset(
-        sender=cl_account,
-        blockHashWithTransfer=transfer_params.block_with_transfer_hash,
-        merkleProofs=transfer_params.merkle_proofs,
-        transferIndexInBlock=transfer_params.transfer_index_in_block,
-        atomicAmount=cl_atomic_amount,
-        asset=asset.waves_asset,
-    )
+    with tracing.span("withdraw"):
+        withdraw_result = network.cl_chain_contract.withdrawAsset(
+            sender=cl_account,
+            blockHashWithTransfer=transfer_params.block_with_transfer_hash,
+            merkleProofs=transfer_params.merkle_proofs,
+            transferIndexInBlock=transfer_params.transfer_index_in_block,
+            atomicAmount=cl_atomic_amount,
+            asset=asset.waves_asset,
+        )
     log.info(f"[C] ChainContract.withdraw result: {withdraw_result}")
     log.info("Done")
 
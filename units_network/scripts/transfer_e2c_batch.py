@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+import json
+import sys
+from decimal import Decimal
+from typing import Dict
+
+from units_network import common_utils, metrics
+from units_network.args import Args
+from units_network.profiling import profiled
+
+
+@profiled
+def main():
+    log = common_utils.configure_cli_logger(__file__)
+
+    args = Args()
+    if not (args.eth_private_key and args.manifest):
+        print(
+            """Transfer many assets from Execution Layer (Ethereum) to Consensus Layer (Waves) at once.
+Usage:
+  transfer-e2c-batch.py --eth-private-key <Ethereum private key in HEX with 0x> --manifest <path/to/transfers.jsonl>
+Each line of the manifest is a JSON object, missing fields are taken from arguments:
+  {"waves_private_key": "<recipient's Waves private key in base58>", "asset_id": "<id>", "asset_name": "<name>", "amount": "0.01"}
+Additional optional arguments:
+  --waves-private-key <Waves private key in base58>: a default recipient
+  --chain-id <S|T|W> (default: S): S - StageNet, T - TestNet. W - MainNet
+  --asset-id <Waves asset id in Base58>: a default asset (default: Unit0 of selected network)
+  --asset-name <Waves asset name>: an alternative to --asset-id
+  --amount N (default: 0.01): a default amount
+  --timeout N (default: 180): seconds to wait for all transfers
+  --refresh-cache: reload chain contract metadata instead of using the local cache
+  --metrics-out <path>: write node API call counts and latencies to a .json or Prometheus text file on exit
+  --profile <directory>: write cProfile stats, node API calls and import times
+  --profile-memory: with --profile, write top memory allocations instead of cProfile stats
+  --args <path/to/args.json>: take default argument values from this file
+Prints a JSON line with a result for each transfer.""",
+            file=sys.stderr,
+        )
+        exit(1)
+
+    # Heavy modules are imported after the usage check, so the usage is printed fast
+    import pywaves as pw
+
+    from units_network import networks
+    from units_network.cli_utils import AssetFinder
+    from units_network.e2c_runner import (
+        STATUS_FAILED,
+        E2CBatchRunner,
+        E2CTransferRequest,
+    )
+
+    if args.metrics_out:
+        metrics.dump_at_exit(args.metrics_out)
+
+    network = networks.create_manual(args.network_settings, args.refresh_cache)
+    el_account = network.w3.eth.account.from_key(args.eth_private_key)
+
+    accounts: Dict[str, pw.Address] = {}
+    asset_finder = AssetFinder(network)
+    requests = []
+    with open(args.manifest, "r", encoding="utf-8") as file:  # type: ignore
+        for line in file:
+            if not line.strip():
+                continue
+
+            x = json.loads(line)
+            waves_private_key = x.get("waves_private_key", args.waves_private_key)
+            if not waves_private_key:
+                raise Exception(f"No waves_private_key for {line}")
+            if waves_private_key not in accounts:
+                accounts[waves_private_key] = pw.Address(privateKey=waves_private_key)
+
+            requests.append(
+                E2CTransferRequest(
+                    cl_account=accounts[waves_private_key],
+                    asset=asset_finder.find_in_line(x, args.asset_id, args.asset_name),
+                    amount=Decimal(x["amount"]) if "amount" in x else args.amount,
+                )
+            )
+
+    log.info(f"Loaded {len(requests)} transfers")
+    runner = E2CBatchRunner(network, el_account, timeout=args.timeout)
+    transfers = runner.run(requests)
+    for x in transfers:
+        print(json.dumps(x.to_json_dict()))
+
+    failed = sum(1 for x in transfers if x.status == STATUS_FAILED)
+    log.info(f"Done: {len(transfers) - failed} withdrawn, {failed} failed")
+    if failed:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
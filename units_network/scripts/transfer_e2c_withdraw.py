@@ -1,88 +1,120 @@
 #!/usr/bin/env python
 import json
 import sys
+from typing import Dict
 
-import pywaves as pw
-from eth_typing import HexStr
-from hexbytes import HexBytes
-from web3 import Web3
-from web3.types import TxReceipt
-
-from units_network import common_utils, networks, units
+from units_network import common_utils, metrics, tracing, units
 from units_network.args import Args
-from units_network.native_bridge import SentNative
-from units_network.standard_bridge import ERC20BridgeInitiatedEvent
+from units_network.profiling import profiled
 
 
+@profiled
 def main():
     log = common_utils.configure_cli_logger(__file__)
 
     args = Args()
-    if not (args.waves_private_key and args.txn_hash):
+    if not (args.waves_private_key and args.txn_hashes):
         print(
             """Prepares the chain_contract.withdraw transaction from an Execution Layer (Ethereum) transaction hash.
 Usage:
   transfer-e2c-withdraw.py --txn-hash <Ethereum transaction hash in HEX> --waves-private-key <Waves private key in base58> 
 Additional optional arguments:
+  --txn-hashes <hash1,hash2,...>: an alternative to --txn-hash, prepares a transaction for each hash
+  --txn-hashes-file <path/to/hashes.txt>: an alternative to --txn-hash, a file with one hash per line
   --chain-id <S|T|W> (default: S): S - StageNet, T - TestNet. W - MainNet
+  --refresh-cache: reload chain contract metadata instead of using the local cache
+  --metrics-out <path>: write node API call counts and latencies to a .json or Prometheus text file on exit
+  --profile <directory>: write cProfile stats, node API calls and import times
+  --profile-memory: with --profile, write top memory allocations instead of cProfile stats
+  --trace-out <path>: write timings of stages to a JSON file on exit
   --args <path/to/args.json>: take default argument values from this file""",
             file=sys.stderr,
         )
         exit(1)
 
-    network = networks.create_manual(args.network_settings)
+    # Heavy modules are imported after the usage check, so the usage is printed fast
+    import pywaves as pw
+    from eth_typing import HexStr
+    from hexbytes import HexBytes
+    from web3 import Web3
+    from web3.types import TxReceipt
+
+    from units_network import networks
+    from units_network.native_bridge import SentNative
+    from units_network.standard_bridge import ERC20BridgeInitiatedEvent
+
+    if args.metrics_out:
+        metrics.dump_at_exit(args.metrics_out)
+    tracing.report_at_exit(args.trace_out, log)
+
+    network = networks.create_manual(args.network_settings, args.refresh_cache)
     cl_account = pw.Address(privateKey=args.waves_private_key)
 
-    txn_hash = HexBytes(Web3.to_bytes(hexstr=HexStr(args.txn_hash)))
-    txn_receipt: TxReceipt = network.w3.eth.get_transaction_receipt(txn_hash)
-    log.info(f"[E] Bridge.sendNative transaction receipt: {Web3.to_json(txn_receipt)}")  # type: ignore
-    assert "blockHash" in txn_receipt
-
-    transfer_evt = next(
-        (
-            network.bridges.parse_e2c_event(x)
-            for x in txn_receipt["logs"]
-            if x["address"] == network.bridges.native_bridge.contract_address
-            or x["address"] == network.bridges.standard_bridge.contract_address
-        ),
-        None,
-    )
-
-    if isinstance(transfer_evt, SentNative):
-        asset = network.cl_chain_contract.getNativeToken()
-        cl_amount = transfer_evt.amount
-        pass
-    elif isinstance(transfer_evt, ERC20BridgeInitiatedEvent):
-        asset = network.cl_chain_contract.getRegisteredAssetByErc20(
-            transfer_evt.local_token
+    assets: Dict[str, pw.Asset] = {}
+    transfers = []
+    for hex_txn_hash in args.txn_hashes:
+        txn_hash = HexBytes(Web3.to_bytes(hexstr=HexStr(hex_txn_hash)))
+        with tracing.span("receipt"):
+            txn_receipt: TxReceipt = network.w3.eth.get_transaction_receipt(txn_hash)
+        log.info(f"[E] Bridge.sendNative transaction receipt: {Web3.to_json(txn_receipt)}")  # type: ignore
+        assert "blockHash" in txn_receipt
+
+        transfer_evt = next(
+            (
+                network.bridges.parse_e2c_event(x)
+                for x in txn_receipt["logs"]
+                if x["address"] == network.bridges.native_bridge.contract_address
+                or x["address"] == network.bridges.standard_bridge.contract_address
+            ),
+            None,
         )
-        if not asset:
-            raise Exception(
-                f"Can't find a registered asset by ERC20 address: {transfer_evt.local_token}"
+
+        if isinstance(transfer_evt, SentNative):
+            asset_key = ""
+            if asset_key not in assets:
+                assets[asset_key] = network.native_token
+            cl_amount = transfer_evt.amount
+        elif isinstance(transfer_evt, ERC20BridgeInitiatedEvent):
+            asset_key = transfer_evt.local_token.lower()
+            if asset_key not in assets:
+                found_asset = network.cl_chain_contract.getRegisteredAssetByErc20(
+                    transfer_evt.local_token
+                )
+                if not found_asset:
+                    raise Exception(
+                        f"Can't find a registered asset by ERC20 address: {transfer_evt.local_token}"
+                    )
+                assets[asset_key] = found_asset
+            cl_amount = transfer_evt.cl_amount
+        else:
+            raise Exception(f"Can't find a transfer log in receipt of {hex_txn_hash}")
+
+        asset = assets[asset_key]
+        log.info(
+            f"Found event: {transfer_evt}. Amount: {units.atomic_to_user(cl_amount, asset.decimals)}, asset: {asset.assetId}"
+        )
+        transfers.append((txn_receipt["blockHash"], txn_hash, cl_amount, asset))
+
+    # Includes "logs" and "proof"
+    with tracing.span("params"):
+        all_transfer_params = network.bridges.get_e2c_transfers_params(
+            [(block_hash, txn_hash) for block_hash, txn_hash, _, _ in transfers]
+        )
+    for (_, _, cl_amount, asset), transfer_params in zip(
+        transfers, all_transfer_params
+    ):
+        log.info(f"[C] Transfer params: {transfer_params}")
+
+        with tracing.span("sign"):
+            withdraw = network.cl_chain_contract.prepareWithdrawAsset(
+                cl_account,
+                transfer_params.block_with_transfer_hash,
+                transfer_params.merkle_proofs,
+                transfer_params.transfer_index_in_block,
+                cl_amount,
+                asset,
             )
-        cl_amount = transfer_evt.cl_amount
-        pass
-    else:
-        raise Exception("Can't find a transfer log in receipt")
-
-    log.info(
-        f"Found event: {transfer_evt}. Amount: {units.atomic_to_user(cl_amount, asset.decimals)}, asset: {asset.assetId}"
-    )
-
-    transfer_params = network.bridges.get_e2c_transfer_params(
-        txn_receipt["blockHash"], txn_hash
-    )
-    log.info(f"[C] Transfer params: {transfer_params}")
-
-    withdraw = network.cl_chain_contract.prepareWithdrawAsset(
-        cl_account,
-        transfer_params.block_with_transfer_hash,
-        transfer_params.merkle_proofs,
-        transfer_params.transfer_index_in_block,
-        cl_amount,
-        asset,
-    )
-    print(json.dumps(withdraw))
+        print(json.dumps(withdraw))
     log.info("Done")
 
 
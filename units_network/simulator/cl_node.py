@@ -0,0 +1,637 @@
+import base64
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from threading import RLock
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, unquote
+
+import pywaves_curve25519 as curve
+from base58 import b58decode, b58encode
+from eth_typing import ChecksumAddress
+from eth_utils import keccak
+from hexbytes import HexBytes
+from web3 import Web3
+
+from units_network import merkle
+from units_network.chain_contract import (
+    BLOCK_DELAY_KEY,
+    FINALIZED_BLOCK_KEY,
+    REGISTRY_ASSET_KEY_PREFIX,
+    SEP,
+    WAVES_ASSET_ID_IN_CC,
+)
+from units_network.simulator.el_node import ElNode
+from units_network.simulator.server import JsonServer
+
+WAVES_DECIMALS = 8
+WAVES_TOTAL = 10**16
+EL_TO_CL_RATIO = 10**10
+
+# Node API error codes
+ERROR_INVALID_TRANSACTION = 112
+ERROR_NO_DATA = 304
+ERROR_SCRIPT_EXECUTION = 306
+ERROR_TRANSACTION_NOT_FOUND = 311
+
+
+def _hash_chain(x: bytes) -> bytes:
+    return keccak(hashlib.blake2b(x, digest_size=32).digest())
+
+
+def address_from_public_key(public_key: bytes, chain_id_str: str) -> str:
+    body = b"\x01" + chain_id_str.encode("ascii") + _hash_chain(public_key)[:20]
+    return b58encode(body + _hash_chain(body)[:4]).decode("ascii")
+
+
+@dataclass
+class ClAccount:
+    # Base58
+    private_key: str
+    public_key: str
+    address: str
+
+    @classmethod
+    def create(cls, name: str, chain_id_str: str) -> "ClAccount":
+        """
+        A deterministic account by a name
+        """
+        private_key = curve.generatePrivateKey(
+            hashlib.sha256(f"units-network-simulator/{name}".encode("utf-8")).digest()
+        )
+        public_key = curve.generatePublicKey(private_key)
+        return cls(
+            private_key=b58encode(private_key).decode("ascii"),
+            public_key=b58encode(public_key).decode("ascii"),
+            address=address_from_public_key(public_key, chain_id_str),
+        )
+
+
+def asset_id(name: str) -> str:
+    """
+    :return: a deterministic id of a simulated asset
+    """
+    return b58encode(
+        hashlib.sha256(f"units-network-simulator/{name}".encode("utf-8")).digest()
+    ).decode("ascii")
+
+
+@dataclass
+class ClAsset:
+    asset_id: str
+    name: str
+    decimals: int
+    quantity: int = WAVES_TOTAL
+    issuer: str = ""
+
+    def to_details(self) -> Dict[str, Any]:
+        return {
+            "assetId": self.asset_id,
+            "issueHeight": 1,
+            "issueTimestamp": 0,
+            "issuer": self.issuer,
+            "issuerPublicKey": "",
+            "name": self.name,
+            "description": "",
+            "decimals": self.decimals,
+            "reissuable": True,
+            "quantity": self.quantity,
+            "scripted": False,
+            "minSponsoredAssetFee": None,
+            "originTransactionId": self.asset_id,
+        }
+
+
+@dataclass
+class RegisteredClAsset:
+    index: int
+    # WAVES_ASSET_ID_IN_CC for WAVES
+    asset_id: str
+    erc20_address: ChecksumAddress
+    ratio_exponent: int
+
+
+@dataclass
+class BlockMeta:
+    hash: HexBytes
+    chain_height: int
+    epoch: int
+    parent_hash: HexBytes
+    e2c_transfers_root: HexBytes
+
+    def to_json(self) -> Dict[str, Any]:
+        return _tuple(
+            _typed("Int", self.chain_height),
+            _typed("Int", self.epoch),
+            _typed("ByteVector", b58encode(self.parent_hash).decode("ascii")),
+            _typed("ByteVector", b58encode(self.e2c_transfers_root).decode("ascii")),
+        )
+
+
+@dataclass
+class ClTransaction:
+    json: Dict[str, Any]
+    # None in UTX
+    height: Optional[int] = None
+    # Runs on confirmation, e.g. credits EL
+    on_confirmed: Optional[Callable[[], None]] = None
+
+
+class EvaluationError(Exception):
+    pass
+
+
+class InvalidTransaction(Exception):
+    def __init__(self, message: str, code: int = ERROR_SCRIPT_EXECUTION):
+        super().__init__(message)
+        self.code = code
+
+
+@dataclass
+class ClState:
+    height: int = 1
+    balances: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    data: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    blocks: Dict[HexBytes, BlockMeta] = field(default_factory=dict)
+    blocks_by_height: Dict[int, BlockMeta] = field(default_factory=dict)
+    transactions: Dict[str, ClTransaction] = field(default_factory=dict)
+    utx: List[str] = field(default_factory=list)
+    # (block hash, transfer index)
+    withdrawn: Set[Tuple[HexBytes, int]] = field(default_factory=set)
+
+
+class ClNode(JsonServer):
+    """
+    A fake Consensus Layer (Waves) node with one chain contract. Implements node API requests of this package:
+    data entries of the contract, evaluation of blockMeta, isContractSetup and finalizedBlock expressions, asset details,
+    balances, transaction broadcast and statuses.
+
+    Each step is a new CL block: transactions of UTX are confirmed, new EL blocks are registered on the contract and
+    finalizedBlock moves to an EL block finalization_depth blocks behind the head. Broadcasted transfer, withdraw and
+    withdrawAsset calls of the contract are validated and applied immediately, but EL is credited after their
+    confirmation. Signatures aren't checked and transaction ids are hashes of JSON, not of protobuf bytes.
+    """
+
+    def __init__(
+        self,
+        el_node: ElNode,
+        chain_id_str: str,
+        contract: ClAccount,
+        native_token: ClAsset,
+        registered_assets: List[Tuple[ClAsset, RegisteredClAsset]],
+        native_bridge_address: ChecksumAddress,
+        standard_bridge_address: ChecksumAddress,
+        balances: Dict[str, Dict[str, int]],
+        finalization_depth: int = 2,
+        block_delay: int = 2,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """
+        :param registered_assets: WAVES has an empty asset id in ClAsset
+        :param balances: an address -> an asset id ("" for WAVES) -> an amount
+        :param finalization_depth: finalizedBlock is this number of EL blocks behind the head
+        :param block_delay: blockDelayInSeconds of the contract
+        """
+        super().__init__(host, port)
+        self.el_node = el_node
+        self.chain_id_str = chain_id_str
+        self.contract = contract
+        self.native_token = native_token
+        self.finalization_depth = finalization_depth
+        self.assets = {x.asset_id: x for x, _ in registered_assets if x.asset_id}
+        self.assets[native_token.asset_id] = native_token
+        self.registry = {x.asset_id: x for _, x in registered_assets}
+        self._lock = RLock()
+
+        self.state = ClState(balances={k: dict(v) for k, v in balances.items()})
+        for key, value in [
+            ("tokenId", native_token.asset_id),
+            ("elBridgeAddress", native_bridge_address.lower()),
+            ("elStandardBridgeAddress", standard_bridge_address.lower()),
+            (BLOCK_DELAY_KEY, block_delay),
+        ]:
+            self._put_data(key, value)
+        for x in self.registry.values():
+            self._put_data(
+                f"{REGISTRY_ASSET_KEY_PREFIX}{x.asset_id}",
+                SEP.join(
+                    [str(x.index), x.erc20_address.lower(), str(x.ratio_exponent)]
+                ),
+            )
+        self._sync_el_blocks()
+
+    def step(self):
+        """
+        Generates a CL block
+        """
+        with self._lock:
+            state = self.state
+            state.height += 1
+            for txn_id in state.utx:
+                txn = state.transactions[txn_id]
+                txn.height = state.height
+                if txn.on_confirmed:
+                    txn.on_confirmed()
+            state.utx = []
+            self._sync_el_blocks()
+
+    def _sync_el_blocks(self):
+        state = self.state
+        last = max(state.blocks_by_height.keys(), default=-1)
+        head = self.el_node.block_number
+        for number, block_hash, parent_hash in self.el_node.get_block_hashes(
+            last + 1, head
+        ):
+            meta = BlockMeta(
+                hash=block_hash,
+                chain_height=number,
+                epoch=state.height,
+                parent_hash=parent_hash,
+                e2c_transfers_root=merkle.E2CMerkleTree(
+                    self.el_node.get_e2c_leaves(block_hash)
+                ).root,
+            )
+            state.blocks[block_hash] = meta
+            state.blocks_by_height[number] = meta
+
+        finalized = state.blocks_by_height[max(0, head - self.finalization_depth)]
+        current = state.data.get(FINALIZED_BLOCK_KEY)
+        if (
+            current is None
+            or state.blocks[HexBytes(current["value"])].chain_height
+            < finalized.chain_height
+        ):
+            self._put_data(FINALIZED_BLOCK_KEY, finalized.hash.hex())
+
+    def _put_data(self, key: str, value: Any):
+        value_type = (
+            "boolean"
+            if isinstance(value, bool)
+            else "integer" if isinstance(value, int) else "string"
+        )
+        self.state.data[key] = {"key": key, "type": value_type, "value": value}
+
+    # Node API
+
+    def handle_get(self, path: str, query: str) -> Tuple[int, Any]:
+        with self._lock:
+            return self._handle_get(path, parse_qs(query))
+
+    def handle_post(self, path: str, query: str, body: Any) -> Tuple[int, Any]:
+        with self._lock:
+            return self._handle_post(path, body)
+
+    def _handle_get(self, path: str, query: Dict[str, List[str]]) -> Tuple[int, Any]:
+        state = self.state
+        parts = [unquote(x) for x in path.strip("/").split("/")]
+        if parts == ["blocks", "height"]:
+            return 200, {"height": state.height}
+        elif parts == ["blockchain", "rewards"]:
+            return 200, {"height": state.height, "totalWavesAmount": WAVES_TOTAL}
+        elif parts[:2] == ["alias", "by-address"]:
+            return 200, []
+        elif parts[:2] == ["addresses", "balance"] and len(parts) == 3:
+            return 200, {
+                "address": parts[2],
+                "confirmations": 0,
+                "balance": self._balance(parts[2], ""),
+            }
+        elif parts[:2] == ["addresses", "scriptInfo"] and len(parts) == 3:
+            return 200, {
+                "address": parts[2],
+                "script": None,
+                "complexity": 0,
+                "verifierComplexity": 0,
+                "extraFee": 0,
+            }
+        elif parts[:2] == ["addresses", "data"] and len(parts) in (3, 4):
+            entries = state.data if parts[2] == self.contract.address else {}
+            if len(parts) == 4:
+                r = entries.get(parts[3])
+                if r is None:
+                    return 404, {
+                        "error": ERROR_NO_DATA,
+                        "message": "no data for this key",
+                    }
+                return 200, r
+            regex = query.get("matches", [None])[0]
+            return 200, [
+                x
+                for key, x in entries.items()
+                if regex is None or re.fullmatch(regex, key)
+            ]
+        elif parts[:2] == ["assets", "balance"] and len(parts) == 4:
+            return 200, {
+                "address": parts[2],
+                "assetId": parts[3],
+                "balance": self._balance(parts[2], parts[3]),
+            }
+        elif parts[:2] == ["assets", "balance"] and len(parts) == 3:
+            return 200, {
+                "address": parts[2],
+                "balances": [
+                    {"assetId": k, "balance": v}
+                    for k, v in state.balances.get(parts[2], {}).items()
+                    if k
+                ],
+            }
+        elif parts[:2] == ["assets", "details"] and len(parts) == 3:
+            asset = self.assets.get(parts[2])
+            if asset is None:
+                return 404, {"error": 0, "message": f"Unknown asset {parts[2]}"}
+            return 200, asset.to_details()
+        elif parts[:2] == ["transactions", "info"] and len(parts) == 3:
+            txn = state.transactions.get(parts[2])
+            if txn is None or txn.height is None:
+                return 404, _transaction_not_found()
+            return 200, {
+                **txn.json,
+                "height": txn.height,
+                "applicationStatus": "succeeded",
+            }
+        elif parts[:3] == ["transactions", "unconfirmed", "info"] and len(parts) == 4:
+            txn = state.transactions.get(parts[3])
+            if txn is None or txn.height is not None:
+                return 404, _transaction_not_found()
+            return 200, txn.json
+        return 404, {"error": 0, "message": f"Unknown path {'/'.join(parts)}"}
+
+    def _handle_post(self, path: str, body: Any) -> Tuple[int, Any]:
+        parts = [unquote(x) for x in path.strip("/").split("/")]
+        if parts == ["transactions", "broadcast"]:
+            return self._broadcast(body)
+        elif parts == ["transactions", "status"]:
+            return 200, [self._status(x) for x in body["ids"]]
+        elif parts == ["assets", "details"]:
+            r = []
+            for x in body["ids"]:
+                asset = self.assets.get(x)
+                if asset is None:
+                    return 404, {"error": 0, "message": f"Unknown asset {x}"}
+                r.append(asset.to_details())
+            return 200, r
+        elif parts[:3] == ["utils", "script", "evaluate"] and len(parts) == 4:
+            expr = body["expr"]
+            try:
+                return 200, {
+                    "result": self._evaluate(expr),
+                    "complexity": 0,
+                    "expr": expr,
+                }
+            except EvaluationError as e:
+                # The node responds 200 on failed evaluation
+                return 200, {
+                    "error": ERROR_SCRIPT_EXECUTION,
+                    "message": str(e),
+                    "expr": expr,
+                }
+        return 404, {"error": 0, "message": f"Unknown path {'/'.join(parts)}"}
+
+    def _status(self, txn_id: str) -> Dict[str, Any]:
+        txn = self.state.transactions.get(txn_id)
+        if txn is None:
+            return {"id": txn_id, "status": "not_found"}
+        elif txn.height is None:
+            return {"id": txn_id, "status": "unconfirmed"}
+        return {
+            "id": txn_id,
+            "status": "confirmed",
+            "height": txn.height,
+            "confirmations": self.state.height - txn.height,
+            "applicationStatus": "succeeded",
+        }
+
+    def _balance(self, address: str, asset_id: str) -> int:
+        return self.state.balances.get(address, {}).get(asset_id, 0)
+
+    # Evaluation of expressions from units_network.chain_contract
+
+    def _evaluate(self, expr: str) -> Dict[str, Any]:
+        expr = expr.strip()
+        if expr == "isContractSetup()":
+            return _typed("Boolean", True)
+        elif expr.startswith("[") and expr.endswith("]"):
+            return _typed("Array", [self._evaluate(x) for x in _split_args(expr[1:-1])])
+        elif expr.startswith("(") and expr.endswith(")"):
+            return _tuple(*[self._evaluate(x) for x in _split_args(expr[1:-1])])
+        elif expr.startswith('"') and expr.endswith('"'):
+            return _typed("String", expr[1:-1])
+
+        m = re.fullmatch(r'getStringValue\(this,\s*"(\w+)"\)', expr)
+        if m:
+            x = self.state.data.get(m.group(1))
+            if x is None or x["type"] != "string":
+                raise EvaluationError(f"value by key '{m.group(1)}' not found")
+            return _typed("String", x["value"])
+
+        m = re.fullmatch(r"blockMeta\((.+)\)", expr)
+        if m:
+            block_hash = self._evaluate(m.group(1))["value"]
+            meta = self.state.blocks.get(HexBytes(block_hash))
+            if meta is None:
+                raise EvaluationError(f"Unknown block {block_hash}")
+            return meta.to_json()
+        raise EvaluationError(f"Can't evaluate {expr}")
+
+    # Transactions
+
+    def _broadcast(self, txn: Dict[str, Any]) -> Tuple[int, Any]:
+        state = self.state
+        body = {k: v for k, v in txn.items() if k not in ("id", "proofs")}
+        txn_id = b58encode(
+            hashlib.blake2b(
+                json.dumps(body, sort_keys=True).encode("utf-8"), digest_size=32
+            ).digest()
+        ).decode("ascii")
+        r = {**txn, "id": txn_id}
+
+        known = state.transactions.get(txn_id)
+        if known:
+            where = "in UTX" if known.height is None else "in the state"
+            return 400, {
+                "error": ERROR_INVALID_TRANSACTION,
+                "message": f"Transaction {txn_id} is already {where}",
+                "transaction": known.json,
+            }
+
+        try:
+            r["sender"] = address_from_public_key(
+                b58decode(txn["senderPublicKey"]), self.chain_id_str
+            )
+            on_confirmed = self._apply(r)
+        except InvalidTransaction as e:
+            return 400, {"error": e.code, "message": str(e), "transaction": r}
+
+        state.transactions[txn_id] = ClTransaction(r, on_confirmed=on_confirmed)
+        state.utx.append(txn_id)
+        return 200, r
+
+    def _apply(self, txn: Dict[str, Any]) -> Optional[Callable[[], None]]:
+        if txn.get("type") != 16 or txn.get("dApp") != self.contract.address:
+            raise InvalidTransaction(
+                f"Only invokes of {self.contract.address} are simulated",
+                ERROR_INVALID_TRANSACTION,
+            )
+
+        sender = txn["sender"]
+        fee_asset = txn.get("feeAssetId") or ""
+        if self._balance(sender, fee_asset) < txn["fee"]:
+            raise InvalidTransaction(
+                f"Not enough balance of {fee_asset or 'WAVES'} to pay {txn['fee']} fee",
+                ERROR_INVALID_TRANSACTION,
+            )
+
+        call = txn.get("call") or {}
+        args = [x["value"] for x in call.get("args", [])]
+        function = call.get("function")
+        if function == "transfer":
+            r = self._transfer(sender, args, txn.get("payment") or [])
+        elif function == "withdraw":
+            r = self._withdraw(sender, args[0], args[1], args[2], args[3], None)
+        elif function == "withdrawAsset":
+            r = self._withdraw(sender, args[0], args[1], args[2], args[3], args[4])
+        else:
+            raise InvalidTransaction(f"Function {function} isn't simulated")
+
+        self._add_balance(sender, fee_asset, -txn["fee"])
+        return r
+
+    def _transfer(
+        self, sender: str, args: List[Any], payments: List[Dict[str, Any]]
+    ) -> Callable[[], None]:
+        if len(args) != 1 or not re.fullmatch(r"0x[0-9a-f]{40}", str(args[0])):
+            raise InvalidTransaction(
+                f"Expected an EL address in lower case, got {args}"
+            )
+        if len(payments) != 1:
+            raise InvalidTransaction("Expected one payment")
+
+        el_to = Web3.to_checksum_address(args[0])
+        amount = payments[0]["amount"]
+        payment_asset_id = payments[0].get("assetId") or ""
+        if amount <= 0:
+            raise InvalidTransaction(f"Amount should be positive, got {amount}")
+        if self._balance(sender, payment_asset_id) < amount:
+            raise InvalidTransaction(f"Not enough balance to transfer {amount}")
+
+        if payment_asset_id == self.native_token.asset_id:
+            self._add_balance(sender, payment_asset_id, -amount)
+            return lambda: self.el_node.add_withdrawal(el_to, amount * EL_TO_CL_RATIO)
+
+        registered = self.registry.get(payment_asset_id or WAVES_ASSET_ID_IN_CC)
+        if registered is None:
+            raise InvalidTransaction(f"Asset {payment_asset_id} isn't registered")
+
+        self._add_balance(sender, payment_asset_id, -amount)
+        from_address = Web3.to_checksum_address(b58decode(sender)[2:22])
+        return lambda: self.el_node.finalize_bridge_erc20(
+            registered.erc20_address,
+            from_address,
+            el_to,
+            amount * 10**registered.ratio_exponent,
+        )
+
+    def _withdraw(
+        self,
+        sender: str,
+        block_hash_hex: str,
+        proofs: List[Dict[str, Any]],
+        transfer_index: int,
+        amount: int,
+        withdraw_asset_id: Optional[str],
+    ) -> None:
+        block_hash = HexBytes(block_hash_hex)
+        meta = self.state.blocks.get(block_hash)
+        if meta is None:
+            raise InvalidTransaction(f"Unknown block {block_hash_hex}")
+
+        finalized = self.state.blocks[
+            HexBytes(self.state.data[FINALIZED_BLOCK_KEY]["value"])
+        ]
+        if meta.chain_height > finalized.chain_height:
+            raise InvalidTransaction(
+                f"EL block {block_hash_hex} is not finalized. The current finalized block is {finalized.hash.hex()}"
+            )
+        if (block_hash, transfer_index) in self.state.withdrawn:
+            raise InvalidTransaction(
+                f"Transfer #{transfer_index} has been already taken"
+            )
+        if amount <= 0:
+            raise InvalidTransaction(f"Amount should be positive, got {amount}")
+
+        recipient = b58decode(sender)[2:22]
+        cl_asset_id = withdraw_asset_id or self.native_token.asset_id
+        if cl_asset_id == self.native_token.asset_id:
+            leaf = recipient.ljust(32, b"\x00") + amount.to_bytes(32, "big")
+        else:
+            registered = self.registry.get(cl_asset_id)
+            if registered is None:
+                raise InvalidTransaction(f"Asset {cl_asset_id} isn't registered")
+            leaf = (
+                bytes(HexBytes(registered.erc20_address)).rjust(32, b"\x00")
+                + recipient.rjust(32, b"\x00")
+                + amount.to_bytes(32, "big")
+            )
+
+        node = hashlib.blake2b(leaf, digest_size=32).digest()
+        i = transfer_index
+        for x in proofs:
+            sibling = base64.b64decode(x["value"][len("base64:") :])
+            pair = node + sibling if i % 2 == 0 else sibling + node
+            node = hashlib.blake2b(pair, digest_size=32).digest()
+            i >>= 1
+        if node != bytes(meta.e2c_transfers_root):
+            raise InvalidTransaction(
+                f"Expected root hash: {meta.e2c_transfers_root.hex()}, got: {node.hex()}. "
+                f"Check the transfer index, the amount and the recipient"
+            )
+
+        self.state.withdrawn.add((block_hash, transfer_index))
+        balance_asset_id = "" if cl_asset_id == WAVES_ASSET_ID_IN_CC else cl_asset_id
+        self._add_balance(sender, balance_asset_id, amount)
+
+    def _add_balance(self, address: str, asset_id: str, amount: int):
+        balances = self.state.balances.setdefault(address, {})
+        balances[asset_id] = balances.get(asset_id, 0) + amount
+
+
+def _typed(value_type: str, value: Any) -> Dict[str, Any]:
+    return {"type": value_type, "value": value}
+
+
+def _tuple(*xs: Dict[str, Any]) -> Dict[str, Any]:
+    return _typed("Tuple", {f"_{i + 1}": x for i, x in enumerate(xs)})
+
+
+def _transaction_not_found() -> Dict[str, Any]:
+    return {
+        "error": ERROR_TRANSACTION_NOT_FOUND,
+        "message": "transactions does not exist",
+    }
+
+
+def _split_args(x: str) -> List[str]:
+    """
+    Splits by top-level commas
+    """
+    r: List[str] = []
+    depth = 0
+    quoted = False
+    start = 0
+    for i, c in enumerate(x):
+        if c == '"':
+            quoted = not quoted
+        elif quoted:
+            continue
+        elif c in "([":
+            depth += 1
+        elif c in ")]":
+            depth -= 1
+        elif c == "," and depth == 0:
+            r.append(x[start:i])
+            start = i + 1
+    if x[start:].strip():
+        r.append(x[start:])
+    return r
@@ -0,0 +1,466 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from eth.abc import ComputationAPI
+from eth.exceptions import Revert, WriteProtection
+from eth_abi import decode, encode
+from eth_typing import ChecksumAddress
+from eth_utils import keccak, to_canonical_address, to_checksum_address
+from eth_utils.abi import (
+    event_abi_to_log_topic,
+    function_abi_to_4byte_selector,
+)
+
+from units_network.abi_cache import load_abi
+
+# Flat costs instead of EVM opcodes, so gas estimations are stable
+GAS_CALL = 2_000
+GAS_LOAD = 2_100
+GAS_STORE = 20_000
+GAS_LOG = 1_500
+
+INT64_MAX = 2**63 - 1
+ZERO_ADDRESS = to_checksum_address("0x" + "00" * 20)
+
+# Error(string)
+ERROR_SELECTOR = keccak(text="Error(string)")[:4]
+
+
+def contract_address(name: str) -> ChecksumAddress:
+    """
+    :return: a deterministic address of a simulated contract
+    """
+    return to_checksum_address(keccak(text=f"units-network-simulator/{name}")[-20:])
+
+
+def mapping_slot(slot: int, *keys: Any) -> int:
+    """
+    :return: a storage slot of mapping[keys[0]][keys[1]]... like Solidity does
+    """
+    for key in keys:
+        key_bytes = (
+            to_canonical_address(key).rjust(32, b"\x00")
+            if isinstance(key, str)
+            else key.to_bytes(32, "big")
+        )
+        slot = int.from_bytes(keccak(key_bytes + slot.to_bytes(32, "big")), "big")
+    return slot
+
+
+class Call:
+    """
+    A context of a contract call: the sender, the value and the state with gas accounting
+    """
+
+    def __init__(self, computation: ComputationAPI):
+        self.computation = computation
+        self.sender = to_checksum_address(computation.msg.sender)
+        self.value: int = computation.msg.value
+        self.block_number: int = computation.state.block_number
+
+    def load(self, address: ChecksumAddress, slot: int) -> int:
+        self.computation.consume_gas(GAS_LOAD, "load")
+        return self.computation.state.get_storage(to_canonical_address(address), slot)
+
+    def store(self, address: ChecksumAddress, slot: int, value: int):
+        if self.computation.msg.is_static:
+            raise WriteProtection("Can't modify the state in a static call")
+        self.computation.consume_gas(GAS_STORE, "store")
+        self.computation.state.set_storage(to_canonical_address(address), slot, value)
+
+    def move_value(
+        self, from_address: ChecksumAddress, to_address: ChecksumAddress, value: int
+    ):
+        state = self.computation.state
+        state.delta_balance(to_canonical_address(from_address), -value)
+        state.delta_balance(to_canonical_address(to_address), value)
+
+    def emit(self, address: ChecksumAddress, topics: List[bytes], data: bytes):
+        self.computation.consume_gas(GAS_LOG, "log")
+        self.computation.add_log_entry(
+            to_canonical_address(address),
+            tuple(int.from_bytes(x, "big") for x in topics),
+            data,
+        )
+
+    def revert(self, message: str):
+        """
+        Reverts with Error(message). ERC20 custom errors are reverted this way too, because eth-tester keeps only
+        messages of reverted calls
+        """
+        data = ERROR_SELECTOR + encode(["string"], [message])
+        self.computation.output = data
+        raise Revert(data)
+
+
+def _checksum_addresses(abi_type: str, value: Any) -> Any:
+    # eth_abi decodes addresses in lower case
+    if abi_type == "address":
+        return to_checksum_address(value)
+    elif abi_type == "address[]":
+        return tuple(to_checksum_address(x) for x in value)
+    return value
+
+
+class SimulatedContract:
+    """
+    A contract from units_network/abi implemented in Python. The simulated EL node runs it as a precompile at its
+    address, so transactions, receipts and logs are the same as with a deployed contract.
+    """
+
+    def __init__(self, address: ChecksumAddress, abi_name: str):
+        self.address = address
+        self.abi = load_abi(abi_name)
+        self.handlers: Dict[str, Callable[..., Any]] = {}
+        self._functions: Dict[bytes, Dict[str, Any]] = {}
+        self._events: Dict[str, Dict[str, Any]] = {}
+        for x in self.abi:
+            if x["type"] == "function":
+                self._functions[function_abi_to_4byte_selector(x)] = x
+            elif x["type"] == "event":
+                self._events[x["name"]] = x
+
+    def function_selector(self, name: str) -> bytes:
+        return next(k for k, v in self._functions.items() if v["name"] == name)
+
+    def event_topic(self, name: str) -> bytes:
+        return event_abi_to_log_topic(self._events[name])
+
+    def genesis_storage(self) -> Dict[int, int]:
+        return {}
+
+    def genesis_account(self) -> Dict[str, Any]:
+        # A non-zero nonce and code, so the account isn't cleared as empty and looks like a contract
+        return {
+            "balance": 0,
+            "nonce": 1,
+            "code": b"\xfe",
+            "storage": self.genesis_storage(),
+        }
+
+    def __call__(self, computation: ComputationAPI) -> ComputationAPI:
+        computation.consume_gas(GAS_CALL, "call")
+        call = Call(computation)
+        data = computation.msg.data_as_bytes
+        if len(data) == 0:
+            self.receive(call)
+            return computation
+
+        fn = self._functions.get(data[:4])
+        if fn is None:
+            call.revert(f"Unknown function {data[:4].hex()}")
+
+        assert fn is not None
+        if call.value and fn.get("stateMutability") != "payable":
+            call.revert(f"{fn['name']} is not payable")
+
+        types = [x["type"] for x in fn["inputs"]]
+        args = [
+            _checksum_addresses(t, x) for t, x in zip(types, decode(types, data[4:]))
+        ]
+        r = self.handlers[fn["name"]](call, *args)
+        outputs = [x["type"] for x in fn.get("outputs", [])]
+        if outputs:
+            computation.output = encode(outputs, [r] if len(outputs) == 1 else r)
+        return computation
+
+    def receive(self, call: Call):
+        call.revert("Plain transfers aren't supported")
+
+    def emit(self, call: Call, event_name: str, *args):
+        event = self._events[event_name]
+        topics = [event_abi_to_log_topic(event)]
+        data_types: List[str] = []
+        data_args: List[Any] = []
+        for x, arg in zip(event["inputs"], args):
+            if x.get("indexed"):
+                topics.append(encode([x["type"]], [arg]))
+            else:
+                data_types.append(x["type"])
+                data_args.append(arg)
+        call.emit(self.address, topics, encode(data_types, data_args))
+
+
+class SimulatedErc20(SimulatedContract):
+    BALANCES_SLOT = 0
+    ALLOWANCES_SLOT = 1
+    TOTAL_SUPPLY_SLOT = 2
+
+    def __init__(
+        self,
+        address: ChecksumAddress,
+        name: str,
+        symbol: str,
+        decimals: int,
+        balances: Optional[Dict[ChecksumAddress, int]] = None,
+    ):
+        """
+        :param balances: initial balances
+        """
+        super().__init__(address, "Erc20")
+        self.name = name
+        self.symbol = symbol
+        self.decimals = decimals
+        self.initial_balances = balances or {}
+        self.handlers = {
+            "name": lambda call: self.name,
+            "symbol": lambda call: self.symbol,
+            "decimals": lambda call: self.decimals,
+            "totalSupply": lambda call: call.load(self.address, self.TOTAL_SUPPLY_SLOT),
+            "balanceOf": self.balance_of,
+            "allowance": self.allowance,
+            "approve": self.approve,
+            "transfer": self.transfer,
+            "transferFrom": self.transfer_from,
+        }
+
+    def genesis_storage(self) -> Dict[int, int]:
+        r = {
+            mapping_slot(self.BALANCES_SLOT, address): amount
+            for address, amount in self.initial_balances.items()
+        }
+        r[self.TOTAL_SUPPLY_SLOT] = sum(self.initial_balances.values())
+        return r
+
+    def balance_of(self, call: Call, account: ChecksumAddress) -> int:
+        return call.load(self.address, mapping_slot(self.BALANCES_SLOT, account))
+
+    def allowance(
+        self, call: Call, owner: ChecksumAddress, spender: ChecksumAddress
+    ) -> int:
+        return call.load(
+            self.address, mapping_slot(self.ALLOWANCES_SLOT, owner, spender)
+        )
+
+    def approve(self, call: Call, spender: ChecksumAddress, value: int) -> bool:
+        if int(spender, 16) == 0:
+            call.revert(f"ERC20InvalidSpender({spender})")
+        self._set_allowance(call, call.sender, spender, value)
+        return True
+
+    def transfer(self, call: Call, to: ChecksumAddress, value: int) -> bool:
+        self.move(call, call.sender, to, value)
+        return True
+
+    def transfer_from(
+        self,
+        call: Call,
+        from_address: ChecksumAddress,
+        to: ChecksumAddress,
+        value: int,
+        spender: Optional[ChecksumAddress] = None,
+    ) -> bool:
+        """
+        :param spender: call.sender if None. Bridges pass own address
+        """
+        spender = spender or call.sender
+        allowance = self.allowance(call, from_address, spender)
+        if allowance < value:
+            call.revert(f"ERC20InsufficientAllowance({spender}, {allowance}, {value})")
+        self._set_allowance(call, from_address, spender, allowance - value, emit=False)
+        self.move(call, from_address, to, value)
+        return True
+
+    def move(
+        self,
+        call: Call,
+        from_address: ChecksumAddress,
+        to: ChecksumAddress,
+        value: int,
+    ):
+        if int(to, 16) == 0:
+            call.revert(f"ERC20InvalidReceiver({to})")
+        from_slot = mapping_slot(self.BALANCES_SLOT, from_address)
+        from_balance = call.load(self.address, from_slot)
+        if from_balance < value:
+            call.revert(
+                f"ERC20InsufficientBalance({from_address}, {from_balance}, {value})"
+            )
+        call.store(self.address, from_slot, from_balance - value)
+        to_slot = mapping_slot(self.BALANCES_SLOT, to)
+        call.store(self.address, to_slot, call.load(self.address, to_slot) + value)
+        self.emit(call, "Transfer", from_address, to, value)
+
+    def mint(self, call: Call, to: ChecksumAddress, value: int):
+        to_slot = mapping_slot(self.BALANCES_SLOT, to)
+        call.store(self.address, to_slot, call.load(self.address, to_slot) + value)
+        total = call.load(self.address, self.TOTAL_SUPPLY_SLOT)
+        call.store(self.address, self.TOTAL_SUPPLY_SLOT, total + value)
+        self.emit(call, "Transfer", ZERO_ADDRESS, to, value)
+
+    def _set_allowance(
+        self,
+        call: Call,
+        owner: ChecksumAddress,
+        spender: ChecksumAddress,
+        value: int,
+        emit: bool = True,
+    ):
+        call.store(
+            self.address, mapping_slot(self.ALLOWANCES_SLOT, owner, spender), value
+        )
+        if emit:
+            self.emit(call, "Approval", owner, spender, value)
+
+
+class SimulatedNativeBridge(SimulatedContract):
+    EL_TO_CL_RATIO = 10**10
+    MIN_AMOUNT_IN_WEI = EL_TO_CL_RATIO
+    MAX_AMOUNT_IN_WEI = INT64_MAX * EL_TO_CL_RATIO
+    # Transfers of both bridges, so a block fits a Merkle tree of MIN_E2C_TRANSFERS leaves
+    MAX_TRANSFERS_IN_BLOCK = 1024
+    BURN_ADDRESS = ZERO_ADDRESS
+    TRANSFERS_PER_BLOCK_SLOT = 0
+
+    def __init__(self, address: ChecksumAddress):
+        super().__init__(address, "NativeBridge")
+        self.handlers = {
+            "BURN_ADDRESS": lambda call: self.BURN_ADDRESS,
+            "EL_TO_CL_RATIO": lambda call: self.EL_TO_CL_RATIO,
+            "MAX_AMOUNT_IN_WEI": lambda call: self.MAX_AMOUNT_IN_WEI,
+            "MAX_TRANSFERS_IN_BLOCK": lambda call: self.MAX_TRANSFERS_IN_BLOCK,
+            "MIN_AMOUNT_IN_WEI": lambda call: self.MIN_AMOUNT_IN_WEI,
+            "transfersPerBlock": self.transfers_per_block,
+            "sendNative": self.send_native,
+        }
+
+    def transfers_per_block(self, call: Call, block_number: int) -> int:
+        return call.load(
+            self.address, mapping_slot(self.TRANSFERS_PER_BLOCK_SLOT, block_number)
+        )
+
+    def count_transfer(self, call: Call):
+        slot = mapping_slot(self.TRANSFERS_PER_BLOCK_SLOT, call.block_number)
+        n = call.load(self.address, slot)
+        if n >= self.MAX_TRANSFERS_IN_BLOCK:
+            call.revert(
+                f"Max transfers limit of {self.MAX_TRANSFERS_IN_BLOCK} reached in this block. Try to send transfers again"
+            )
+        call.store(self.address, slot, n + 1)
+
+    def send_native(self, call: Call, waves_recipient: bytes):
+        if call.value < self.MIN_AMOUNT_IN_WEI:
+            call.revert(
+                f"Sent value {call.value} must be greater or equal to {self.MIN_AMOUNT_IN_WEI}"
+            )
+        if call.value > self.MAX_AMOUNT_IN_WEI:
+            call.revert(
+                f"Sent value {call.value} must be less or equal to {self.MAX_AMOUNT_IN_WEI}"
+            )
+        if call.value % self.EL_TO_CL_RATIO != 0:
+            call.revert(
+                f"Sent value {call.value} must be a multiple of {self.EL_TO_CL_RATIO}"
+            )
+
+        self.count_transfer(call)
+        call.move_value(self.address, self.BURN_ADDRESS, call.value)
+        self.emit(
+            call, "SentNative", waves_recipient, call.value // self.EL_TO_CL_RATIO
+        )
+
+
+class SimulatedStandardBridge(SimulatedContract):
+    TOKEN_RATIOS_SLOT = 0
+
+    def __init__(
+        self,
+        address: ChecksumAddress,
+        native_bridge: SimulatedNativeBridge,
+        tokens: List[SimulatedErc20],
+        token_exponents: Dict[ChecksumAddress, int],
+        operator: ChecksumAddress,
+    ):
+        """
+        :param token_exponents: registered tokens: an address -> an exponent of EL to CL ratio
+        :param operator: can finalize transfers and update the registry, like the block builder
+        """
+        super().__init__(address, "StandardBridge")
+        self.native_bridge = native_bridge
+        self.tokens = {x.address: x for x in tokens}
+        self.token_exponents = token_exponents
+        self.operator = operator
+        self.handlers = {
+            "_unusedDeposits": lambda call, token: 0,
+            "tokenRatios": self.token_ratio,
+            "bridgeERC20": self.bridge_erc20,
+            "finalizeBridgeERC20": self.finalize_bridge_erc20,
+            "updateAssetRegistry": self.update_asset_registry,
+        }
+
+    def genesis_storage(self) -> Dict[int, int]:
+        return {
+            mapping_slot(self.TOKEN_RATIOS_SLOT, address): 10**exponent
+            for address, exponent in self.token_exponents.items()
+        }
+
+    def token_ratio(self, call: Call, token: ChecksumAddress) -> int:
+        return call.load(self.address, mapping_slot(self.TOKEN_RATIOS_SLOT, token))
+
+    def bridge_erc20(
+        self, call: Call, token: ChecksumAddress, cl_to: ChecksumAddress, el_amount: int
+    ):
+        ratio = self.token_ratio(call, token)
+        erc20 = self.tokens.get(token)
+        if ratio == 0 or erc20 is None:
+            call.revert(f"Token {token} is not registered")
+
+        assert erc20 is not None
+        cl_amount = el_amount // ratio
+        if cl_amount <= 0 or cl_amount * ratio != el_amount:
+            call.revert(
+                f"Sent amount {el_amount} must be a positive multiple of {ratio}"
+            )
+        if cl_amount > INT64_MAX:
+            call.revert(f"Sent amount {el_amount} is too big")
+
+        self.native_bridge.count_transfer(call)
+        erc20.transfer_from(
+            call, call.sender, self.address, el_amount, spender=self.address
+        )
+        self.emit(call, "ERC20BridgeInitiated", token, call.sender, cl_to, cl_amount)
+
+    def finalize_bridge_erc20(
+        self,
+        call: Call,
+        local_token: ChecksumAddress,
+        from_address: ChecksumAddress,
+        to: ChecksumAddress,
+        amount: int,
+    ):
+        self._check_operator(call)
+        erc20 = self.tokens.get(local_token)
+        if erc20 is None:
+            call.revert(f"Token {local_token} is not registered")
+
+        assert erc20 is not None
+        # Tokens locked by previous E2C transfers are released first, the rest is minted
+        locked = erc20.balance_of(call, self.address)
+        if locked > 0:
+            erc20.move(call, self.address, to, min(locked, amount))
+        if amount > locked:
+            erc20.mint(call, to, amount - locked)
+        self.emit(call, "ERC20BridgeFinalized", local_token, from_address, to, amount)
+
+    def update_asset_registry(
+        self,
+        call: Call,
+        added_tokens: Tuple[ChecksumAddress, ...],
+        added_token_exponents: Tuple[int, ...],
+    ):
+        self._check_operator(call)
+        for token, exponent in zip(added_tokens, added_token_exponents):
+            if token not in self.tokens:
+                call.revert(f"Token {token} isn't simulated")
+            call.store(
+                self.address, mapping_slot(self.TOKEN_RATIOS_SLOT, token), 10**exponent
+            )
+        self.emit(
+            call,
+            "RegistryUpdated",
+            list(added_tokens),
+            list(added_token_exponents),
+            [],
+        )
+
+    def _check_operator(self, call: Call):
+        if call.sender != self.operator:
+            call.revert(f"Only {self.operator} can call this function")
@@ -0,0 +1,320 @@
+from threading import RLock
+from typing import Any, Dict, List, Optional, Tuple
+
+from eth.vm.forks.prague import PragueVM
+from eth.vm.forks.prague.computation import PragueComputation
+from eth.vm.forks.prague.state import PragueState
+from eth.vm.forks.shanghai.withdrawals import Withdrawal
+from eth_abi import encode
+from eth_account import Account
+from eth_account.signers.local import LocalAccount
+from eth_tester import EthereumTester, PyEVMBackend
+from eth_tester.exceptions import TransactionFailed
+from eth_typing import BlockNumber, ChecksumAddress
+from eth_utils import keccak, to_canonical_address
+from hexbytes import HexBytes
+from web3 import EthereumTesterProvider, Web3
+from web3.datastructures import AttributeDict
+
+from units_network.e2c_log_decoder import E2CLogDecoder
+from units_network.simulator.el_contracts import (
+    ERROR_SELECTOR,
+    SimulatedContract,
+    SimulatedNativeBridge,
+    SimulatedStandardBridge,
+)
+from units_network.simulator.server import JsonServer
+
+# eth-tester returns this chain id
+CHAIN_ID = 131277322940537
+
+DEFAULT_GENESIS_TIMESTAMP = 1_700_000_000
+DEFAULT_BALANCE = 10**6 * 10**18
+
+
+class ElNode(JsonServer):
+    """
+    A simulated Execution Layer node for local runs: an eth-tester chain with simulated bridges and ERC20 tokens,
+    served over Ethereum JSON-RPC. Transactions are collected in a mempool until mine_block. Blocks have
+    timestamps of genesis_timestamp + number * block_time and no randomness, so the same transactions give the same
+    block hashes.
+    """
+
+    def __init__(
+        self,
+        contracts: List[SimulatedContract],
+        balances: Dict[ChecksumAddress, int],
+        operator: LocalAccount,
+        block_time: int = 2,
+        genesis_timestamp: int = DEFAULT_GENESIS_TIMESTAMP,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        """
+        :param balances: initial balances of accounts in Wei
+        :param operator: sends transactions of the block builder, e.g. ERC20 C2E transfers
+        :param block_time: seconds between block timestamps
+        """
+        super().__init__(host, port)
+        self.contracts = {x.address: x for x in contracts}
+        self.operator = operator
+        self.block_time = block_time
+        self.genesis_timestamp = genesis_timestamp
+        self._lock = RLock()
+        self._pending: List[Any] = []
+        self._pending_hashes: Dict[HexBytes, int] = {}
+        self._withdrawals: List[Withdrawal] = []
+        self._withdrawal_index = 0
+
+        precompiles = {
+            to_canonical_address(x.address): x for x in self.contracts.values()
+        }
+        computation_class = type(
+            "SimulatedComputation",
+            (PragueComputation,),
+            {"_precompiles": {**PragueComputation.get_precompiles(), **precompiles}},
+        )
+        state_class = type(
+            "SimulatedState", (PragueState,), {"computation_class": computation_class}
+        )
+        vm_class = type("SimulatedVM", (PragueVM,), {"_state_class": state_class})
+
+        # Default accounts of eth-tester are the senders of calls without "from"
+        genesis_state = dict(PyEVMBackend.generate_genesis_state())
+        for address, balance in {**balances, operator.address: DEFAULT_BALANCE}.items():
+            genesis_state[to_canonical_address(address)] = {
+                "balance": balance,
+                "nonce": 0,
+                "code": b"",
+                "storage": {},
+            }
+        for x in self.contracts.values():
+            genesis_state[to_canonical_address(x.address)] = x.genesis_account()
+
+        self.backend = PyEVMBackend(
+            genesis_parameters=PyEVMBackend.generate_genesis_params(
+                overrides={"timestamp": genesis_timestamp}
+            ),
+            genesis_state=genesis_state,
+            vm_configuration=((0, vm_class),),
+        )
+        self.tester = EthereumTester(self.backend, auto_mine_transactions=False)
+        self.w3 = Web3(EthereumTesterProvider(self.tester))
+
+        native_bridge = next(
+            x for x in self.contracts.values() if isinstance(x, SimulatedNativeBridge)
+        )
+        standard_bridge = next(
+            x for x in self.contracts.values() if isinstance(x, SimulatedStandardBridge)
+        )
+        self.bridge_addresses = [native_bridge.address, standard_bridge.address]
+        self.e2c_log_decoder = E2CLogDecoder(
+            native_bridge.event_topic("SentNative"),
+            standard_bridge.event_topic("ERC20BridgeInitiated"),
+        )
+        self.standard_bridge = standard_bridge
+
+    @property
+    def block_number(self) -> BlockNumber:
+        with self._lock:
+            return BlockNumber(self.backend.chain.get_canonical_head().block_number)
+
+    def submit_raw_transaction(self, raw_txn: bytes) -> HexBytes:
+        """
+        Validates a transaction and adds it to the next block
+        """
+        with self._lock:
+            chain = self.backend.chain
+            txn = chain.get_vm().get_transaction_builder().decode(raw_txn)
+            txn_hash = HexBytes(txn.hash)
+            if txn_hash in self._pending_hashes:
+                return txn_hash
+
+            # Checks the nonce and the balance against the pending state
+            chain.apply_transaction(txn)
+            self._pending_hashes[txn_hash] = len(self._pending)
+            self._pending.append(txn)
+            return txn_hash
+
+    def add_withdrawal(self, address: ChecksumAddress, wei: int):
+        """
+        Credits an account in the next block, like a native C2E transfer
+        """
+        with self._lock:
+            self._withdrawals.append(
+                Withdrawal(
+                    index=self._withdrawal_index,
+                    validator_index=0,
+                    address=to_canonical_address(address),
+                    amount=wei // 10**9,
+                )
+            )
+            self._withdrawal_index += 1
+
+    def finalize_bridge_erc20(
+        self,
+        token: ChecksumAddress,
+        from_address: ChecksumAddress,
+        to: ChecksumAddress,
+        amount: int,
+    ) -> HexBytes:
+        """
+        Sends StandardBridge.finalizeBridgeERC20 of an ERC20 C2E transfer from the operator
+        """
+        data = self.standard_bridge.function_selector("finalizeBridgeERC20") + encode(
+            ["address", "address", "address", "uint256"],
+            [token, from_address, to, amount],
+        )
+        with self._lock:
+            txn = {
+                "type": 2,
+                "chainId": CHAIN_ID,
+                "nonce": self.backend.get_nonce(
+                    to_canonical_address(self.operator.address), "pending"
+                ),
+                "to": self.standard_bridge.address,
+                "value": 0,
+                "data": data,
+                "gas": 500_000,
+                "maxFeePerGas": 100 * 10**9,
+                "maxPriorityFeePerGas": 10**9,
+            }
+            signed = Account.sign_transaction(txn, self.operator.key)
+            return self.submit_raw_transaction(signed.raw_transaction)
+
+    def mine_block(self) -> Tuple[BlockNumber, HexBytes]:
+        """
+        Mines pending transactions and withdrawals
+        :return: the number and the hash of a new block
+        """
+        with self._lock:
+            chain = self.backend.chain
+            parent = chain.get_canonical_head()
+            number = parent.block_number + 1
+            # Transactions are applied again on top of the parent, that drops the pending state
+            r, _, _ = chain.mine_all(
+                self._pending,
+                parent_header=parent,
+                withdrawals=self._withdrawals or None,
+                timestamp=self.genesis_timestamp + number * self.block_time,
+                mix_hash=keccak(number.to_bytes(32, "big")),
+            )
+            self._pending = []
+            self._pending_hashes = {}
+            self._withdrawals = []
+            return BlockNumber(number), HexBytes(r.imported_block.hash)
+
+    def get_block_hashes(
+        self, from_number: int, to_number: int
+    ) -> List[Tuple[BlockNumber, HexBytes, HexBytes]]:
+        """
+        :return: (number, hash, parent hash) of blocks in [from_number, to_number]
+        """
+        with self._lock:
+            chaindb = self.backend.chain.chaindb
+            r = []
+            for n in range(from_number, to_number + 1):
+                header = chaindb.get_canonical_block_header_by_number(BlockNumber(n))
+                r.append(
+                    (
+                        BlockNumber(n),
+                        HexBytes(header.hash),
+                        HexBytes(header.parent_hash),
+                    )
+                )
+            return r
+
+    def get_e2c_leaves(self, block_hash: HexBytes) -> List[bytes]:
+        """
+        :return: Merkle tree leaves of E2C transfers in a block
+        """
+        with self._lock:
+            number = self.w3.eth.get_block(block_hash)["number"]
+            logs = self.w3.eth.get_logs(
+                {
+                    "fromBlock": number,
+                    "toBlock": number,
+                    "address": self.bridge_addresses,
+                }
+            )
+        r = []
+        for x in logs:
+            leaf = self.e2c_log_decoder.to_merkle_leaf(x)
+            if leaf is not None:
+                r.append(leaf)
+        return r
+
+    def handle_post(self, path: str, query: str, body: Any) -> Tuple[int, Any]:
+        if isinstance(body, list):
+            return 200, [self.handle_rpc(x) for x in body]
+        return 200, self.handle_rpc(body)
+
+    def handle_rpc(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        r: Dict[str, Any] = {"jsonrpc": "2.0", "id": request.get("id")}
+        try:
+            r["result"] = _to_json(
+                self._call(request["method"], request.get("params") or [])
+            )
+        except TransactionFailed as e:
+            # "execution reverted: <reason>"
+            reason = str(e).split(": ", 1)[-1]
+            r["error"] = {
+                "code": 3,
+                "message": str(e),
+                "data": HexBytes(
+                    ERROR_SELECTOR + encode(["string"], [reason])
+                ).to_0x_hex(),
+            }
+        except Exception as e:
+            r["error"] = {"code": -32000, "message": str(e)}
+        return r
+
+    def _call(self, method: str, params: List[Any]) -> Any:
+        if method == "eth_sendRawTransaction":
+            return self.submit_raw_transaction(HexBytes(params[0]))
+
+        with self._lock:
+            if method == "eth_getBlockReceipts":
+                block = self.w3.manager.request_blocking(
+                    "eth_getBlockByNumber", [params[0], False]
+                )
+                if block is None:
+                    return None
+                return [
+                    self.w3.manager.request_blocking("eth_getTransactionReceipt", [x])
+                    for x in block["transactions"]
+                ]
+            elif method == "eth_getLogs" and "blockHash" in params[0]:
+                # eth-tester filters only by a range
+                block = self.w3.manager.request_blocking(
+                    "eth_getBlockByHash", [params[0]["blockHash"], False]
+                )
+                if block is None:
+                    raise Exception(f"Unknown block {params[0]['blockHash']}")
+                log_filter = {k: v for k, v in params[0].items() if k != "blockHash"}
+                log_filter["fromBlock"] = log_filter["toBlock"] = block["number"]
+                return self.w3.manager.request_blocking(method, [log_filter])
+            elif (
+                method in ("eth_getTransactionReceipt", "eth_getTransactionByHash")
+                and HexBytes(params[0]) in self._pending_hashes
+            ):
+                # Isn't in a block yet
+                return None
+            return self.w3.manager.request_blocking(method, params)
+
+
+def _to_json(x: Any) -> Any:
+    """
+    Converts a result of eth-tester to JSON-RPC: numbers to hex quantities, bytes to hex data
+    """
+    if isinstance(x, bool) or x is None or isinstance(x, str):
+        return x
+    elif isinstance(x, int):
+        return hex(x)
+    elif isinstance(x, (bytes, bytearray)):
+        return HexBytes(x).to_0x_hex()
+    elif isinstance(x, (dict, AttributeDict)):
+        return {k: _to_json(v) for k, v in x.items()}
+    elif isinstance(x, (list, tuple)):
+        return [_to_json(v) for v in x]
+    return x
@@ -0,0 +1,218 @@
+import json
+import logging
+import threading
+from dataclasses import asdict
+from typing import List, Optional
+
+from eth_account import Account
+from eth_account.signers.local import LocalAccount
+from eth_utils import keccak
+
+from units_network.network_settings import NetworkSettings
+from units_network.simulator.cl_node import (
+    ClAccount,
+    ClAsset,
+    ClNode,
+    RegisteredClAsset,
+    asset_id,
+)
+from units_network.simulator.el_contracts import (
+    SimulatedErc20,
+    SimulatedNativeBridge,
+    SimulatedStandardBridge,
+    contract_address,
+)
+from units_network.simulator.el_node import ElNode
+
+CHAIN_ID_STR = "R"
+
+NATIVE_TOKEN_NAME = "Unit0"
+NATIVE_TOKEN_DECIMALS = 8
+
+TEST_TOKEN_NAME = "TestToken"
+TEST_TOKEN_EL_DECIMALS = 18
+TEST_TOKEN_CL_DECIMALS = 8
+
+# In user units
+INITIAL_BALANCE = 1_000_000
+
+
+def el_account(name: str) -> LocalAccount:
+    """
+    A deterministic EL account by a name
+    """
+    return Account.from_key(keccak(text=f"units-network-simulator/el/{name}"))
+
+
+class LocalNetwork:
+    """
+    A deterministic stand-in of Unit0 on one machine: a simulated EL node with the bridges and a registered ERC20
+    token, and a fake CL node with the chain contract. Both have the same funded users on every run.
+
+    Each step mines an EL block and then a CL block, that registers it on the chain contract. Call step() manually
+    for reproducible runs or start_clock() to step every block_time seconds.
+    """
+
+    def __init__(
+        self,
+        users: int = 4,
+        block_time: int = 2,
+        finalization_depth: int = 2,
+        host: str = "127.0.0.1",
+        el_port: int = 0,
+        cl_port: int = 0,
+    ):
+        """
+        :param users: a number of funded accounts on both layers
+        :param finalization_depth: a number of EL blocks between the head and the finalized block
+        """
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.block_time = block_time
+        self.el_users: List[LocalAccount] = [el_account(str(i)) for i in range(users)]
+        self.cl_users: List[ClAccount] = [
+            ClAccount.create(f"cl/{i}", CHAIN_ID_STR) for i in range(users)
+        ]
+        self.el_operator = el_account("operator")
+        self.cl_chain_contract = ClAccount.create("cl/chain-contract", CHAIN_ID_STR)
+
+        test_token_exponent = TEST_TOKEN_EL_DECIMALS - TEST_TOKEN_CL_DECIMALS
+        self.el_test_token = SimulatedErc20(
+            contract_address(f"Erc20/{TEST_TOKEN_NAME}"),
+            TEST_TOKEN_NAME,
+            "TT",
+            TEST_TOKEN_EL_DECIMALS,
+            {
+                x.address: INITIAL_BALANCE * 10**TEST_TOKEN_EL_DECIMALS
+                for x in self.el_users
+            },
+        )
+        native_bridge = SimulatedNativeBridge(contract_address("NativeBridge"))
+        standard_bridge = SimulatedStandardBridge(
+            contract_address("StandardBridge"),
+            native_bridge,
+            [self.el_test_token],
+            {self.el_test_token.address: test_token_exponent},
+            self.el_operator.address,
+        )
+        self.el_node = ElNode(
+            [self.el_test_token, native_bridge, standard_bridge],
+            {x.address: INITIAL_BALANCE * 10**18 for x in self.el_users},
+            self.el_operator,
+            block_time=block_time,
+            host=host,
+            port=el_port,
+        )
+
+        self.cl_native_token = ClAsset(
+            asset_id(NATIVE_TOKEN_NAME),
+            NATIVE_TOKEN_NAME,
+            NATIVE_TOKEN_DECIMALS,
+            issuer=self.cl_chain_contract.address,
+        )
+        self.cl_test_token = ClAsset(
+            asset_id(TEST_TOKEN_NAME),
+            TEST_TOKEN_NAME,
+            TEST_TOKEN_CL_DECIMALS,
+            issuer=self.cl_chain_contract.address,
+        )
+        cl_balances = {
+            x.address: {
+                "": INITIAL_BALANCE * 10**8,
+                self.cl_native_token.asset_id: INITIAL_BALANCE
+                * 10**NATIVE_TOKEN_DECIMALS,
+                self.cl_test_token.asset_id: INITIAL_BALANCE
+                * 10**TEST_TOKEN_CL_DECIMALS,
+            }
+            for x in self.cl_users
+        }
+        self.cl_node = ClNode(
+            self.el_node,
+            CHAIN_ID_STR,
+            self.cl_chain_contract,
+            self.cl_native_token,
+            [
+                (
+                    self.cl_test_token,
+                    RegisteredClAsset(
+                        index=0,
+                        asset_id=self.cl_test_token.asset_id,
+                        erc20_address=self.el_test_token.address,
+                        ratio_exponent=test_token_exponent,
+                    ),
+                )
+            ],
+            native_bridge.address,
+            standard_bridge.address,
+            cl_balances,
+            finalization_depth=finalization_depth,
+            block_delay=block_time,
+            host=host,
+            port=cl_port,
+        )
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._clock: Optional[threading.Thread] = None
+
+    @property
+    def network_settings(self) -> NetworkSettings:
+        return NetworkSettings(
+            name="Local",
+            cl_chain_id_str=CHAIN_ID_STR,
+            cl_node_api_url=self.cl_node.url,
+            el_node_api_url=self.el_node.url,
+            chain_contract_address=self.cl_chain_contract.address,
+        )
+
+    def start(self):
+        self.el_node.start()
+        self.cl_node.start()
+
+    def stop(self):
+        self.stop_clock()
+        self.cl_node.stop()
+        self.el_node.stop()
+
+    def step(self):
+        """
+        Mines an EL block and registers it in a new CL block
+        """
+        with self._lock:
+            number, block_hash = self.el_node.mine_block()
+            self.cl_node.step()
+            self.log.debug(f"Block {number}: {block_hash.to_0x_hex()}")
+
+    def start_clock(self):
+        self._stop.clear()
+        self._clock = threading.Thread(
+            target=self._run_clock, name="Clock", daemon=True
+        )
+        self._clock.start()
+
+    def stop_clock(self):
+        self._stop.set()
+        if self._clock:
+            self._clock.join()
+            self._clock = None
+
+    def _run_clock(self):
+        while not self._stop.wait(self.block_time):
+            try:
+                self.step()
+            except Exception:
+                self.log.exception("Can't make a step")
+
+    def args_data(self, user: int = 0) -> dict:
+        """
+        :return: a content of a file for --args of commands, with keys of a user
+        """
+        return {
+            "waves_private_key": self.cl_users[user].private_key,
+            "eth_private_key": self.el_users[user].key.to_0x_hex(),
+            "network_settings": asdict(self.network_settings),
+            "asset_name": TEST_TOKEN_NAME,
+        }
+
+    def write_args(self, file_path: str, user: int = 0):
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump(self.args_data(user), file, indent=2)
@@ -0,0 +1,89 @@
+import json
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+class JsonServer:
+    """
+    A threaded HTTP server with JSON requests and responses. Subclasses override handle_get and handle_post.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        """
+        :param port: a free one if 0
+        """
+        self.log = logging.getLogger(self.__class__.__name__)
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                server.log.debug(format % args)
+
+            def do_GET(self):
+                self._respond(lambda path, query: server.handle_get(path, query))
+
+            def do_POST(self):
+                size = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(size) if size else b""
+                try:
+                    body = json.loads(raw) if raw else None
+                except ValueError:
+                    self._send(400, {"error": 1, "message": "Failed to parse JSON"})
+                    return
+                self._respond(lambda path, query: server.handle_post(path, query, body))
+
+            def _respond(self, handle):
+                parts = urlsplit(self.path)
+                try:
+                    status, response = handle(parts.path, parts.query)
+                except Exception as e:
+                    server.log.exception(f"Can't handle {self.command} {self.path}")
+                    status, response = 500, {"error": 0, "message": str(e)}
+                self._send(status, response)
+
+            def _send(self, status: int, response: Any):
+                body = json.dumps(response).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever,
+            name=self.__class__.__name__,
+            daemon=True,
+        )
+        self._thread.start()
+        self.log.info(f"Listening on {self.url}")
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def handle_get(self, path: str, query: str) -> Tuple[int, Any]:
+        """
+        :return: an HTTP status and a JSON response
+        """
+        return 404, {"error": 0, "message": f"Unknown path {path}"}
+
+    def handle_post(self, path: str, query: str, body: Any) -> Tuple[int, Any]:
+        return 404, {"error": 0, "message": f"Unknown path {path}"}
@@ -1,7 +1,6 @@
-import json
 from dataclasses import dataclass
 from functools import cached_property
-from importlib.resources import files
+from typing import Any
 
 from ens.ens import HexBytes
 from eth_account.signers.base import BaseAccount
@@ -10,6 +9,7 @@ from eth_utils.abi import event_abi_to_log_topic
 from web3 import Web3
 from web3.types import LogReceipt, Wei
 
+from units_network.abi_cache import load_abi
 from units_network.base_contract import BaseContract
 
 
@@ -35,29 +35,12 @@ class ERC20BridgeInitiatedEvent:
         )
 
 
-class StandardBridge(BaseContract):
-    def __init__(self, w3: Web3, contract_address: ChecksumAddress):
-        json_abi = (
-            files("units_network").joinpath("abi/StandardBridge.json").read_text()
-        )
-        abi = json.loads(json_abi)
-        super().__init__(w3, contract_address, abi)
+class StandardBridgeEvents:
+    """
+    Decoding of StandardBridge events, shared by StandardBridge and AsyncStandardBridge
+    """
 
-    def bridge_erc20(
-        self,
-        token: ChecksumAddress,
-        cl_to: HexAddress,
-        el_amount: Wei,
-        sender_account: BaseAccount,
-    ) -> HexStr:
-        return self.send_transaction(
-            "bridgeERC20",
-            [token, cl_to, el_amount],
-            sender_account,
-        )
-
-    def token_ratio(self, token: ChecksumAddress):
-        return self.contract.functions.tokenRatios(token).call()
+    contract: Any
 
     @cached_property
     def erc20_bridge_initiated_topic(self) -> HexStr:
@@ -78,3 +61,25 @@ class StandardBridge(BaseContract):
             cl_to=HexAddress(args["clTo"]),
             cl_amount=args["clAmount"],
         )
+
+
+class StandardBridge(StandardBridgeEvents, BaseContract):
+    def __init__(self, w3: Web3, contract_address: ChecksumAddress):
+        abi = load_abi("StandardBridge")
+        super().__init__(w3, contract_address, abi)
+
+    def bridge_erc20(
+        self,
+        token: ChecksumAddress,
+        cl_to: HexAddress,
+        el_amount: Wei,
+        sender_account: BaseAccount,
+    ) -> HexStr:
+        return self.send_transaction(
+            "bridgeERC20",
+            [token, cl_to, el_amount],
+            sender_account,
+        )
+
+    def token_ratio(self, token: ChecksumAddress):
+        return self.contract.functions.tokenRatios(token).call()
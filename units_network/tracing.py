@@ -0,0 +1,130 @@
+import atexit
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from time import perf_counter
+from typing import Any, Dict, Iterator, List, Optional
+
+
+@dataclass
+class Span:
+    # Names of parent spans and this one, e.g. "params/logs"
+    path: str
+    # Seconds since the tracer start
+    start: float
+    seconds: float = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def to_json_dict(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "start": self.start,
+            "seconds": self.seconds,
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class Tracer:
+    """
+    Collects timings of pipeline stages. Spans of a thread are nested, so a stage inside another gets a path like
+    "params/logs".
+    """
+
+    def __init__(self):
+        self.started_at = perf_counter()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Span]:
+        stack: List[str] = self._local.__dict__.setdefault("stack", [])
+        stack.append(name)
+        start = perf_counter()
+        r = Span("/".join(stack), start - self.started_at, attributes=attributes)
+        try:
+            yield r
+        except BaseException as e:
+            r.error = str(e) or e.__class__.__name__
+            raise
+        finally:
+            r.seconds = perf_counter() - start
+            stack.pop()
+            with self._lock:
+                self.spans.append(r)
+
+    def stages(self) -> Dict[str, Dict[str, Any]]:
+        """
+        :return: count and total seconds by a path, in order of the first start
+        """
+        with self._lock:
+            spans = sorted(self.spans, key=lambda x: x.start)
+        r: Dict[str, Dict[str, Any]] = {}
+        for x in spans:
+            stage = r.setdefault(x.path, {"count": 0, "seconds": 0.0})
+            stage["count"] += 1
+            stage["seconds"] += x.seconds
+        return r
+
+    def report(self) -> str:
+        total = perf_counter() - self.started_at
+        lines = [f"Stages, total {total:.3f}s:"]
+        for path, stage in self.stages().items():
+            indent = "  " * path.count("/")
+            name = path.rsplit("/", 1)[-1]
+            count = f" x{stage['count']}" if stage["count"] > 1 else ""
+            lines.append(
+                f"  {indent}{name}{count}: {stage['seconds']:.3f}s ({100 * stage['seconds'] / total:.1f}%)"
+            )
+        return "\n".join(lines)
+
+    def to_json_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda x: x.start)
+        return {
+            "totalSeconds": perf_counter() - self.started_at,
+            "stages": self.stages(),
+            "spans": [x.to_json_dict() for x in spans],
+        }
+
+    def dump(self, path: str):
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.to_json_dict(), file, indent=2)
+
+
+_default = Tracer()
+
+
+def get_default() -> Tracer:
+    return _default
+
+
+def span(name: str, **attributes):
+    """
+    A span of the shared tracer:
+    with tracing.span("receipt", txn_hash=txn_hash):
+        ...
+    """
+    return _default.span(name, **attributes)
+
+
+def report_at_exit(
+    trace_out: Optional[str] = None, log: Optional[logging.Logger] = None
+):
+    """
+    Logs a per-stage breakdown at exit
+    :param trace_out: also writes all spans to this JSON file
+    """
+    log = log or logging.getLogger(__name__)
+
+    def report():
+        log.info(_default.report())
+        if trace_out:
+            _default.dump(trace_out)
+            log.info(f"Trace is written to {trace_out}")
+
+    atexit.register(report)
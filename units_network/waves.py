@@ -1,10 +1,12 @@
 import sys
 from logging import Logger
-from time import sleep
+from typing import List
 from typing_extensions import deprecated
 
 from pywaves import pw
 
+from units_network.confirmation_tracker import ConfirmationTracker
+
 
 def force_success(log: Logger, r, error_text: str, wait=True, pw=pw):
     if not r or r == "ERROR" or "error" in r:
@@ -26,11 +28,8 @@ def wait_for(id, pw=pw, log=None):
             print("Transaction failed, can't continue")
         sys.exit(1)
 
-    while True:
-        tx = pw.tx(id)
-        if "id" in tx:
-            return tx
-        sleep(2)
+    ConfirmationTracker(pywaves=pw).wait([id])
+    return pw.tx(id)
 
 
 def wait_for_approval(log: Logger, id, pw=pw):
@@ -38,8 +37,17 @@ def wait_for_approval(log: Logger, id, pw=pw):
         log.error("Transaction failed, can't continue")
         sys.exit(1)
 
-    while True:
-        tx = pw.tx(id)
-        if "id" in tx:
-            return tx
-        sleep(2)
+    ConfirmationTracker(pywaves=pw).wait([id])
+    return pw.tx(id)
+
+
+def wait_for_approvals(log: Logger, ids: List[str], pw=pw, confirmations: int = 1):
+    """
+    Waits for many transactions with a few requests per poll
+    :return: statuses by ids
+    """
+    if "ERROR" in ids:
+        log.error("Transaction failed, can't continue")
+        sys.exit(1)
+
+    return ConfirmationTracker(confirmations=confirmations, pywaves=pw).wait(ids)